@@ -270,6 +270,9 @@ class DigDownwardsToMaterial(Action):
         if position_block is not None:
             return Status.SUCCESS
 
+        if self.agent.search_ore(self.material):
+            return Status.RUNNING
+
         position_downwards = self.agent.observer.get_first_block_downwards()
         if position_downwards is None:
             return Status.FAILURE
@@ -306,3 +309,15 @@ class ExploreInDirection(Action):
 
     def terminate(self, new_status):
         self.agent.stop()
+
+
+class ExploreFrontier(Action):
+    def __init__(self, agent):
+        super().__init__("Explore frontier", agent)
+
+    def update(self):
+        self.agent.explore_frontier()
+        return Status.RUNNING
+
+    def terminate(self, new_status):
+        self.agent.stop()
@@ -2,8 +2,10 @@ from py_trees.common import Status
 
 from bt.actions import Action, JumpIfStuck
 from bt.conditions import Condition
-from bt.ppa import backward_chain
+from bt.ppa import backward_chain, detach
+from bt.routesequence import RouteSequence
 from bt.sequence import Sequence
+from bt.tickengine import TickEngine
 from goals.agentlesscondition import AgentlessCondition
 from goals.blueprint.blueprint import Blueprint
 from multiagents.cooperativity import Cooperativity
@@ -14,7 +16,20 @@ from utils.string import tree_to_string
 class BackChainTree:
     def __init__(self, agent, goals, cooperativity=Cooperativity.INDEPENDENT):
         self.agent = agent
+        mission_data = agent.mission_data
+        self.expansions = {} if mission_data.shared_subtrees and mission_data.compiled_ticks else None
         self.root = self.initialize_tree(goals, cooperativity)
+        self.expansions = None
+        self.engine = self.initialize_engine()
+
+    @classmethod
+    def from_root(cls, agent, root):
+        tree = cls.__new__(cls)
+        tree.agent = agent
+        tree.expansions = None
+        tree.root = root
+        tree.engine = tree.initialize_engine()
+        return tree
 
     def __getstate__(self):
         state = {'agent': self.agent, 'root': tree_to_state(self.root)}
@@ -22,7 +37,9 @@ class BackChainTree:
 
     def __setstate__(self, state):
         self.agent = state['agent']
+        self.expansions = None
         self.root = state_to_tree(state['root'])
+        self.engine = self.initialize_engine()
 
     def initialize_tree(self, goals, cooperativity):
         children = [JumpIfStuck(self.agent)]
@@ -30,27 +47,41 @@ class BackChainTree:
             children += self.backward_chain(goals, True)
         if cooperativity == Cooperativity.COOPERATIVE_WITH_CATCHUP or cooperativity == Cooperativity.INDEPENDENT:
             children += self.backward_chain(goals, False)
-        base_tree = Sequence("BaseTree", children=children)
+        base_tree = Sequence("BaseTree", children=detach(children))
         base_tree.setup_with_descendants()
         return base_tree
 
+    def initialize_engine(self):
+        mission_data = self.agent.mission_data
+        return TickEngine(self.root, mission_data.tick_profiling) if mission_data.compiled_ticks else None
+
+    def get_profiler(self):
+        return self.engine.profiler if self.engine is not None else None
+
     def backward_chain(self, goals, collaborative):
+        lazy = self.agent.mission_data.lazy_expansion
         children = []
         for goal in goals:
             if isinstance(goal, Action):
                 children.append(goal)
             elif isinstance(goal, Blueprint):
                 conditions = goal.as_conditions(self.agent)
-                children += [backward_chain(self.agent, condition, collaborative) for condition in conditions]
+                position_children = detach([backward_chain(self.agent, condition, collaborative, self.expansions, lazy)
+                                            for condition in conditions])
+                channels = [condition.name for condition in conditions] if collaborative else None
+                children.append(RouteSequence(self.agent, goal, position_children, channels))
             else:
                 if isinstance(goal, AgentlessCondition):
                     goal = goal.as_condition(self.agent)
                 if isinstance(goal, Condition):
-                    children.append(backward_chain(self.agent, goal, collaborative))
+                    children.append(backward_chain(self.agent, goal, collaborative, self.expansions, lazy))
         return children
 
     def tick(self):
-        self.root.tick_once()
+        if self.engine is not None:
+            self.engine.tick()
+        else:
+            self.root.tick_once()
 
     def print_tip(self):
         tip = self.root.tip()
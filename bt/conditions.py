@@ -3,17 +3,31 @@ from py_trees.common import Status
 
 from items.gathering import get_pickaxe
 from utils.constants import ATTACK_REACH, PLACING_REACH
+from utils.querycache import get_key
 from world.observer import get_position_flat_center
 
+# Attributes that are not parameters of the condition, set by Behaviour and Condition
+CONDITION_BASE_ATTRIBUTES = {"id", "name", "blackboards", "qualified_name", "parent", "children", "logger",
+                             "feedback_message", "blackbox_level", "status", "iterator", "agent", "verification_key"}
+
 
 class Condition(Behaviour):
     def __init__(self, name, agent):
         super().__init__(name)
         self.agent = agent
+        self.verification_key = None
 
     def update(self):
         return Status.SUCCESS if self.verify() else Status.FAILURE
 
+    def get_verification_key(self):
+        # The class and the parameters, the same for conditions that verify the same thing
+        if self.verification_key is None:
+            parameters = sorted((name, get_key(value)) for name, value in vars(self).items()
+                                if name not in CONDITION_BASE_ATTRIBUTES)
+            self.verification_key = (type(self), tuple(parameters))
+        return self.verification_key
+
     def verify(self):
         raise NotImplementedError("Please Implement this method")
 
@@ -14,20 +14,79 @@ from items.gathering import get_gathering_tier_by_material, get_pickaxe
 from items.recipes import get_recipe, RecipeType
 from mobs.animals import get_loot_source
 from mobs.hunting import get_hunting_tool
-from utils.vectors import Direction
 
 
-def backward_chain(agent, condition, collaboration) -> Union[Selector, conditions.Condition]:
+def backward_chain(agent, condition, collaboration, expansions=None,
+                   lazy=False) -> Union[Selector, conditions.Condition]:
+    # With expansions, a condition that was expanded before gets the same subtree, which makes the tree a DAG
+    if expansions is not None and isinstance(condition, conditions.Condition):
+        key = (condition.get_verification_key(), collaboration)
+        if key not in expansions:
+            expansions[key] = expand(agent, condition, collaboration, expansions, lazy)
+        return expansions[key]
+    return expand(agent, condition, collaboration, expansions, lazy)
+
+
+def expand(agent, condition, collaboration, expansions=None, lazy=False):
+    # Lazily, the PPA is left for when the condition fails, unless it takes part in collaboration, where its senders
+    # and receivers run whether the condition holds or not
     ppa = condition_to_ppa_tree(condition)
     if ppa is not None:
-        new_pre_conditions = [backward_chain(agent, pc, collaboration) for pc in ppa.pre_conditions]
-        ppa.pre_conditions = new_pre_conditions
-        tree = ppa.as_tree(collaboration)
-        return tree
+        if lazy and not (collaboration and ppa.shareable):
+            return LazyExpansion(agent, condition, collaboration, expansions)
+        return chain_pre_conditions(agent, ppa, collaboration, expansions, lazy)
     else:
         return condition
 
 
+def chain_pre_conditions(agent, ppa, collaboration, expansions=None, lazy=False):
+    new_pre_conditions = [backward_chain(agent, pc, collaboration, expansions, lazy) for pc in ppa.pre_conditions]
+    ppa.pre_conditions = detach(new_pre_conditions)
+    tree = ppa.as_tree(collaboration)
+    return tree
+
+
+def detach(behaviours):
+    # Children for a new composite when subtrees are shared. py_trees only allows one parent, a shared subtree keeps
+    # the last one it is attached to, and a repeated child is left out since it would only be ticked once anyway
+    children = []
+    for behaviour in behaviours:
+        if all(behaviour is not child for child in children):
+            behaviour.parent = None
+            children.append(behaviour)
+    return children
+
+
+# Stands in for the PPA subtree of a condition, with the condition as its only child, until the condition fails for the
+# first time. Only then is the PPA back chained, one level deep with its pre-conditions lazy in turn, so that branches
+# for what the agent already has are never built.
+class LazyExpansion(Sequence):
+
+    def __init__(self, agent, condition, collaboration, expansions=None):
+        super().__init__(f"Lazy {condition.name}", children=[condition])
+        self.agent = agent
+        self.condition = condition
+        self.collaboration = collaboration
+        self.expansions = expansions
+        self.expanded = False
+
+    def tick(self):
+        self.expand_if_failing()
+        yield from super().tick()
+
+    def expand_if_failing(self):
+        if self.expanded or self.condition.verify():
+            return
+        self.expanded = True
+        self.condition.parent = None
+        self.current_child = None
+        ppa = condition_to_ppa_tree(self.condition)
+        tree = chain_pre_conditions(self.agent, ppa, self.collaboration, self.expansions, True)
+        tree.parent = self
+        tree.setup_with_descendants()
+        self.children = [tree]
+
+
 class PPA:
     name: str
     post_condition: conditions.Condition
@@ -144,7 +203,7 @@ class IsBlockObservablePPA(PPA):
         if condition.block == items.items.DIAMOND:
             self.actions = [actions.DigDownwardsToMaterial(self.agent, condition.block)]
         else:
-            self.actions = [actions.ExploreInDirection(self.agent, Direction.North)]
+            self.actions = [actions.ExploreFrontier(self.agent)]
 
 
 class IsAnimalWithinReachPPA(PPA):
@@ -169,7 +228,7 @@ class IsEnemyClosestToAgentsWithinReachPPA(PPA):
 class IsAnimalObservablePPA(PPA):
     def __init__(self, condition):
         super().__init__(condition, False)
-        self.actions = [actions.ExploreInDirection(self.agent, Direction.North)]
+        self.actions = [actions.ExploreFrontier(self.agent)]
 
 
 class HasNoEnemyNearbyPPA(PPA):
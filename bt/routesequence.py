@@ -0,0 +1,65 @@
+from py_trees.common import Status
+
+from bt.sequence import Sequence
+from goals.blueprint.blueprintvalidator import BlueprintValidator
+from multiagents.taskallocation import get_assignment_channel
+from utils.routes import get_route_order
+
+
+# Reactive sequence over the subtrees of the positions of a blueprint, that visits the positions in the order of a short
+# walk from where the agent is. The order is found again whenever a position is completed. With channels, positions
+# claimed by or assigned to other agents are left for last.
+class RouteSequence(Sequence):
+
+    def __init__(self, agent, blueprint, position_children, channels=None):
+        super().__init__(f"Route through {len(blueprint.positions)} positions", children=list(position_children))
+        self.agent = agent
+        self.blueprint = blueprint
+        self.position_children = list(position_children)
+        self.channels = channels
+        self.validator = BlueprintValidator(blueprint)
+        self.completed = None
+
+    def tick(self):
+        self.order_children()
+        yield from super().tick()
+
+    def order_children(self):
+        if self.agent.observation is None or self.agent.observer is None:
+            return
+        completed = tuple(self.validator.validate(self.agent.observation))
+        if completed == self.completed:
+            return
+        start = self.agent.observer.get_abs_pos_discrete()
+        if start is None:
+            return
+        self.completed = completed
+
+        remaining = [index for index, done in enumerate(completed) if not done]
+        if self.channels is not None:
+            blackboard = self.agent.blackboard.copy()
+            others = [index for index in remaining if self.is_for_other_agent(blackboard, self.channels[index])]
+            remaining = [index for index in remaining if index not in others]
+        else:
+            others = []
+        order = [remaining[index] for index in get_route_order(start, self.blueprint.positions[remaining])]
+        rest = others + [index for index, done in enumerate(completed) if done]
+        children = [self.position_children[index] for index in order + rest]
+        if children != self.children:
+            self.stop_overtaken_children(children)
+            self.children = children
+
+    def stop_overtaken_children(self, children):
+        # A running child that gets other children ahead of it is stopped, like a sequence stops the children it no
+        # longer reaches, so that it is initialised again when it is reached
+        ahead = set()
+        for child in self.children:
+            if child.status == Status.RUNNING:
+                new_ahead = {id(other) for other in children[:children.index(child)]}
+                if not new_ahead <= ahead:
+                    child.stop(Status.INVALID)
+            ahead.add(id(child))
+
+    def is_for_other_agent(self, blackboard, channel):
+        names = [blackboard.get(channel, False), blackboard.get(get_assignment_channel(channel), False)]
+        return any(name is not False and name != self.agent.name for name in names)
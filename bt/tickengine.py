@@ -0,0 +1,222 @@
+from py_trees.behaviour import Behaviour
+from py_trees.common import Status
+from py_trees.composites import Selector
+
+from bt.ppa import LazyExpansion
+from bt.routesequence import RouteSequence
+from bt.sequence import Sequence
+from bt.tickprofiler import TickProfiler
+
+BEHAVIOUR = 0  # Leaves with py_trees' own tick
+OTHER = 1  # Anything else, ticked through py_trees' generators
+SEQUENCE = 2
+ROUTE_SEQUENCE = 3
+SELECTOR = 4
+LAZY_EXPANSION = 5
+
+ROOT = 0
+# Looked up once, enum member access is slow
+RUNNING = Status.RUNNING
+SUCCESS = Status.SUCCESS
+FAILURE = Status.FAILURE
+INVALID = Status.INVALID
+# The child status that makes a composite stop going through its children, besides RUNNING
+settling_status = {SEQUENCE: FAILURE, ROUTE_SEQUENCE: FAILURE, SELECTOR: SUCCESS, LAZY_EXPANSION: FAILURE}
+# The status of a composite whose children all went through
+exhausted_status = {SEQUENCE: SUCCESS, ROUTE_SEQUENCE: SUCCESS, SELECTOR: FAILURE, LAZY_EXPANSION: SUCCESS}
+
+
+def get_kind(node):
+    if isinstance(node, RouteSequence):
+        return ROUTE_SEQUENCE
+    elif isinstance(node, LazyExpansion):
+        return LAZY_EXPANSION
+    elif isinstance(node, Sequence):
+        return SEQUENCE
+    elif type(node) is Selector and not node.memory:
+        return SELECTOR
+    elif type(node).tick is Behaviour.tick and type(node).stop is Behaviour.stop and not node.children:
+        return BEHAVIOUR
+    return OTHER
+
+
+def overrides(node, method):
+    # Whether the node does anything in the method, the base class versions do nothing
+    return getattr(type(node), method) is not getattr(Behaviour, method)
+
+
+# Ticks a tree the same way as root.tick_once(), with the same initialise, update and terminate calls, but without
+# py_trees' nested generators, debug logging and calls to methods that do nothing. The tree is flattened into lists of
+# node kinds and ranges of child indices, and composites are ticked iteratively with a stack. The statuses stay on the
+# behaviours, where py_trees' stop, tip and the tree printing read them. Composites that change their children, like
+# RouteSequence and LazyExpansion, are picked up when they are ticked next.
+#
+# Subtrees may be shared between parents, as in trees back chained with shared expansions. A shared node is ticked
+# once per tick, the parents that reach it again get the status it already has, and a parent that invalidates its
+# lower priority children leaves the ones that were ticked through another parent on this tick alone.
+class TickEngine:
+
+    def __init__(self, root, profile=False):
+        self.nodes = []
+        self.kinds = []
+        self.child_starts = []
+        self.child_ends = []
+        self.child_lists = []
+        self.child_indices = []
+        self.initialises = []
+        self.updates = []
+        self.terminates = []
+        self.ticks = []
+        self.indices = {}
+        self.tick_count = 0
+        self.profiler = TickProfiler(self.nodes) if profile else None
+        self.add(root)
+
+    def add(self, node):
+        index = len(self.nodes)
+        self.indices[id(node)] = index
+        self.nodes.append(node)
+        self.kinds.append(get_kind(node))
+        self.child_starts.append(0)
+        self.child_ends.append(0)
+        self.child_lists.append(None)
+        self.initialises.append(overrides(node, "initialise"))
+        self.updates.append(overrides(node, "update"))
+        self.terminates.append(overrides(node, "terminate"))
+        self.ticks.append(-1)
+        if self.kinds[index] >= SEQUENCE:
+            self.set_children(index)
+        return index
+
+    def set_children(self, index):
+        children = self.nodes[index].children
+        child_indices = [self.indices.get(id(child)) for child in children]
+        child_indices = [self.add(child) if child_index is None else child_index
+                         for child, child_index in zip(children, child_indices)]
+        start, end = self.child_starts[index], self.child_ends[index]
+        if len(child_indices) == end - start:
+            self.child_indices[start:end] = child_indices
+        else:
+            self.child_starts[index] = len(self.child_indices)
+            self.child_indices += child_indices
+            self.child_ends[index] = len(self.child_indices)
+        self.child_lists[index] = children
+
+    def enter(self, index, kind, node):
+        # Does what the composite's tick does before it ticks its first child
+        if kind == ROUTE_SEQUENCE:
+            node.order_children()
+        elif kind == LAZY_EXPANSION:
+            node.expand_if_failing()
+        if node.children is not self.child_lists[index] or \
+                len(node.children) != self.child_ends[index] - self.child_starts[index]:
+            self.set_children(index)
+        if node.status != RUNNING:
+            if kind == SELECTOR:
+                node.current_child = node.children[0] if node.children else None
+            if self.initialises[index]:
+                node.initialise()
+        if self.updates[index]:
+            node.update()
+
+    def settle(self, composite, position, end, status, previous):
+        # A child stopped the composite, lower priority children are invalidated if it wasn't the one last tick
+        child = self.nodes[self.child_indices[position]]
+        composite.current_child = child
+        composite.status = status
+        if previous is None or previous is not child:
+            for lower in self.child_indices[position + 1:end]:
+                if self.nodes[lower].status != INVALID:
+                    self.invalidate(lower)
+
+    def invalidate(self, index):
+        # node.stop(INVALID), except for the nodes another parent ticked on this tick
+        if self.ticks[index] == self.tick_count:
+            return
+        node = self.nodes[index]
+        kind = self.kinds[index]
+        if kind == OTHER:
+            node.stop(INVALID)
+            return
+        if kind >= SEQUENCE:
+            node.current_child = None
+            for child in node.children:
+                child_index = self.indices.get(id(child))
+                if child_index is None:
+                    child.stop(INVALID)
+                else:
+                    self.invalidate(child_index)
+        if self.terminates[index]:
+            node.terminate(INVALID)
+        node.status = INVALID
+
+    def tick(self):
+        nodes, kinds, child_indices = self.nodes, self.kinds, self.child_indices
+        initialises, terminates, ticks = self.initialises, self.terminates, self.ticks
+        self.tick_count += 1
+        tick_count = self.tick_count
+        profiler = self.profiler
+        frames = []  # [composite, position of the child being ticked, end of its children, previous current child]
+        index = ROOT
+        while True:
+            node = nodes[index]
+            kind = kinds[index]
+            if profiler is not None:
+                profiler.enter(index)
+            if ticks[index] == tick_count:
+                status = node.status
+            elif kind == BEHAVIOUR:
+                ticks[index] = tick_count
+                if node.status != RUNNING and initialises[index]:
+                    node.initialise()
+                status = node.update()
+                if type(status) is not Status:
+                    status = INVALID
+                if status != RUNNING and terminates[index]:
+                    # Behaviour.stop without its logging
+                    node.terminate(status)
+                node.status = status
+            elif kind == OTHER:
+                ticks[index] = tick_count
+                node.tick_once()
+                status = node.status
+            else:
+                ticks[index] = tick_count
+                self.enter(index, kind, node)
+                child_indices = self.child_indices
+                start, end = self.child_starts[index], self.child_ends[index]
+                if start < end:
+                    frames.append([index, start, end, node.current_child])
+                    index = child_indices[start]
+                    continue
+                node.current_child = None
+                if kind == SELECTOR:
+                    node.stop(FAILURE)
+                else:
+                    node.status = exhausted_status[kind]
+                status = node.status
+            if profiler is not None:
+                profiler.exit(status)
+
+            # Hand the status up until a composite goes on with its next child
+            while frames:
+                frame = frames[-1]
+                composite_index, position, end, previous = frame
+                composite = nodes[composite_index]
+                composite_kind = kinds[composite_index]
+                if status == RUNNING or status == settling_status[composite_kind]:
+                    self.settle(composite, position, end, status, previous)
+                else:
+                    position += 1
+                    if position < end:
+                        frame[1] = position
+                        break
+                    composite.status = exhausted_status[composite_kind]
+                    composite.current_child = nodes[child_indices[end - 1]]
+                frames.pop()
+                status = composite.status
+                if profiler is not None:
+                    profiler.exit(status)
+            else:
+                return
+            index = child_indices[frame[1]]
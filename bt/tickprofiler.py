@@ -0,0 +1,97 @@
+from pathlib import Path
+from time import perf_counter_ns
+
+from py_trees.common import Status
+
+from utils.file import save_data_safely
+
+PROFILES_PATH = Path("log/profiles")
+NS_PER_MS = 1_000_000
+NS_PER_US = 1_000
+STATUSES = [Status.SUCCESS, Status.FAILURE, Status.RUNNING, Status.INVALID]
+status_index = {status: index for index, status in enumerate(STATUSES)}
+
+
+def get_frame_name(node):
+    # Frames in collapsed stacks are separated by semicolons
+    return node.name.replace(";", ",")
+
+
+# Records, for every node the tick engine ticks, the number of ticks, the time spent in it and its subtree, the time
+# spent in it alone and the statuses it returned. The self time is also recorded per stack of nodes from the root, for
+# flame graphs. Nodes are identified by their index in the engine, shared nodes are profiled once for all their parents.
+# Everything is kept in lists by index and stacks get ids as they are first seen, to keep the ticks close to unprofiled.
+class TickProfiler:
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.calls = []
+        self.cumulative = []
+        self.self_time = []
+        self.statuses = []
+        self.stack_ids = {}  # (id of the parent stack, node index) -> stack id
+        self.stack_paths = []
+        self.stack_times = []
+        self.stack = []  # [index, stack id, start, time in children]
+
+    def enter(self, index):
+        parent = self.stack[-1][1] if self.stack else -1
+        stack_id = self.stack_ids.get((parent, index))
+        if stack_id is None:
+            stack_id = self.add_stack(parent, index)
+        self.stack.append([index, stack_id, perf_counter_ns(), 0])
+
+    def add_stack(self, parent, index):
+        stack_id = len(self.stack_paths)
+        self.stack_ids[(parent, index)] = stack_id
+        self.stack_paths.append((self.stack_paths[parent] if parent >= 0 else ()) + (index,))
+        self.stack_times.append(0)
+        while len(self.calls) <= index:
+            self.calls.append(0)
+            self.cumulative.append(0)
+            self.self_time.append(0)
+            self.statuses.append([0] * len(STATUSES))
+        return stack_id
+
+    def exit(self, status):
+        index, stack_id, start, children = self.stack.pop()
+        elapsed = perf_counter_ns() - start
+        own = elapsed - children
+        if self.stack:
+            self.stack[-1][3] += elapsed
+        self.calls[index] += 1
+        self.cumulative[index] += elapsed
+        self.self_time[index] += own
+        self.statuses[index][status_index[status]] += 1
+        self.stack_times[stack_id] += own
+
+    def get_rows(self):
+        # The nodes by the time spent in them alone, most first
+        indices = [index for index, calls in enumerate(self.calls) if calls > 0]
+        return sorted(indices, key=lambda index: self.self_time[index], reverse=True)
+
+    def get_table(self, limit=None):
+        header = f"{'node':<60} {'calls':>8} {'cumulative':>12} {'self':>12} {'self/call':>10}  " + \
+                 " ".join(f"{status.name:>8}" for status in STATUSES)
+        lines = [header]
+        for index in self.get_rows()[:limit]:
+            node = self.nodes[index]
+            calls = self.calls[index]
+            statuses = " ".join(f"{count:>8}" for count in self.statuses[index])
+            own = self.self_time[index]
+            lines.append(f"{node.name[:60]:<60} {calls:>8} {self.cumulative[index] / NS_PER_MS:>9.2f} ms "
+                         f"{own / NS_PER_MS:>9.2f} ms {own / calls / NS_PER_US:>7.1f} us  {statuses}")
+        return "\n".join(lines)
+
+    def get_collapsed_stacks(self):
+        # One line per stack with the self time in microseconds, the format flamegraph.pl and speedscope read
+        lines = []
+        for path, time in zip(self.stack_paths, self.stack_times):
+            frames = ";".join(get_frame_name(self.nodes[index]) for index in path)
+            lines.append(f"{frames} {time // NS_PER_US}")
+        return "\n".join(lines) + "\n"
+
+
+def save_profile(profiler, name):
+    save_data_safely(PROFILES_PATH / f"{name}.txt", lambda file: file.write(profiler.get_table() + "\n"))
+    save_data_safely(PROFILES_PATH / f"{name}.folded", lambda file: file.write(profiler.get_collapsed_stacks()))
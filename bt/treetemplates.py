@@ -0,0 +1,87 @@
+import copyreg
+import hashlib
+import io
+import pickle
+
+from py_trees.behaviour import Behaviour
+
+from bt.back_chain_tree import BackChainTree
+from malmoutils.agent import MinerAgent
+from malmoutils.interface import MalmoInterface
+from malmoutils.recording import ReplayAgentHost
+
+# The references to the agent in a template, bound to the agent the tree is instantiated for
+AGENT = "agent"
+BLACKBOARD = "blackboard"
+
+templates = {}
+
+
+def restore_behaviour(behaviour, state):
+    behaviour.__dict__.update(state)
+    behaviour.iterator = behaviour.tick()
+
+
+# Pickles a tree as it is, with its shared subtrees, so that instantiating it calls no constructors. The agent and its
+# blackboard are stored as references to bind, and the generators py_trees keeps but never reads are made again on
+# loading. Names and channels derived from the role are kept, templates are per role.
+class TemplatePickler(pickle.Pickler):
+    def __init__(self, file, agent):
+        super().__init__(file)
+        self.references = {id(agent): AGENT, id(agent.blackboard): BLACKBOARD}
+
+    def persistent_id(self, obj):
+        return self.references.get(id(obj))
+
+    def reducer_override(self, obj):
+        if isinstance(obj, Behaviour):
+            state = {k: v for k, v in obj.__dict__.items() if k != "iterator"}
+            return copyreg.__newobj__, (type(obj),), state, None, None, restore_behaviour
+        return NotImplemented
+
+
+class TemplateUnpickler(pickle.Unpickler):
+    def __init__(self, file, agent):
+        super().__init__(file)
+        self.references = {AGENT: agent, BLACKBOARD: agent.blackboard}
+
+    def persistent_load(self, pid):
+        return self.references[pid]
+
+
+def get_template_key(mission_data, role):
+    # Everything the back chained tree depends on besides the agent and its blackboard
+    tree_settings = (mission_data.lazy_expansion, mission_data.shared_subtrees and mission_data.compiled_ticks)
+    agent_name = mission_data.agent_names[role]
+    goals = pickle.dumps((mission_data.goals, mission_data.cooperativity, role, agent_name, tree_settings))
+    return hashlib.sha1(goals).hexdigest()
+
+
+def build_template(mission_data, role):
+    agent = MinerAgent(mission_data, {}, role, MalmoInterface(ReplayAgentHost(), realtime=False))
+    tree = BackChainTree(agent, mission_data.goals, mission_data.cooperativity)
+    file = io.BytesIO()
+    TemplatePickler(file, agent).dump(tree.root)
+    return file.getvalue()
+
+
+def get_template(mission_data, role):
+    # Built once per process and kept in memory only, so that a template never outlives the code it was built from
+    key = get_template_key(mission_data, role)
+    if key not in templates:
+        templates[key] = build_template(mission_data, role)
+    return templates[key]
+
+
+def instantiate_tree(agent, template):
+    root = TemplateUnpickler(io.BytesIO(template), agent).load()
+    return BackChainTree.from_root(agent, root)
+
+
+def get_tree(agent, template=None):
+    mission_data = agent.mission_data
+    if not mission_data.tree_templates:
+        return BackChainTree(agent, mission_data.goals, mission_data.cooperativity)
+    if template is None:
+        template = get_template(mission_data, agent.role)
+    return instantiate_tree(agent, template)
@@ -0,0 +1,150 @@
+import json
+import subprocess
+import time
+import types
+from pathlib import Path
+
+import numpy as np
+
+from experiment import experiments
+from items import items
+from malmoutils.agent import MinerAgent
+from malmoutils.interface import MalmoInterface
+from malmoutils.world_state import TimestampedText
+from mobs import animals, enemies
+from multiagents.cooperativity import Cooperativity
+from simulator.agenthost import SimulatedAgentHost
+from simulator.world import VoxelWorld
+from utils.names import NAMES
+from world.missiondata import MissionData
+from world.observation import Observation
+
+BASELINE_COMMIT = "c942463"
+BENCHMARK_REPEATS = 50
+GROUND_LAYERS = 2
+GROUND_BLOCKS = [items.GRASS, items.DIRT, items.STONE, items.COAL_ORE]
+GROUND_WEIGHTS = [0.6, 0.3, 0.09, 0.01]
+INVENTORY_SIZE = 41
+
+
+def get_baseline_module(path):
+    # The module as it was in the baseline commit, so that benchmarks time the original code rather than a copy of it
+    source = subprocess.run(["git", "show", f"{BASELINE_COMMIT}:{path}"], cwd=Path(__file__).parent.parent,
+                            capture_output=True, text=True, check=True).stdout
+    module = types.ModuleType(f"baseline_{Path(path).stem}")
+    exec(compile(source, f"{BASELINE_COMMIT}:{path}", "exec"), module.__dict__)
+    return module
+
+
+def get_mission_data(experiment=experiments.experiment_flat_world, n_agents=1):
+    return MissionData(experiment, Cooperativity.INDEPENDENT, True, n_agents)
+
+
+def get_experiment(world_generator, start_position, start_inventory=None):
+    # A single agent experiment without goals, the benchmarks drive the agent themselves
+    return experiments.Experiment("benchmark", "Benchmark", world_generator, [], [start_position], [],
+                                  start_inventory if start_inventory is not None else [])
+
+
+def get_simulated_mission_data(experiment, cooperativity=Cooperativity.INDEPENDENT, **settings):
+    # Mission data of a simulated run, with the settings overriding the defaults of MissionData
+    mission_data = MissionData(experiment, cooperativity, True)
+    mission_data.simulated = True
+    for name, value in settings.items():
+        setattr(mission_data, name, value)
+    return mission_data
+
+
+def get_simulated_agent(mission_data, role=0):
+    # An agent in a simulated world that is stepped by the caller rather than by its own thread
+    world = VoxelWorld(mission_data, wait_for_agents=False)
+    host = SimulatedAgentHost(mission_data)
+    host.world = world
+    host.role = role
+    world.start_agent(role)
+    return world, host, MinerAgent(mission_data, {}, role, MalmoInterface(host, realtime=False))
+
+
+def observe(world, host, agent):
+    # Steps the world by a tick and hands its observation to the agent, returns the text of the observation
+    world.step()
+    observations = host.getWorldState().observations
+    agent.set_observation(Observation(observations, agent.mission_data))
+    return observations[-1].text if observations else None
+
+
+def print_seed_results(title, results):
+    # Results per seed of every variant, with their means
+    print(f"  {title}")
+    for name, values in results.items():
+        print(f"    {name:<20} {values}  mean {np.mean(values):.0f}")
+
+
+def get_synthetic_grid(grid_size, rng, log_density):
+    # Laid out in Malmo's order, x fastest then z then y
+    size_x, size_y, size_z = grid_size
+    ground_layers = min(GROUND_LAYERS, size_y - 1)
+    ground = rng.choice(GROUND_BLOCKS, size=(ground_layers, size_z, size_x), p=GROUND_WEIGHTS)
+    above = np.where(rng.random((size_y - ground_layers, size_z, size_x)) < log_density, items.LOG, items.AIR)
+    return np.concatenate([ground, above]).ravel().tolist()
+
+
+def get_synthetic_entities(position, rng, n_entities):
+    names = items.pickups + animals.types + enemies.types + NAMES
+    offsets = rng.uniform(-30, 30, size=(n_entities, 3))
+    offsets[:, 1] = 0
+    return [
+        {"name": str(rng.choice(names)), "x": x, "y": y, "z": z, "life": 10.0}
+        for x, y, z in (np.array(position) + offsets).tolist()
+    ]
+
+
+def get_synthetic_inventory(rng):
+    inventory = {"inventoriesAvailable": [{"name": "inventory", "size": INVENTORY_SIZE}], "currentItemIndex": 0}
+    for slot in range(INVENTORY_SIZE):
+        item = str(rng.choice([items.AIR, items.LOG, items.PLANKS, items.STICKS, items.COBBLESTONE]))
+        inventory[f"InventorySlot_{slot}_item"] = item
+        inventory[f"InventorySlot_{slot}_size"] = 0 if item == items.AIR else int(rng.integers(1, 64))
+    return inventory
+
+
+def get_synthetic_info(mission_data, position, seed=0, log_density=0.01, n_entities=10):
+    rng = np.random.default_rng(seed)
+    info = {
+        "Name": mission_data.agent_names[0],
+        "Life": 20.0,
+        "XPos": position[0] + 0.5,
+        "YPos": float(position[1]),
+        "ZPos": position[2] + 0.5,
+        "Yaw": 90.0,
+        "Pitch": 18.0,
+        "LineOfSight": {"type": items.GRASS, "hitType": "block", "x": position[0] + 2.5, "y": float(position[1]),
+                        "z": position[2] + 0.5},
+        "entities": get_synthetic_entities(position, rng, n_entities),
+        mission_data.grid_local.name: get_synthetic_grid(mission_data.grid_local.get_grid_size(), rng, log_density)
+    }
+    info.update(get_synthetic_inventory(rng))
+    for grid_spec in mission_data.grids_global:
+        info[grid_spec.name] = get_synthetic_grid(grid_spec.get_grid_size(), rng, log_density)
+    return info
+
+
+def get_synthetic_observations(mission_data, position, seed=0, log_density=0.01, n_entities=10):
+    info = get_synthetic_info(mission_data, position, seed, log_density, n_entities)
+    return [TimestampedText(json.dumps(info, separators=(",", ":")))]
+
+
+def time_function(function, repeats=BENCHMARK_REPEATS):
+    function()
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats
+
+
+def print_timings(title, timings, baseline=None):
+    print(title)
+    baseline_time = timings[baseline] if baseline is not None else None
+    for name, seconds in timings.items():
+        speedup = f"  x{baseline_time / seconds:.1f}" if baseline_time is not None and name != baseline else ""
+        print(f"    {name:<40} {1000 * seconds:10.3f} ms{speedup}")
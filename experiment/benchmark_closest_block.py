@@ -0,0 +1,57 @@
+import numpy as np
+
+from experiment.benchmark import time_function, print_timings
+from world.shells import shell_orders
+
+GRID_SIZE = (81, 7, 81)
+CENTER = [40, 2, 40]
+DENSITIES = {"empty": 0, "sparse": 0.0005, "ores": 0.01, "forest": 0.1, "dense": 0.5}
+SCENARIO_SEEDS = 50
+
+
+def get_closest_offset_argwhere(hits, center):
+    # How get_closest_block found the closest hit before, a norm to every hit
+    positions = np.argwhere(hits)
+    if positions.size == 0:
+        return None
+    distances_vector = positions - center
+    distances = np.linalg.norm(distances_vector, axis=1)
+    closest_vectors = distances_vector[(distances == min(distances))]
+    closest_vectors_same_height = closest_vectors[(closest_vectors[:, 1] == 0)]
+    return closest_vectors_same_height[0] if closest_vectors_same_height.size > 0 else closest_vectors[0]
+
+
+def get_closest_offset_shells(hits, center):
+    return shell_orders.get(hits, center).get_closest_offset(hits)
+
+
+def get_hits(density, seed):
+    # Laid out like the observed grids, x fastest then z then y
+    size_x, size_y, size_z = GRID_SIZE
+    hits = np.random.default_rng(seed).random((size_y, size_z, size_x)) < density
+    return np.transpose(hits, (2, 0, 1))
+
+
+def check_closest_offsets():
+    for density in DENSITIES.values():
+        for seed in range(SCENARIO_SEEDS):
+            for hits in [get_hits(density, seed), np.ascontiguousarray(get_hits(density, seed))]:
+                expected = get_closest_offset_argwhere(hits, CENTER)
+                result = get_closest_offset_shells(hits, CENTER)
+                assert (expected is None and result is None) or np.array_equal(expected, result), (density, seed)
+
+
+def benchmark_closest_block():
+    check_closest_offsets()
+    for name, density in DENSITIES.items():
+        hits = get_hits(density, 0)
+        timings = {
+            "argwhere and norms (before)": time_function(lambda: get_closest_offset_argwhere(hits, CENTER)),
+            "distance ordered shells": time_function(lambda: get_closest_offset_shells(hits, CENTER)),
+        }
+        print_timings(f"Closest hit in a {GRID_SIZE} grid, {name} ({np.count_nonzero(hits)} hits)", timings,
+                      "argwhere and norms (before)")
+
+
+if __name__ == '__main__':
+    benchmark_closest_block()
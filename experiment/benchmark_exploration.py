@@ -0,0 +1,51 @@
+import numpy as np
+
+from experiment.benchmark import get_experiment, get_simulated_mission_data, get_simulated_agent, observe, \
+    print_seed_results
+from items import items
+from world.worldgenerator import CustomWorldGenerator, Cuboid
+
+SEEDS = [str(seed) for seed in range(1, 7)]
+MAX_TICKS = 2000
+TARGET_DISTANCES = (50, 80)
+FLAT_GROUND_HEIGHT = 9
+CUBOID_SIZE = 2
+START_POSITION = [0, 10, 0]
+
+
+def get_target_position(seed, height):
+    # Somewhere around the start at the origin, too far to be seen from there
+    rng = np.random.default_rng(int(seed))
+    angle = rng.uniform(0, 2 * np.pi)
+    distance = rng.uniform(*TARGET_DISTANCES)
+    return np.array([distance * np.cos(angle), height, distance * np.sin(angle)]).round()
+
+
+def get_cuboid_world(block, seed):
+    position = get_target_position(seed, FLAT_GROUND_HEIGHT).astype(int)
+    return CustomWorldGenerator([Cuboid(block, np.array([position, position + CUBOID_SIZE]))], seed)
+
+
+def get_ticks_to_observe(seed, frontier_exploration):
+    # Simulated ticks the agent explores for until it sees the logs, MAX_TICKS when it never does
+    experiment = get_experiment(get_cuboid_world(items.LOG, seed), START_POSITION)
+    mission_data = get_simulated_mission_data(experiment, frontier_exploration=frontier_exploration)
+    world, host, agent = get_simulated_agent(mission_data)
+    for tick in range(MAX_TICKS):
+        observe(world, host, agent)
+        if agent.observer is not None and agent.observer.is_block_observable(items.LOG):
+            return tick
+        agent.explore_frontier()
+    return MAX_TICKS
+
+
+def benchmark_exploration():
+    print(f"Ticks until found, per seed, at most {MAX_TICKS}")
+    print_seed_results("logs, flat world", {
+        "explore north": [get_ticks_to_observe(seed, False) for seed in SEEDS],
+        "explore frontier": [get_ticks_to_observe(seed, True) for seed in SEEDS],
+    })
+
+
+if __name__ == '__main__':
+    benchmark_exploration()
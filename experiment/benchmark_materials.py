@@ -0,0 +1,56 @@
+import numpy as np
+
+from experiment.benchmark import time_function, print_timings, get_synthetic_inventory
+from items import items
+from items.gathering import get_ore
+from items.inventory import Inventory
+from items.items import get_variants
+from items.materials import materials
+from world.palette import block_palette
+
+MATERIALS = [items.LOG, items.STONE, items.COAL, items.FENCE, items.DIRT, items.DIAMOND]
+REPEATS = 1000
+
+
+def get_material_lookup_before(material):
+    variants = get_variants(material)
+    ores = [ore for ore in (get_ore(variant) for variant in variants) if ore is not None]
+    return block_palette.get_lookup(variants + ores)
+
+
+def get_item_amount_before(inventory, item):
+    variants = get_variants(item)
+    return sum(slot.amount for slot in inventory if slot.item in variants)
+
+
+def check_materials(inventory):
+    for material in MATERIALS:
+        assert np.array_equal(get_material_lookup_before(material), materials.get(material).block_lookup), material
+        assert np.array_equal(block_palette.get_lookup(get_variants(material)), materials.get(material).variant_lookup)
+        assert get_item_amount_before(inventory, material) == inventory.get_item_amount(material), material
+
+
+def time_materials(function):
+    return time_function(lambda: [function(material) for material in MATERIALS], REPEATS) / len(MATERIALS)
+
+
+def benchmark_materials():
+    inventory = Inventory(get_synthetic_inventory(np.random.default_rng(0)))
+    check_materials(inventory)
+    print_timings("Block lookup of a material", {
+        "variants, ores and lookup (before)": time_materials(get_material_lookup_before),
+        "material registry": time_materials(lambda material: materials.get(material).block_lookup),
+    }, "variants, ores and lookup (before)")
+    print_timings("Block lookup of a block's variants", {
+        "variants and lookup (before)": time_materials(lambda material: block_palette.get_lookup(
+            get_variants(material))),
+        "material registry": time_materials(lambda material: materials.get(material).variant_lookup),
+    }, "variants and lookup (before)")
+    print_timings("Amount of an item in the inventory", {
+        "variant list (before)": time_materials(lambda material: get_item_amount_before(inventory, material)),
+        "material registry": time_materials(lambda material: inventory.get_item_amount(material)),
+    }, "variant list (before)")
+
+
+if __name__ == '__main__':
+    benchmark_materials()
@@ -0,0 +1,37 @@
+from experiment.benchmark import get_baseline_module, get_mission_data, get_synthetic_observations, time_function, \
+    print_timings
+from world.observation import Observation
+
+
+def parse_steering(observations, mission_data):
+    observation = Observation(observations, mission_data)
+    return observation.abs_pos, observation.yaw, observation.pitch
+
+
+def parse_navigation(observations, mission_data):
+    observation = Observation(observations, mission_data)
+    return observation.abs_pos, observation.yaw, observation.pitch, observation.grid_local
+
+
+def parse_everything(observations, mission_data):
+    observation = Observation(observations, mission_data)
+    grids_global = [observation.get_grid_global(grid_spec) for grid_spec in mission_data.grids_global]
+    return observation.abs_pos, observation.yaw, observation.los_pos, observation.grid_local, \
+        observation.inventory, observation.entities, grids_global
+
+
+def benchmark_observation_parsing():
+    mission_data = get_mission_data()
+    observations = get_synthetic_observations(mission_data, [130, 10, 9])
+    baseline = get_baseline_module("world/observation.py")
+    timings = {
+        "baseline": time_function(lambda: baseline.Observation(observations, mission_data)),
+        "steering only": time_function(lambda: parse_steering(observations, mission_data)),
+        "steering and local grid": time_function(lambda: parse_navigation(observations, mission_data)),
+        "every field": time_function(lambda: parse_everything(observations, mission_data)),
+    }
+    print_timings("Per tick observation parse time", timings, "baseline")
+
+
+if __name__ == '__main__':
+    benchmark_observation_parsing()
@@ -0,0 +1,68 @@
+import numpy as np
+
+from bt.actions import DigDownwardsToMaterial
+from experiment.benchmark import get_experiment, get_simulated_mission_data, get_simulated_agent, observe, \
+    print_seed_results
+from items import items
+from world.worldgenerator import DefaultWorldGenerator, CustomWorldGenerator, Cuboid
+
+SEEDS = [str(seed) for seed in range(1, 9)]
+MATERIALS = [items.IRON_ORE, items.DIAMOND]
+MAX_TICKS = 6000
+START_POSITION = [0, 72, 0]
+PICKAXE_SLOT = 0
+
+# A stone plateau with a few diamond ores at the height they are searched at, out of view of the shaft under the start
+PLATEAU_RADIUS = 128
+PLATEAU_TOP = 40
+SPARSE_ORE_HEIGHT = 12
+SPARSE_ORE_DISTANCE = 64
+SPARSE_START_POSITION = [0, PLATEAU_TOP + 1, 0]
+SPARSE_SEEDS = SEEDS[:4]
+SPARSE_MAX_TICKS = 3000
+
+
+def get_sparse_ore_world(seed):
+    # One diamond ore in every direction from the start, at a seeded offset to the side
+    side = np.random.default_rng(int(seed)).integers(-SPARSE_ORE_DISTANCE // 2, SPARSE_ORE_DISTANCE // 2, size=4)
+    positions = [[SPARSE_ORE_DISTANCE, SPARSE_ORE_HEIGHT, side[0]], [-SPARSE_ORE_DISTANCE, SPARSE_ORE_HEIGHT, side[1]],
+                 [side[2], SPARSE_ORE_HEIGHT, SPARSE_ORE_DISTANCE], [side[3], SPARSE_ORE_HEIGHT, -SPARSE_ORE_DISTANCE]]
+    plateau = Cuboid(items.STONE, np.array([[-PLATEAU_RADIUS, 1, -PLATEAU_RADIUS],
+                                            [PLATEAU_RADIUS, PLATEAU_TOP, PLATEAU_RADIUS]]))
+    ores = [Cuboid(items.DIAMOND_ORE, np.array([position, position])) for position in positions]
+    return CustomWorldGenerator([plateau] + ores, seed)
+
+
+def get_ticks_to_find(world_generator, start_position, material, ore_search, max_ticks=MAX_TICKS):
+    # Simulated ticks until the material is in the agent's observation grid, max_ticks when it never is
+    experiment = get_experiment(world_generator, start_position, [(items.DIAMOND_PICKAXE, PICKAXE_SLOT)])
+    mission_data = get_simulated_mission_data(experiment, ore_search=ore_search)
+    world, host, agent = get_simulated_agent(mission_data)
+    action = DigDownwardsToMaterial(agent, material)
+    for tick in range(max_ticks):
+        observe(world, host, agent)
+        if agent.observer is not None and agent.observer.get_closest_block(material) is not None:
+            return tick
+        if agent.observer is not None:
+            action.update()
+    return max_ticks
+
+
+def benchmark_ore_search():
+    print(f"Ticks until found, per seed, at most {MAX_TICKS}")
+    for material in MATERIALS:
+        print_seed_results(f"{material}, default world", {
+            name: [get_ticks_to_find(DefaultWorldGenerator(seed=seed), START_POSITION, material, ore_search)
+                   for seed in SEEDS] for name, ore_search in [("dig downwards", False), ("ore search", True)]
+        })
+    # Only branch mining at the search height finds ore that is not in view from the shaft
+    print(f"Ticks until found, per seed, at most {SPARSE_MAX_TICKS}")
+    print_seed_results(f"{items.DIAMOND}, sparse ore", {
+        name: [get_ticks_to_find(get_sparse_ore_world(seed), SPARSE_START_POSITION, items.DIAMOND, ore_search,
+                                 SPARSE_MAX_TICKS) for seed in SPARSE_SEEDS]
+        for name, ore_search in [("dig downwards", False), ("ore search", True)]
+    })
+
+
+if __name__ == '__main__':
+    benchmark_ore_search()
@@ -0,0 +1,115 @@
+import numpy as np
+
+from experiment.benchmark import time_function, print_timings, get_experiment, get_simulated_mission_data, \
+    get_simulated_agent, observe, print_seed_results
+from items import items
+from items.gathering import GatheringTier
+from utils.vectors import flatten
+from world.palette import block_palette
+from world.pathplanner import PathPlanner, Route
+from world.worldgenerator import CustomWorldGenerator, Cuboid, DefaultWorldGenerator
+from world.worldmap import WorldMap
+
+WORLD_SIZE = (160, 16, 160)
+WORLD_ORIGIN = np.array([0, 0, 0])
+GROUND_HEIGHT = 8
+WALL_SPACING = 8
+WALL_HEIGHT = 3
+GAP_DENSITY = 0.1
+DISTANCES = [16, 32, 64]
+START = np.array([40, GROUND_HEIGHT, 40])
+
+# Simulated agents walking to a position, with cobblestone walls with a gap in them across the way
+SEEDS = [str(seed) for seed in range(1, 7)]
+MAX_TICKS = 4000
+FLAT_START, FLAT_TARGET = [100.5, 10, 0.5], [170.5, 10, 0.5]
+DEFAULT_START, DEFAULT_TARGET = [0.5, 72, 0.5], [60.5, 72, 20.5]
+MISSION_WALLS_X = range(110, 160, 12)
+MISSION_WALL_HALF_WIDTH = 30
+MISSION_WALL_Y = (10, 12)
+MISSION_GAP_OFFSET = 12
+MISSION_GAP_WIDTH = 2
+
+
+def get_world(wall_block, seed=0):
+    # Flat stone ground with walls across the way every WALL_SPACING blocks, with a few gaps in them
+    rng = np.random.default_rng(seed)
+    world = np.full(WORLD_SIZE, block_palette.get_code(items.AIR), dtype=int)
+    world[:, :GROUND_HEIGHT, :] = block_palette.get_code(items.STONE)
+    if wall_block is not None:
+        for x in range(START[0] + WALL_SPACING // 2, WORLD_SIZE[0], WALL_SPACING):
+            wall = np.where(rng.random(WORLD_SIZE[2]) < GAP_DENSITY, block_palette.get_code(items.AIR),
+                            block_palette.get_code(wall_block))
+            world[x, GROUND_HEIGHT:GROUND_HEIGHT + WALL_HEIGHT, :] = wall[np.newaxis, :]
+    world_map = WorldMap()
+    world_map.update(world.astype(np.uint16), WORLD_ORIGIN)
+    return world_map
+
+
+def follow_route(route):
+    # The per tick work of an agent walking along a route, a few ticks per block
+    for position in route.positions:
+        for _ in range(3):
+            route.needs_replanning(position, route.goal, route.tier)
+            route.get_waypoint(position + [0.5, 0, 0.5])
+
+
+def get_walled_world(seed):
+    rng = np.random.default_rng(int(seed))
+    cuboids = []
+    for x in MISSION_WALLS_X:
+        gap = int(rng.integers(-MISSION_GAP_OFFSET, MISSION_GAP_OFFSET))
+        for z_range in [(-MISSION_WALL_HALF_WIDTH, gap - 1), (gap + MISSION_GAP_WIDTH, MISSION_WALL_HALF_WIDTH)]:
+            cuboids.append(Cuboid(items.COBBLESTONE, np.array([[x, MISSION_WALL_Y[0], z_range[0]],
+                                                               [x, MISSION_WALL_Y[1], z_range[1]]])))
+    return CustomWorldGenerator(cuboids, seed)
+
+
+def get_ticks_to_reach(world_generator, start, target, path_planning):
+    # Simulated ticks until the agent stands in the target's column, MAX_TICKS when it never does
+    mission_data = get_simulated_mission_data(get_experiment(world_generator, start), path_planning=path_planning)
+    world, host, agent = get_simulated_agent(mission_data)
+    target = np.array(target)
+    for tick in range(MAX_TICKS):
+        observe(world, host, agent)
+        if agent.observer is None:
+            continue
+        if np.linalg.norm(flatten(agent.observation.abs_pos - target)) < 1:
+            return tick
+        agent.go_to_position(target)
+    return MAX_TICKS
+
+
+def benchmark_missions():
+    print(f"Ticks to walk to a position, per seed, at most {MAX_TICKS}")
+    scenarios = [
+        ("flat world", lambda seed: CustomWorldGenerator([], seed), FLAT_START, FLAT_TARGET),
+        ("default world", lambda seed: DefaultWorldGenerator(seed=seed), DEFAULT_START, DEFAULT_TARGET),
+        ("cobblestone walls", get_walled_world, FLAT_START, FLAT_TARGET),
+    ]
+    for name, get_world_generator, start, target in scenarios:
+        print_seed_results(name, {
+            label: [get_ticks_to_reach(get_world_generator(seed), start, target, path_planning) for seed in SEEDS]
+            for label, path_planning in [("straight steering", False), ("planned routes", True)]
+        })
+
+
+def benchmark_pathplanner():
+    for name, wall_block in [("open ground", None), ("stone walls", items.STONE), ("fences", items.FENCE)]:
+        world_map = get_world(wall_block)
+        planner = PathPlanner(world_map)
+        timings = {}
+        for distance in DISTANCES:
+            goal = START + [distance, 0, distance // 4]
+            route = planner.plan(START, goal, GatheringTier.STONE)
+            assert route.reached, (name, distance)
+            timings[f"plan over {distance} blocks"] = time_function(
+                lambda: planner.plan(START, goal, GatheringTier.STONE), repeats=5)
+            timings[f"follow {len(route.positions)} steps, 3 ticks each"] = time_function(lambda: follow_route(
+                Route(route.positions, route.goal, route.reached, route.tier, world_map)), repeats=5)
+        print_timings(f"Path planning, {name}", timings)
+
+
+if __name__ == '__main__':
+    benchmark_pathplanner()
+    benchmark_missions()
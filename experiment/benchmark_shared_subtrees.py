@@ -0,0 +1,73 @@
+import time
+
+from bt.back_chain_tree import BackChainTree
+from bt.tickengine import TickEngine
+from experiment import experiments
+from experiment.benchmark import time_function, get_simulated_mission_data, get_simulated_agent, observe
+from items import items
+from malmoutils.agent import MinerAgent
+from malmoutils.interface import MalmoInterface
+from malmoutils.recording import ReplayAgentHost
+from multiagents.cooperativity import Cooperativity
+
+COOPERATIVITIES = [Cooperativity.INDEPENDENT, Cooperativity.COOPERATIVE_WITH_CATCHUP]
+SIMULATED_TICKS = 500
+BUILD_REPEATS = 10
+
+
+def get_experiments():
+    return [experiment for experiment in vars(experiments).values() if isinstance(experiment, experiments.Experiment)]
+
+
+def get_tree(mission_data):
+    agent = MinerAgent(mission_data, {}, 0, MalmoInterface(ReplayAgentHost(), realtime=False))
+    return BackChainTree(agent, mission_data.goals, mission_data.cooperativity)
+
+
+def get_node_counts(tree):
+    # Nodes reached from the root and distinct node objects, the same for trees without shared subtrees
+    return sum(1 for _ in tree.root.iterate()), len(TickEngine(tree.root).nodes)
+
+
+def get_simulated_tick_time(mission_data):
+    # Mean time of a tick over a simulated run, with the tree in the states the mission takes it through
+    world, host, agent = get_simulated_agent(mission_data)
+    tree = BackChainTree(agent, mission_data.goals, mission_data.cooperativity)
+    total = 0
+    for _ in range(SIMULATED_TICKS):
+        observe(world, host, agent)
+        start = time.perf_counter()
+        tree.tick()
+        total += time.perf_counter() - start
+    return total / SIMULATED_TICKS, get_items(agent.inventory)
+
+
+def get_items(inventory):
+    amounts = {}
+    for slot in inventory if inventory is not None else []:
+        if slot.amount > 0 and slot.item != items.AIR:
+            amounts[slot.item] = amounts.get(slot.item, 0) + slot.amount
+    return dict(sorted(amounts.items()))
+
+
+def benchmark_shared_subtrees():
+    print(f"{'':<50} {'reached':>8} {'distinct':>9} {'build':>10} {'tick':>10}")
+    for experiment in get_experiments():
+        for cooperativity in COOPERATIVITIES:
+            print(f"{experiment.name}, {cooperativity.name}")
+            for shared_subtrees in [False, True]:
+                mission_data = get_simulated_mission_data(experiment, cooperativity, shared_subtrees=shared_subtrees)
+                try:
+                    reached, distinct = get_node_counts(get_tree(mission_data))
+                except Exception as exception:
+                    print(f"    {'':<46} failed to build: {exception!r}")
+                    break
+                build_time = time_function(lambda: get_tree(mission_data), repeats=BUILD_REPEATS)
+                tick_time, inventory = get_simulated_tick_time(mission_data)
+                name = "shared subtrees" if shared_subtrees else "copied subtrees"
+                print(f"    {name:<46} {reached:>8} {distinct:>9} {build_time * 1000:>7.2f} ms "
+                      f"{tick_time * 1000:>7.3f} ms  after {SIMULATED_TICKS} ticks: {inventory}")
+
+
+if __name__ == '__main__':
+    benchmark_shared_subtrees()
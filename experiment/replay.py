@@ -0,0 +1,16 @@
+import sys
+from pathlib import Path
+
+from malmoutils.recording import RECORDINGS_PATH, replay_recording
+from utils.file import get_project_root
+
+
+def get_latest_recording():
+    recordings = [path for path in (get_project_root() / RECORDINGS_PATH).iterdir() if path.is_dir()]
+    return max(recordings, key=lambda path: path.stat().st_mtime) if recordings else None
+
+
+if __name__ == '__main__':
+    recording_path = Path(sys.argv[1]) if len(sys.argv) > 1 else get_latest_recording()
+    print(f"Replaying {recording_path}")
+    replay_recording(recording_path).print()
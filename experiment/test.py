@@ -71,14 +71,31 @@ def run_variable_delta_tests():
     save_output(output, experiment, "delta")
 
 
-def run_tests(experiment, cooperativities, n_agents_range, n_test_runs=15):
+def run_task_allocation_tests(n_test_runs=15, simulated=False):
+    # Cooperative agents claiming blueprint positions in order, against positions assigned by the task allocator
+    experiment = experiments.experiment_flat_world
+    experiment.goals = [Blueprint.get_blueprint(BlueprintType.PointGrid, [130, 9, 9], 25)]
+    n_agents = 3
+    output = ["task_allocation,agents,internal_id,time"]
+    run = 0
+    for task_allocation in [False, True]:
+        for i in range(n_test_runs):
+            completion_time, _ = run_test(Cooperativity.COOPERATIVE, experiment, n_agents, simulated=simulated,
+                                          task_allocation=task_allocation)
+            output.append(f"{run},{task_allocation},{n_agents},{i},{completion_time}")
+            print(output)
+            run += 1
+    save_output(output, experiment, "task_allocation")
+
+
+def run_tests(experiment, cooperativities, n_agents_range, n_test_runs=15, simulated=False):
     output = ["collaborative,agents,internal_id,time,alive_agents"]
     run = 0
     start_time = time.time()
     for n_agents in n_agents_range:
         for cooperativity in cooperativities:
             for i in range(n_test_runs):
-                completion_time, alive_agents = run_test(cooperativity, experiment, n_agents)
+                completion_time, alive_agents = run_test(cooperativity, experiment, n_agents, simulated=simulated)
                 collaborative = cooperativity_to_collaborative[cooperativity]
                 output.append(f"{run},{collaborative},{n_agents},{i},{completion_time},{alive_agents}")
                 print(output)
@@ -87,10 +104,14 @@ def run_tests(experiment, cooperativities, n_agents_range, n_test_runs=15):
     save_output(output, experiment)
 
 
-def run_test(cooperativity, experiment, n_agents, on_value=None):
+def run_test(cooperativity, experiment, n_agents, on_value=None, record_observations=False, simulated=False,
+             task_allocation=False):
     exp_time = time.time()
-    print(f"Starting Minecraft with {n_agents} clients...")
+    print(f"Starting {'the simulator' if simulated else 'Minecraft'} with {n_agents} clients...")
     mission_data = MissionData(experiment, cooperativity, True, n_agents)
+    mission_data.record_observations = record_observations
+    mission_data.simulated = simulated
+    mission_data.task_allocation = task_allocation
     process = MultiAgentRunnerProcess(mission_data)
     process.start()
     value = None
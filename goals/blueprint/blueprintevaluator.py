@@ -0,0 +1,52 @@
+import numpy as np
+
+from items.materials import materials
+
+
+def get_position_key(position, material):
+    return tuple(np.asarray(position).tolist()), material
+
+
+# Checks every position of every blueprint in one go, with one gather from each global grid. The positions are rows of
+# one completion vector, that the conditions and the validators both read.
+class BlueprintEvaluator:
+
+    def __init__(self, blueprints, grid_index):
+        self.grid_index = grid_index
+        self.rows = {}
+        positions, material_indices, lookups = [], [], []
+        for blueprint in blueprints:
+            for position in blueprint.positions:
+                self.rows.setdefault(get_position_key(position, blueprint.material), len(positions))
+                positions.append(position)
+                material_indices.append(len(lookups))
+            lookups.append(materials.get(blueprint.material).variant_lookup)
+        self.positions = np.array(positions, dtype=int).reshape((len(positions), 3))
+        self.material_indices = np.array(material_indices, dtype=int)
+        self.lookups = np.array(lookups, dtype=bool)
+
+        # Rows outside every global grid are left to the observer, which looks them up one by one
+        spec_indices = grid_index.get_spec_indices(self.positions)
+        self.rows = {key: row for key, row in self.rows.items() if spec_indices[row] >= 0}
+        self.gathers = []
+        for spec_index in np.unique(spec_indices[spec_indices >= 0]):
+            spec = grid_index.grid_specs[spec_index]
+            spec_rows = np.flatnonzero(spec_indices == spec_index)
+            grid_positions = tuple((self.positions[spec_rows] - spec.grid_range[:, 0]).T)
+            self.gathers.append((spec, spec_rows, grid_positions, self.material_indices[spec_rows]))
+
+    def evaluate(self, observation):
+        # True for every row whose block is in place, False where the grid was not observed
+        completion = np.zeros(len(self.positions), dtype=bool)
+        for spec, rows, grid_positions, material_indices in self.gathers:
+            grid = observation.get_grid_global(spec)
+            if grid is not None:
+                completion[rows] = self.lookups[material_indices, grid[grid_positions]]
+        return completion
+
+    def get_row(self, position, material):
+        return self.rows.get(get_position_key(position, material))
+
+    def get_rows(self, blueprint):
+        # None for the positions that are not evaluated here
+        return [self.get_row(position, blueprint.material) for position in blueprint.positions]
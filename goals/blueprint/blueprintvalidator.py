@@ -2,15 +2,23 @@ from goals.blueprint.blueprint import Blueprint
 from world.observer import Observer
 
 
-def get_blueprint_validators_from_goals(goals, role):
-    return [BlueprintValidator(goal) for goal in goals if isinstance(goal, Blueprint)] if role == 0 else []
+def get_blueprint_validators_from_goals(goals, role, every_role=False):
+    # Only the first agent reports the blueprints, unless every agent does so that the reports go on when it stops
+    if role != 0 and not every_role:
+        return []
+    return [BlueprintValidator(goal) for goal in goals if isinstance(goal, Blueprint)]
 
 
 class BlueprintValidator:
 
     def __init__(self, blueprint):
         self.blueprint = blueprint
+        self.rows = None
 
     def validate(self, observation):
-        observer = Observer(observation)
-        return [observer.is_block_at_position(pos, self.blueprint.material) for pos in self.blueprint.positions]
+        if self.rows is None:
+            self.rows = observation.mission_data.blueprint_evaluator.get_rows(self.blueprint)
+        if None in self.rows:
+            observer = Observer(observation)
+            return [observer.is_block_at_position(pos, self.blueprint.material) for pos in self.blueprint.positions]
+        return observation.blueprint_completion[self.rows].tolist()
@@ -59,3 +59,67 @@ ores = {
 
 def get_ore(material):
     return ores.get(material)
+
+
+# Lowest and highest y the ores generate at in the default world
+ore_heights = {
+    items.COAL_ORE: (5, 127),
+    items.IRON_ORE: (5, 63),
+    items.DIAMOND_ORE: (5, 15),
+}
+LAVA_LEVEL = 10  # Caves below this height are filled with lava
+
+
+def get_ore_heights(material):
+    return ore_heights.get(get_ore(material) or material)
+
+
+# Minecraft's block hardness, the time it takes to break a block is proportional to it
+block_hardness = {
+    items.DIRT: 0.5, items.GRASS: 0.6, items.SAND: 0.5, items.GRAVEL: 0.6, items.CLAY: 0.6,
+    items.LOG: 2, items.LOG_2: 2, items.PLANKS: 2, items.FENCE: 2, items.ACACIA_FENCE: 2, items.CRAFTING_TABLE: 2.5,
+    items.LEAVES: 0.2, items.LEAVES_2: 0.2, items.STONE: 1.5, items.COBBLESTONE: 2, items.MOSSY_COBBLESTONE: 2,
+    items.SANDSTONE: 0.8, items.FURNACE: 3.5, items.COAL_ORE: 3, items.IRON_ORE: 3, items.GOLD_ORE: 3,
+    items.REDSTONE_ORE: 3, items.LAPIS_ORE: 3, items.DIAMOND_ORE: 3, items.OBSIDIAN: 50, items.CHEST: 2.5,
+    items.MOB_SPAWNER: 5, items.CACTUS: 0.4, items.PLANT: 0, items.TALL_GRASS: 0, items.FLOWER_YELLOW: 0,
+    items.FLOWER_RED: 0, items.SAPLING: 0,
+}
+DEFAULT_HARDNESS = 1
+
+# Blocks that break slowly and drop nothing without a pickaxe of the required tier
+pickaxe_blocks = [items.STONE, items.COBBLESTONE, items.MOSSY_COBBLESTONE, items.SANDSTONE, items.FURNACE,
+                  items.OBSIDIAN, items.COAL_ORE, items.IRON_ORE, items.GOLD_ORE, items.REDSTONE_ORE,
+                  items.LAPIS_ORE, items.DIAMOND_ORE, items.MOB_SPAWNER]
+
+pickaxe_speed = {
+    GatheringTier.BASE: 1,
+    GatheringTier.WOOD: 2,
+    GatheringTier.STONE: 4,
+    GatheringTier.IRON: 6,
+    GatheringTier.DIAMOND: 8
+}
+
+HARVEST_SECONDS_PER_HARDNESS = 1.5
+NO_HARVEST_SECONDS_PER_HARDNESS = 5
+
+
+def get_required_tier(block):
+    required_tier = min_gathering_tier.get(block)
+    if required_tier is None and block in pickaxe_blocks:
+        return GatheringTier.WOOD
+    return required_tier
+
+
+def can_harvest(block, tier):
+    required_tier = get_required_tier(block)
+    return required_tier is None or tier.value >= required_tier.value
+
+
+def get_break_seconds(block, tier):
+    # How long it takes to break the block with the best pickaxe of the tier, or by hand for GatheringTier.BASE
+    hardness = block_hardness.get(block, DEFAULT_HARDNESS)
+    if block not in pickaxe_blocks:
+        return HARVEST_SECONDS_PER_HARDNESS * hardness
+    if not can_harvest(block, tier):
+        return NO_HARVEST_SECONDS_PER_HARDNESS * hardness
+    return HARVEST_SECONDS_PER_HARDNESS * hardness / pickaxe_speed[tier]
@@ -1,6 +1,6 @@
 from items import items
-from items.gathering import get_sufficient_pickaxes, get_gathering_tier_by_pickaxe
-from items.items import get_variants
+from items.gathering import get_sufficient_pickaxes, get_gathering_tier_by_pickaxe, GatheringTier
+from items.materials import materials, get_normalized_item
 from items.recipes import get_ingredients, get_recipe
 
 NO_SELECTION = -1
@@ -20,10 +20,8 @@ def fill_inventory(info, size):
 
 def get_inventory_slot_from_info(info, slot):
     amount = info[f"InventorySlot_{slot}_size"]
-    item = info[f"InventorySlot_{slot}_item"]
+    item = get_normalized_item(info[f"InventorySlot_{slot}_item"])
     variant = info.get(f"InventorySlot_{slot}_variant", None)
-    if item == items.LOG_2:
-        item = items.LOG
     return InventorySlot(item, amount, variant)
 
 
@@ -59,20 +57,20 @@ class Inventory:
         return self.get_item_amount(item, same_variant) >= amount
 
     def has_item_equipped(self, item):
-        return self.inventory[self.current_selection].item in get_variants(item)
+        return self.inventory[self.current_selection].item in materials.get(item).variant_set
 
     def get_item_amount(self, item, same_variant=False):
         if self.inventory is None:
             return 0
         else:
-            variants = get_variants(item)
+            material = materials.get(item)
             if same_variant:
                 # There are two types of variants. One defined by me and uses the variant table,
                 # and one defined by Minecraft and is contained in the slot information.
                 # If {same_variant} is true we should return the max amount of the same variant.
-                return max(self.get_max_slot_variant_amount(item_variant) for item_variant in variants)
+                return max(self.get_max_slot_variant_amount(item_variant) for item_variant in material.variants)
             else:
-                return sum(slot.amount for slot in self.inventory if slot.item in variants)
+                return sum(slot.amount for slot in self.inventory if slot.item in material.variant_set)
 
     def get_max_slot_variant_amount(self, item_variant):
         variant_amount = {}
@@ -82,10 +80,10 @@ class Inventory:
         return max(amount for amount in variant_amount.values()) if variant_amount else 0
 
     def find_item(self, item):
-        return next((i for i, slot in enumerate(self.inventory) if slot.item in get_variants(item)), None)
+        return next((i for i, slot in enumerate(self.inventory) if slot.item in materials.get(item).variant_set), None)
 
     def find_item_by_min_amount(self, item, amount, same_variant=False):
-        variants = get_variants(item)
+        variants = materials.get(item).variant_set
         return next((i for i, s in enumerate(self.inventory) if s.has_variants(variants, amount, same_variant)), None)
 
     def has_ingredients(self, item):
@@ -112,6 +110,14 @@ class Inventory:
         best_pickaxe = self.get_best_pickaxe(min_tier)
         return self.inventory[self.current_selection].item == best_pickaxe
 
+    def get_gathering_tier(self):
+        # Tier of the best pickaxe in the inventory, GatheringTier.BASE without one
+        if self.inventory is None:
+            return GatheringTier.BASE
+        tiers = [get_gathering_tier_by_pickaxe(slot.item) for slot in self.inventory]
+        tiers = [tier for tier in tiers if tier is not None]
+        return max(tiers, key=lambda tier: tier.value, default=GatheringTier.BASE)
+
     def get_best_pickaxe(self, min_tier):
         sufficient_pickaxes = get_sufficient_pickaxes(min_tier)
         available_pickaxes = [pickaxe for pickaxe in sufficient_pickaxes if self.has_item(pickaxe)]
@@ -0,0 +1,47 @@
+import numpy as np
+
+from items import items
+from items.gathering import get_ore
+from items.items import get_variants
+from world.palette import block_palette, get_item_names
+
+# Items that Malmo reports under another name than the one the recipes and goals use
+normalized_items = {items.LOG_2: items.LOG}
+
+
+def get_normalized_item(item):
+    return normalized_items.get(item, item)
+
+
+# Everything an item matches, as names for inventories and entities and as palette codes for the grids
+class Material:
+
+    def __init__(self, item):
+        self.item = item
+        self.variants = tuple(get_variants(item))
+        self.variant_set = frozenset(self.variants)
+        # Blocks that give the item when mined, its variants and their ores
+        ores = [ore for ore in (get_ore(variant) for variant in self.variants) if ore is not None]
+        self.blocks = self.variants + tuple(ores)
+        self.block_set = frozenset(self.blocks)
+        self.variant_codes = np.array([block_palette.get_code(variant) for variant in self.variants])
+        self.block_codes = np.array([block_palette.get_code(block) for block in self.blocks])
+        self.variant_lookup = block_palette.get_lookup(self.variants)
+        self.block_lookup = block_palette.get_lookup(self.blocks)
+
+
+class Materials:
+    # Built for every item name at import, other names are added the first time they are asked for
+
+    def __init__(self, names):
+        self.materials = {name: Material(name) for name in names}
+
+    def get(self, item):
+        material = self.materials.get(item)
+        if material is None:
+            material = Material(item)
+            self.materials[item] = material
+        return material
+
+
+materials = Materials(get_item_names())
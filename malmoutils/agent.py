@@ -1,17 +1,24 @@
-import time
-
 import numpy as np
 
 from items import effects
+from items.gathering import get_ore_heights, GatheringTier
 from items.inventory import HOTBAR_SIZE
-from items.items import unclimbable, traversable, narrow
 from malmoutils.interface import MalmoInterface
+from malmoutils.world_state import WorldStatePoller
 from mobs.enemies import ENEMY_HEIGHT
+from multiagents.cooperativity import Cooperativity
 from utils.constants import ATTACK_REACH
+from utils.querycache import QueryCache, cached_query
 from utils.vectors import RelativeDirection, directionVector, up, Direction, center, faceDistance, BlockFace, normalize, \
     flatten
+from world.explorationmap import ExplorationMap
+from world.hitmasks import HitMaskCache
 from world.observer import get_horizontal_distance, get_wanted_pitch, Observer, get_wanted_direction, \
     get_position_center, GATHERING_REACH
+from world.oresearch import OreSearch
+from world.palette import BlockProperty
+from world.pathplanner import PathPlanner
+from world.worldmap import WorldMap
 
 PITCH_UPWARDS = -90
 PITCH_DOWNWARDS = 90
@@ -25,6 +32,8 @@ NO_MOVE_SPEED_TURN_DIRECTION_EPSILON = 0.1
 STRAFE_SPEED = 0.3
 MOVE_BACKWARD_SPEED = -0.2
 DISTANCE_FAR_AWAY = 100
+PLANNING_DISTANCE = 2  # Targets this close are steered to directly
+EXPLORATION_SHARE_INTERVAL = 20  # Observations between the newly explored cells shared with the other agents
 
 FUEL_HOT_BAR_POSITION = 0
 PICKAXE_HOT_BAR_POSITION = 5
@@ -49,19 +58,73 @@ def get_face_position(discrete_position, face):
 
 class MinerAgent:
 
-    def __init__(self, mission_data, blackboard, role):
+    def __init__(self, mission_data, blackboard, role, interface=None, explored_cells=None):
         self.mission_data = mission_data
         self.blackboard = blackboard
         self.role = role
         self.name = self.mission_data.agent_names[self.role]
-        self.interface = MalmoInterface()
+        if interface is None:
+            agent_host = None
+            if mission_data.simulated:
+                # Imported here so that agents playing in Minecraft do not load the simulator
+                from simulator.agenthost import SimulatedAgentHost
+                agent_host = SimulatedAgentHost(mission_data)
+            unpaced = mission_data.simulated and mission_data.ms_per_tick == 0
+            interface = MalmoInterface(agent_host, realtime=not unpaced)
+        self.interface = interface
+        self.poller = WorldStatePoller(self.interface, mission_data.ms_per_tick, WORLD_STATE_TIMEOUT)
+        self.observation = None
         self.observer = None
-        self.inventory = None
+        self.hit_masks = HitMaskCache()
+        self.world_map = WorldMap()
+        self.query_cache = QueryCache()
+        self.path_planner = PathPlanner(self.world_map) if mission_data.path_planning else None
+        self.route = None
+        self.exploration_map = ExplorationMap() if mission_data.frontier_exploration else None
+        self.exploration_target = None
+        # Agent name -> list shared between the processes, that the agent appends the cells it explored to. Kept off the
+        # blackboard, which is copied on every message to the runner.
+        self.explored_cells = explored_cells
+        self.share_exploration = mission_data.cooperativity != Cooperativity.INDEPENDENT and explored_cells is not None
+        self.observations_since_shared = 0
+        self.read_cells = {}  # Agent name -> number of its explored cells read
+        self.ore_searches = {} if mission_data.ore_search else None
+
+    @property
+    def inventory(self):
+        return self.observation.inventory if self.observation is not None else None
 
     def set_observation(self, observation):
         if observation:
-            self.inventory = observation.inventory
-            self.observer = Observer(observation)
+            self.observation = observation
+            self.query_cache.clear()
+            self.observer = Observer(observation, self.hit_masks, self.world_map, self.query_cache)
+            self.world_map.update(observation.grid_local, self.observer.get_grid_local_origin())
+            self.update_exploration_map()
+
+    def update_exploration_map(self):
+        if self.exploration_map is None or self.observation.grid_local is None:
+            return
+        self.exploration_map.update(self.observer.get_grid_local_origin(), self.observation.grid_local.shape)
+        if self.share_exploration:
+            self.publish_exploration()
+
+    def publish_exploration(self):
+        self.observations_since_shared += 1
+        if self.observations_since_shared < EXPLORATION_SHARE_INTERVAL or not self.exploration_map.unpublished:
+            return
+        self.explored_cells[self.name].extend(self.exploration_map.pop_unpublished())
+        self.observations_since_shared = 0
+
+    def read_shared_exploration(self):
+        # The cells the other agents explored since the last read
+        for name, explored_cells in self.explored_cells.items():
+            if name == self.name:
+                continue
+            read = self.read_cells.get(name, 0)
+            cells = explored_cells[read:]
+            self.exploration_map.share(cells)
+            self.read_cells[name] = read + len(cells)
 
     def jump(self, active):
         self.interface.jump(active)
@@ -82,7 +145,9 @@ class MinerAgent:
         self.interface.strafe(intensity)
 
     def move_forward(self, horizontal_distance, turn_direction):
+        # Jumping goes on until it is turned off, only jump_forward turns it on
         self.interface.attack(False)
+        self.interface.jump(False)
 
         move_speed = get_move_speed(horizontal_distance, turn_direction)
         self.interface.move(move_speed)
@@ -102,11 +167,48 @@ class MinerAgent:
     def get_turn_direction(self, distance):
         return self.observer.get_turn_direction(distance)
 
+    def get_gathering_tier(self):
+        return self.inventory.get_gathering_tier() if self.inventory is not None else GatheringTier.BASE
+
+    def get_waypoint(self, position):
+        # Next block on the planned route to the position, None when the position is steered to directly
+        cell = self.observer.get_abs_pos_discrete()
+        if self.route is None or cell is None:
+            return None
+        goal = np.floor(position)
+        if np.max(np.abs(goal - cell)) <= PLANNING_DISTANCE or \
+                self.route.needs_replanning(cell, goal, self.get_gathering_tier()):
+            self.route = None
+            return None
+        waypoint = self.route.get_waypoint(self.observation.abs_pos)
+        # A failed route is kept for a while, so that it isn't planned again on every tick spent mining
+        if waypoint is None and not self.route.is_failed():
+            self.route = None
+        return waypoint
+
+    def plan_route(self, position):
+        # Routes are only planned once the way straight to the position is blocked, steering straight is faster
+        # everywhere else. Returns whether there is a route to follow.
+        cell = self.observer.get_abs_pos_discrete()
+        if self.path_planner is None or self.route is not None or cell is None:
+            return False
+        goal = np.floor(position)
+        if np.max(np.abs(goal - cell)) <= PLANNING_DISTANCE:
+            return False
+        self.route = self.path_planner.plan(cell, goal, self.get_gathering_tier())
+        return not self.route.is_failed()
+
     def go_to_position(self, position):
         distance = self.observer.get_distance_to_position(position)
         if distance is None:
             return
 
+        # The speed is set by the distance left to the position, the direction by the next waypoint
+        horizontal_distance = get_horizontal_distance(distance)
+        waypoint = self.get_waypoint(position)
+        if waypoint is not None:
+            distance = self.observer.get_distance_to_position(get_position_center(waypoint))
+
         flat_distance = flatten(distance)
         if np.linalg.norm(flat_distance) <= DIG_VERTICAL_HORIZONTAL_TOLERANCE:
             self.mine_vertical(distance[1])
@@ -115,7 +217,7 @@ class MinerAgent:
         self.turn_towards(distance)
 
         self.strafe(0)
-        at_narrow = self.observer.lower_surroundings[Direction.Zero] in narrow
+        at_narrow = self.observer.is_surrounding(BlockProperty.NARROW, Direction.Zero)
         if at_narrow:
             avoiding = self.avoid_narrow(flat_distance)
             if avoiding:
@@ -123,14 +225,21 @@ class MinerAgent:
 
         turn_direction = self.get_turn_direction(distance)
         current_direction = self.observer.get_current_direction()
-        lower_free = self.observer.lower_surroundings[current_direction] in traversable + narrow
-        upper_free = self.observer.upper_surroundings[current_direction] in traversable
+        lower_free = self.observer.is_surrounding(BlockProperty.PASSABLE, current_direction)
+        upper_free = self.observer.is_surrounding(BlockProperty.TRAVERSABLE, current_direction, 1)
         at_same_discrete_position_horizontally = np.all(np.round(flat_distance) == 0)
-        if at_same_discrete_position_horizontally or (lower_free and upper_free):
-            self.move_forward(get_horizontal_distance(distance), turn_direction)
+        # Heading diagonally past a corner the agent can face a block while the way it wants to go is free, it then
+        # slides along the block instead of mining air
+        wanted_direction = get_wanted_direction(distance)
+        wanted_free = self.observer.is_surrounding(BlockProperty.PASSABLE, wanted_direction) and \
+            self.observer.is_surrounding(BlockProperty.TRAVERSABLE, wanted_direction, 1)
+        if at_same_discrete_position_horizontally or (lower_free and upper_free) or wanted_free:
+            self.move_forward(max(get_horizontal_distance(distance), horizontal_distance), turn_direction)
             return
 
-        wanted_direction = get_wanted_direction(distance)
+        must_mine = not upper_free or not self.can_jump(wanted_direction)
+        if must_mine and waypoint is None and self.plan_route(position):
+            return
         if not upper_free:
             self.mine_forward(1, wanted_direction)
         elif not lower_free:
@@ -140,6 +249,7 @@ class MinerAgent:
                 self.mine_forward(0, wanted_direction)
 
     def mine_vertical(self, y_distance):
+        self.jump(False)
         if y_distance < 0:
             self.mine_downwards()
         else:
@@ -221,6 +331,7 @@ class MinerAgent:
         self.turn(0)
         self.pitch(0)
         self.move(0)
+        self.jump(False)
         if not self.observer.is_looking_at_discrete_position(block_position):
             turning = self.turn_towards(distance_to_block)
             pitching = self.pitch_towards(distance_to_block)
@@ -243,10 +354,10 @@ class MinerAgent:
         self.attack(looking_downwards)
 
     def can_jump(self, current_direction):
-        climbable_below = self.observer.lower_surroundings[current_direction] not in unclimbable
+        climbable_below = not self.observer.is_surrounding(BlockProperty.UNCLIMBABLE, current_direction)
 
-        free_above = self.observer.upper_upper_surroundings[Direction.Zero] in traversable
-        free_above_direction = self.observer.upper_upper_surroundings[current_direction] in traversable
+        free_above = self.observer.is_surrounding(BlockProperty.TRAVERSABLE, Direction.Zero, 2)
+        free_above_direction = self.observer.is_surrounding(BlockProperty.TRAVERSABLE, current_direction, 2)
 
         return climbable_below and free_above and free_above_direction
 
@@ -283,9 +394,10 @@ class MinerAgent:
         fuel_position = self.inventory.find_item(fuel)
         if fuel_position != FUEL_HOT_BAR_POSITION:
             self.swap_items(fuel_position, FUEL_HOT_BAR_POSITION)
-            time.sleep(0.2)
+            self.interface.wait(0.2)
         self.craft(item, amount)
 
+    @cached_query
     def get_closest_enemy(self, consider_other_agents=False):
         if consider_other_agents:
             return self.observer.get_closest_enemy_to_agents()
@@ -338,6 +450,7 @@ class MinerAgent:
     def is_position_within_reach(self, position, reach=GATHERING_REACH):
         return self.observer.is_position_within_reach(position, reach)
 
+    @cached_query
     def get_closest_block_center(self, block_type):
         return get_position_center(self.observer.get_closest_block(block_type))
 
@@ -346,6 +459,37 @@ class MinerAgent:
         if abs_pos_discrete is not None:
             self.go_to_position(abs_pos_discrete + DISTANCE_FAR_AWAY * directionVector[direction])
 
+    def explore_frontier(self):
+        abs_pos_discrete = self.observer.get_abs_pos_discrete()
+        if self.exploration_map is None or abs_pos_discrete is None:
+            self.explore_in_direction(Direction.North)
+            return
+        if self.exploration_target is None or self.exploration_map.is_explored(self.exploration_target):
+            if self.share_exploration:
+                self.read_shared_exploration()
+            self.exploration_target = self.exploration_map.get_frontier_cell(abs_pos_discrete)
+        if self.exploration_target is None:
+            self.explore_in_direction(Direction.North)
+            return
+        self.go_to_position(self.exploration_map.get_cell_center(self.exploration_target, abs_pos_discrete[1]))
+
+    def search_ore(self, material):
+        # Branch mines at the height the material is found at, False when it can't be searched for or the agent is
+        # still above that height
+        abs_pos_discrete = self.observer.get_abs_pos_discrete()
+        heights = get_ore_heights(material)
+        if self.ore_searches is None or heights is None or abs_pos_discrete is None:
+            return False
+        search = self.ore_searches.get(material)
+        if search is None:
+            direction = self.observer.get_current_direction()
+            search = OreSearch(heights, self.mission_data.grid_local.grid_range, direction)
+            self.ore_searches[material] = search
+        if search.is_descending(abs_pos_discrete):
+            return False
+        self.go_to_position(get_position_center(search.get_target(abs_pos_discrete)))
+        return True
+
     def is_at_position(self, position):
         return self.observer.is_at_position(position)
 
@@ -359,13 +503,4 @@ class MinerAgent:
         self.interface.quit()
 
     def get_next_world_state(self):
-        observations = None
-        world_state = None
-        start_time = time.time()
-        while observations is None or len(observations) == 0:
-            world_state = self.interface.get_world_state()
-            observations = world_state.observations
-            if WORLD_STATE_TIMEOUT is not None and time.time() - start_time > WORLD_STATE_TIMEOUT:
-                print("Getting World State timed out")
-                return None
-        return world_state
+        return self.poller.get_next_world_state()
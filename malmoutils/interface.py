@@ -1,6 +1,10 @@
 import time
 
-from malmo.MalmoPython import AgentHost, MissionRecordSpec, MissionSpec, ClientPool, ClientInfo
+try:
+    from malmo.MalmoPython import AgentHost, MissionRecordSpec, MissionSpec, ClientPool, ClientInfo
+except ImportError:
+    # Only the simulator can run the missions without Malmo
+    AgentHost = MissionRecordSpec = MissionSpec = ClientPool = ClientInfo = None
 
 import items.items
 from items import variants
@@ -30,68 +34,97 @@ class MissionTimeoutException(Exception):
 class MalmoInterface:
 
     def __getstate__(self):
-        return {}
+        # A Malmo agent host can not be pickled, a new one is created when unpickling
+        state = self.__dict__.copy()
+        if AgentHost is not None and isinstance(self.agent_host, AgentHost):
+            state["agent_host"] = None
+        return state
 
     def __setstate__(self, state):
-        self.agent_host = AgentHost()
+        self.__dict__.update(state)
+        if self.agent_host is None:
+            self.agent_host = AgentHost()
 
-    def __init__(self):
-        self.agent_host = AgentHost()
+    def __init__(self, agent_host=None, realtime=True):
+        self.agent_host = agent_host if agent_host is not None else AgentHost()
+        self.realtime = realtime
+        self.sent_commands = None
 
     def get_world_state(self):
         return self.agent_host.getWorldState()
 
+    def send_command(self, command):
+        if self.sent_commands is not None:
+            self.sent_commands.append(command)
+        self.agent_host.sendCommand(command)
+
+    def record_commands(self):
+        self.sent_commands = []
+
+    def pop_sent_commands(self):
+        sent_commands = self.sent_commands
+        self.sent_commands = []
+        return sent_commands
+
+    def wait(self, seconds):
+        # Gives Minecraft time to apply discrete commands, not needed when nothing runs in real time
+        if self.realtime:
+            time.sleep(seconds)
+
     def move(self, speed):
-        self.agent_host.sendCommand(f"move {speed}")
+        self.send_command(f"move {speed}")
 
     def turn(self, speed):
-        self.agent_host.sendCommand(f"turn {speed}")
+        self.send_command(f"turn {speed}")
 
     def strafe(self, speed):
-        self.agent_host.sendCommand(f"strafe {speed}")
+        self.send_command(f"strafe {speed}")
 
     def pitch(self, speed):
-        self.agent_host.sendCommand(f"pitch {speed}")
+        self.send_command(f"pitch {speed}")
 
     def jump(self, active):
-        self.agent_host.sendCommand(f"jump {active:d}")
+        self.send_command(f"jump {active:d}")
 
     def attack(self, active):
-        self.agent_host.sendCommand(f"attack {active:d}")
+        self.send_command(f"attack {active:d}")
 
     def discrete_use(self):
-        time.sleep(DISCRETE_USE_SLEEP)
-        self.agent_host.sendCommand("use")
-        time.sleep(DISCRETE_USE_SLEEP)
+        self.wait(DISCRETE_USE_SLEEP)
+        self.send_command("use")
+        self.wait(DISCRETE_USE_SLEEP)
 
     def select_on_hotbar(self, position):
-        self.agent_host.sendCommand(f"hotbar.{position + 1} 1")  # press
-        self.agent_host.sendCommand(f"hotbar.{position + 1} 0")  # release
-        time.sleep(HOT_BAR_SLEEP)
+        self.send_command(f"hotbar.{position + 1} 1")  # press
+        self.send_command(f"hotbar.{position + 1} 0")  # release
+        self.wait(HOT_BAR_SLEEP)
 
     def craft(self, item, variant=None):
         if variant is None or variant == variants.OAK:
-            self.agent_host.sendCommand(f"craft {item}")
+            self.send_command(f"craft {item}")
         elif item == items.items.FENCE:
-            self.agent_host.sendCommand(f"craft {variant}_{item}")
+            self.send_command(f"craft {variant}_{item}")
         else:
-            self.agent_host.sendCommand(f"craft {item} {variant}")
-        time.sleep(CRAFT_SLEEP)
+            self.send_command(f"craft {item} {variant}")
+        self.wait(CRAFT_SLEEP)
 
     def swap_items(self, position1, position2):
-        self.agent_host.sendCommand("swapInventoryItems {0} {1}".format(position1, position2))
+        self.send_command("swapInventoryItems {0} {1}".format(position1, position2))
 
     def activate_effect(self, effect, effect_time, amplifier):
-        self.agent_host.sendCommand(f"chat /effect @p {effect} {effect_time} {amplifier}")
+        self.send_command(f"chat /effect @p {effect} {effect_time} {amplifier}")
 
     def spawn_entity(self, entity_type, position, hand_item=None):
         configuration = f"{{HandItems:[{{Count:1,id:{hand_item}}}]}}" if hand_item else ""
         x = position[0]
         y = position[1]
         z = position[2]
-        self.agent_host.sendCommand(f"chat /summon {entity_type} {x} {y} {z} {configuration}")
+        self.send_command(f"chat /summon {entity_type} {x} {y} {z} {configuration}")
 
     def start_multi_agent_mission(self, mission_data, i):
+        if mission_data.simulated:
+            self.agent_host.startMission(None, None, None, i, mission_data.experiment_id)
+            return
         mission = MissionSpec(mission_data.get_xml(), True)
         mission_record = MissionRecordSpec()
         pool = setup_pool(mission_data.n_agents)
@@ -110,7 +143,7 @@ class MalmoInterface:
     def restart_minecraft(self, world_state, client_info, message=""):
         """"Attempt to quit world if running and kill the client"""
         if world_state.is_mission_running:
-            self.agent_host.sendCommand("quit")
+            self.send_command("quit")
             time.sleep(10)
         self.agent_host.killClient(client_info)
         raise MissionTimeoutException(message)
@@ -131,4 +164,4 @@ class MalmoInterface:
         print()
 
     def quit(self):
-        self.agent_host.sendCommand("quit")
+        self.send_command("quit")
@@ -0,0 +1,135 @@
+import gzip
+import json
+import pickle
+import time
+from pathlib import Path
+
+from bt.back_chain_tree import BackChainTree
+from malmoutils.agent import MinerAgent
+from malmoutils.interface import MalmoInterface
+from malmoutils.world_state import TimestampedText
+from utils.file import get_project_root
+from world.observation import Observation
+
+RECORDINGS_PATH = Path("log/recordings")
+MISSION_DATA_FILE_NAME = "mission_data.pickle"
+TICKS_FILE_NAME = "ticks.jsonl.gz"
+TICKS_PER_CHUNK = 100
+
+TICK = "tick"
+TIME = "time"
+OBSERVATION = "observation"
+COMMANDS = "commands"
+BLACKBOARD = "blackboard"
+
+
+def get_recording_path(mission_data, role):
+    folder_name = f"{mission_data.configuration_id}_{mission_data.experiment_id}_{role}"
+    return get_project_root() / RECORDINGS_PATH / folder_name
+
+
+def read_mission_data(recording_path):
+    with open(Path(recording_path) / MISSION_DATA_FILE_NAME, "rb") as file:
+        return pickle.load(file)
+
+
+def read_ticks(recording_path):
+    # Every chunk is a separate gzip member, gzip reads them back as one stream
+    with gzip.open(Path(recording_path) / TICKS_FILE_NAME, "rt", encoding="utf-8") as file:
+        for line in file:
+            yield json.loads(line)
+
+
+class ObservationRecorder:
+    # Appends every tick's raw observation, the commands sent during the tick and the blackboard it was ticked with
+    # to a gzip log, one gzip member per chunk of ticks so a crashed run keeps everything up to the last chunk.
+
+    def __init__(self, mission_data, role, interface, blackboard, ticks_per_chunk=TICKS_PER_CHUNK):
+        self.path = get_recording_path(mission_data, role)
+        self.interface = interface
+        self.blackboard = blackboard
+        self.ticks_per_chunk = ticks_per_chunk
+        self.tick = 0
+        self.lines = []
+        self.current = None
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / MISSION_DATA_FILE_NAME, "wb") as file:
+            pickle.dump((mission_data, role), file)
+        self.interface.record_commands()
+        print(f"Recording observations to {self.path}")
+
+    def start_tick(self, world_state):
+        self.interface.pop_sent_commands()
+        self.current = {
+            TICK: self.tick,
+            TIME: time.time(),
+            OBSERVATION: world_state.observations[-1].text,
+            BLACKBOARD: dict(self.blackboard)
+        }
+
+    def end_tick(self):
+        self.current[COMMANDS] = self.interface.pop_sent_commands()
+        self.lines.append(json.dumps(self.current))
+        self.current = None
+        self.tick += 1
+        if len(self.lines) >= self.ticks_per_chunk:
+            self.flush()
+
+    def flush(self):
+        if self.lines:
+            with gzip.open(self.path / TICKS_FILE_NAME, "at", encoding="utf-8") as file:
+                file.write("\n".join(self.lines) + "\n")
+            self.lines = []
+
+
+class ReplayAgentHost:
+    # Takes the place of Malmo's AgentHost when replaying, it only collects the commands sent
+
+    def __init__(self):
+        self.commands = []
+
+    def sendCommand(self, command):
+        self.commands.append(command)
+
+    def getWorldState(self):
+        raise RuntimeError("The world state of a replay comes from the recording")
+
+
+class ReplayResult:
+    def __init__(self):
+        self.ticks = 0
+        self.tick_time = 0
+        self.mismatched_ticks = 0
+
+    def print(self):
+        tick_time = 1000 * self.tick_time / self.ticks if self.ticks else 0
+        print(f"Replayed {self.ticks} ticks, {tick_time:.3f} ms per tick, "
+              f"{self.mismatched_ticks} ticks sent other commands than recorded")
+
+
+def replay_recording(recording_path, on_tick=None):
+    # Feeds the recorded observations through the same pipeline as MultiAgentProcess.run, without Minecraft
+    mission_data, role = read_mission_data(recording_path)
+    blackboard = {}
+    interface = MalmoInterface(ReplayAgentHost(), realtime=False)
+    interface.record_commands()
+    agent = MinerAgent(mission_data, blackboard, role, interface)
+    tree = BackChainTree(agent, mission_data.goals, mission_data.cooperativity)
+
+    result = ReplayResult()
+    for tick in read_ticks(recording_path):
+        blackboard.clear()
+        blackboard.update(tick[BLACKBOARD])
+        start_time = time.perf_counter()
+        observation = Observation([TimestampedText(tick[OBSERVATION])], mission_data)
+        agent.set_observation(observation)
+        tree.tick()
+        result.tick_time += time.perf_counter() - start_time
+        result.ticks += 1
+        commands = interface.pop_sent_commands()
+        if commands != tick[COMMANDS]:
+            result.mismatched_ticks += 1
+        if on_tick is not None:
+            on_tick(tick, commands, agent, tree)
+    return result
@@ -3,6 +3,12 @@ import time
 MAX_DELAY = 60
 
 
+class TimestampedText:
+    # Stand-in for the TimestampedString objects in Malmo's WorldState.observations
+    def __init__(self, text):
+        self.text = text
+
+
 def check_timeout(agent, world_state, last_delta):
     new_delta = time.time()
     if is_world_state_idle(world_state) and new_delta - last_delta > MAX_DELAY:
@@ -15,3 +21,57 @@ def is_world_state_idle(world_state):
     return world_state.number_of_video_frames_since_last_state == 0 \
            and world_state.number_of_observations_since_last_state == 0 \
            and world_state.number_of_rewards_since_last_state == 0
+
+
+MIN_POLL_SLEEP = 0.001
+POLL_BACKOFF = 2
+TICK_WAIT_FRACTION = 0.8  # Sleep through most of the tick before polling, the observation arrives at the end of it
+MAX_POLL_SLEEP_FRACTION = 0.25
+
+
+class WorldStatePoller:
+    # Waits for the next observation by sleeping through the tick and backing off, instead of spinning on the host.
+
+    def __init__(self, interface, ms_per_tick, timeout=None):
+        self.interface = interface
+        self.tick_period = ms_per_tick / 1000
+        self.timeout = timeout
+        self.last_observation_time = None
+        self.polls = 0
+        self.world_states = 0
+        self.observations_dropped = 0
+        self.wait_time = 0
+
+    def get_next_world_state(self):
+        start_time = time.time()
+        if self.last_observation_time is not None:
+            time.sleep(max(0, self.last_observation_time + TICK_WAIT_FRACTION * self.tick_period - start_time))
+
+        poll_sleep = MIN_POLL_SLEEP
+        max_poll_sleep = max(MIN_POLL_SLEEP, MAX_POLL_SLEEP_FRACTION * self.tick_period)
+        while True:
+            world_state = self.interface.get_world_state()
+            self.polls += 1
+            if len(world_state.observations) > 0:
+                self.add_world_state(world_state, start_time)
+                return world_state
+            elif world_state.has_mission_begun and not world_state.is_mission_running:
+                self.wait_time += time.time() - start_time
+                return world_state
+            elif self.timeout is not None and time.time() - start_time > self.timeout:
+                print("Getting World State timed out")
+                self.wait_time += time.time() - start_time
+                return None
+            time.sleep(poll_sleep)
+            poll_sleep = min(POLL_BACKOFF * poll_sleep, max_poll_sleep)
+
+    def add_world_state(self, world_state, start_time):
+        self.last_observation_time = time.time()
+        self.world_states += 1
+        self.observations_dropped += world_state.number_of_observations_since_last_state - len(world_state.observations)
+        self.wait_time += self.last_observation_time - start_time
+
+    def print_stats(self):
+        polls_per_state = self.polls / self.world_states if self.world_states else 0
+        print(f"World states: {self.world_states}, polls: {self.polls} ({polls_per_state:.1f} per world state), "
+              f"observations dropped: {self.observations_dropped}, time waiting: {self.wait_time:.1f} s")
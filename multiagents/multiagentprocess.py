@@ -1,32 +1,40 @@
 import multiprocessing as mp
 import time
 
-from bt.back_chain_tree import BackChainTree
+from bt.tickprofiler import save_profile
+from bt.treetemplates import get_tree
 from goals.blueprint.blueprintvalidator import get_blueprint_validators_from_goals
 from malmoutils.agent import MinerAgent
+from malmoutils.recording import ObservationRecorder
 from malmoutils.world_state import check_timeout
 from multiagents.multiagentstate import MultiAgentState, MultiAgentRunningState
 from world.observation import Observation
 
 MAX_TIME = 600
+PROFILE_ROWS_PRINTED = 20
 
 
 class MultiAgentProcess(mp.Process):
-    def __init__(self, running, mission_data, blackboard, queue, role):
+    def __init__(self, running, mission_data, blackboard, queue, role, template=None, explored_cells=None):
         super().__init__()
         self.running = running
         self.mission_data = mission_data
         self.blackboard = blackboard
         self.role = role
         goals = self.mission_data.goals
-        self.blueprint_validators = get_blueprint_validators_from_goals(goals, role)
+        self.blueprint_validators = get_blueprint_validators_from_goals(goals, role, mission_data.task_allocation)
         self.queue = queue
+        self.template = template
+        self.explored_cells = explored_cells
 
     def run(self):
-        agent = MinerAgent(self.mission_data, self.blackboard, self.role)
+        agent = MinerAgent(self.mission_data, self.blackboard, self.role, explored_cells=self.explored_cells)
 
         agent.start_mission()
-        tree = BackChainTree(agent, self.mission_data.goals, self.mission_data.cooperativity)
+        tree = get_tree(agent, self.template)
+        recorder = None
+        if self.mission_data.record_observations:
+            recorder = ObservationRecorder(self.mission_data, self.role, agent.interface, self.blackboard)
         # if self.role == 0:
         # save_tree_to_log(tree, f"tree_{self.mission_data.configuration_id}.txt")
 
@@ -37,23 +45,40 @@ class MultiAgentProcess(mp.Process):
         observation = None
         state = MultiAgentRunningState.RUNNING
         while state is MultiAgentRunningState.RUNNING:
+            if recorder is not None:
+                recorder.start_tick(world_state)
             observation = Observation(world_state.observations, self.mission_data)
             agent.set_observation(observation)
             self.send_info(observation, state, None)
             tree.tick()
+            if recorder is not None:
+                recorder.end_tick()
             last_delta = check_timeout(agent, world_state, last_delta)
             world_state = agent.get_next_world_state()
             state = self.get_running_state(observation, world_state, tree, start_time)
         completion_time = time.time() - start_time
+        if recorder is not None:
+            recorder.flush()
         success = tree.all_goals_achieved()
 
         print(f"Mission is running: {world_state.is_mission_running}")
         print(f"All goals achieved: {success}")
         print("Mission running state: ", state)
-        print(f"Total time: {completion_time} \n")
+        print(f"Total time: {completion_time}")
+        agent.poller.print_stats()
+        agent.query_cache.print_stats()
+        self.save_profile(tree)
+        print()
         self.send_info(observation, state, completion_time)
         self.queue.task_done()
 
+    def save_profile(self, tree):
+        profiler = tree.get_profiler()
+        if profiler is not None:
+            print(profiler.get_table(PROFILE_ROWS_PRINTED))
+            mission_data = self.mission_data
+            save_profile(profiler, f"{mission_data.configuration_id}_{mission_data.experiment_id}_{self.role}")
+
     def get_running_state(self, observation, world_state, tree, start_time):
         if self.running and not self.running.is_set():
             print("Process was terminated")
@@ -2,7 +2,11 @@ import multiprocessing as mp
 from dataclasses import dataclass
 from typing import List, Dict, Optional
 
+from bt.treetemplates import get_template
+from multiagents.cooperativity import Cooperativity
 from multiagents.multiagentprocess import MultiAgentProcess, MultiAgentRunningState
+from multiagents.taskallocation import TaskAllocator
+from simulator.agenthost import start_simulator
 
 ALL_DONE_STATES = [MultiAgentRunningState.TIMEOUT, MultiAgentRunningState.COMPLETED, MultiAgentRunningState.DECEASED]
 ANY_DONE_STATES = [MultiAgentRunningState.CANCELLED, MultiAgentRunningState.TERMINATED]
@@ -26,14 +30,22 @@ class MultiAgentRunnerProcess(mp.Process):
         self.blueprint_results = []
         self.agent_running_states = [MultiAgentRunningState.RUNNING] * mission_data.n_agents
         self.running_state = MultiAgentRunningState.RUNNING
+        collaborative = mission_data.cooperativity is not Cooperativity.INDEPENDENT
+        self.task_allocator = TaskAllocator(mission_data) if mission_data.task_allocation and collaborative else None
 
     def run(self):
         manager = mp.Manager()
         blackboard = manager.dict()
         queue = manager.Queue()
+        simulator = start_simulator(self.mission_data) if self.mission_data.simulated else None
+        agent_names = self.mission_data.agent_names[:self.mission_data.n_agents]
+        explored_cells = {name: manager.list() for name in agent_names}
+        templates = [get_template(self.mission_data, role) if self.mission_data.tree_templates else None
+                     for role in range(self.mission_data.n_agents)]
 
         processes = [
-            MultiAgentProcess(self.running_event, self.mission_data, blackboard, queue, role)
+            MultiAgentProcess(self.running_event, self.mission_data, blackboard, queue, role, templates[role],
+                              explored_cells)
             for role in range(self.mission_data.n_agents)
         ]
         for process in processes:
@@ -43,6 +55,7 @@ class MultiAgentRunnerProcess(mp.Process):
             agent_data = queue.get(1000)
             self.cache_agent_data(agent_data)
             state = self.get_state(blackboard)
+            self.allocate_tasks(blackboard, state.blackboard)
             self.pipe[1].send(state)
             if self.running_state is not MultiAgentRunningState.RUNNING:
                 self.running_event.clear()
@@ -50,6 +63,8 @@ class MultiAgentRunnerProcess(mp.Process):
                     process.join()
                 break
 
+        if simulator is not None:
+            simulator.shutdown()
         print("All MultiAgentProcesses has stopped")
 
     def cache_agent_data(self, agent_data):
@@ -66,6 +81,13 @@ class MultiAgentRunnerProcess(mp.Process):
         if self.agent_alive[agent_data.role] and agent_data.running_state is MultiAgentRunningState.DECEASED:
             self.agent_alive[agent_data.role] = False
 
+    def allocate_tasks(self, blackboard, blackboard_copy):
+        if self.task_allocator is not None:
+            running_roles = [role for role, state in enumerate(self.agent_running_states)
+                             if state is MultiAgentRunningState.RUNNING]
+            self.task_allocator.update(blackboard, blackboard_copy, self.agent_positions, running_roles,
+                                       self.blueprint_results)
+
     def get_state(self, blackboard):
         bb = blackboard.copy()
         completion_time = self.get_completion_time()
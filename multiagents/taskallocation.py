@@ -0,0 +1,79 @@
+import numpy as np
+
+from goals.blueprint.blueprint import Blueprint
+
+
+def get_assignment_channel(channel):
+    return f"Assigned {channel}"
+
+
+def get_distances(agent_positions, positions):
+    # Horizontal distance from every agent to every position
+    offsets = np.asarray(positions)[:, np.newaxis, [0, 2]] - np.asarray(agent_positions)[np.newaxis, :, [0, 2]]
+    return np.linalg.norm(offsets, axis=2)
+
+
+def get_balanced_assignment(agent_positions, positions):
+    # Sequential auction, the agent index of every position. Each round the position that one of the agents would
+    # finish first, counting the distance it has already been given, goes to that agent, which then continues from
+    # there. Agents with less work take more positions, so the split follows the cost rather than equal counts.
+    agent_positions = np.array(agent_positions, dtype=float)
+    loads = np.zeros(len(agent_positions))
+    assignment = np.full(len(positions), -1, dtype=int)
+    for _ in range(len(positions)):
+        finish = loads[:, np.newaxis] + get_distances(agent_positions, positions).T
+        finish[:, assignment >= 0] = np.inf
+        agent, index = np.unravel_index(np.argmin(finish), finish.shape)
+        assignment[index] = agent
+        loads[agent] = finish[agent, index]
+        agent_positions[agent] = positions[index]
+    return assignment
+
+
+# Splits the blueprint positions that are left between the running agents by the distance each agent has to cover, and
+# publishes who should place what on the blackboard. The agents visit the positions assigned to them first, but an agent
+# that has none left goes on to the others', so nobody finishes early while there is work. An agent keeps the position
+# it has claimed. Allocates again whenever a position is completed, claimed, or an agent stops.
+class TaskAllocator:
+
+    def __init__(self, mission_data):
+        blueprints = [goal for goal in mission_data.goals if isinstance(goal, Blueprint)]
+        conditions = [condition for blueprint in blueprints for condition in blueprint.as_conditions(None)]
+        self.channels = [condition.name for condition in conditions]
+        self.positions = np.array([condition.position for condition in conditions]).reshape((len(conditions), 3))
+        self.agent_names = mission_data.agent_names
+        self.key = None
+        self.completed = set()
+        self.assignment = {}
+
+    def update(self, blackboard, blackboard_copy, agent_positions, running_roles, blueprint_results):
+        # Positions stay completed, the results come from whichever agent reported last
+        results = [result for blueprint_result in blueprint_results for result in blueprint_result]
+        self.completed.update(index for index, result in enumerate(results) if result)
+        remaining = [index for index in range(len(self.channels)) if index not in self.completed]
+        # Waits for every agent to report where it is, so that nobody is left out of the first allocation
+        if not running_roles or any(agent_positions[role] is None for role in running_roles):
+            return
+        names = [self.agent_names[role] for role in running_roles]
+        claims = {index: blackboard_copy.get(self.channels[index]) for index in remaining}
+        claims = {index: name for index, name in claims.items() if name in names}
+        key = (tuple(remaining), tuple(running_roles), tuple(sorted(claims.items())))
+        if key == self.key:
+            return
+        self.key = key
+
+        assignment = dict(claims)
+        # Agents that have claimed a position are counted from there
+        positions = [np.asarray(agent_positions[role], dtype=float) for role in running_roles]
+        for index, name in claims.items():
+            positions[names.index(name)] = self.positions[index]
+        free = [index for index in remaining if index not in claims]
+        if free:
+            for index, agent in zip(free, get_balanced_assignment(positions, self.positions[free])):
+                assignment[index] = names[agent]
+
+        for index, channel in enumerate(self.channels):
+            name = assignment.get(index, False)
+            if self.assignment.get(channel) != name:
+                blackboard[get_assignment_channel(channel)] = name
+                self.assignment[channel] = name
@@ -0,0 +1,83 @@
+from multiprocessing.managers import BaseManager
+
+from malmoutils.world_state import TimestampedText
+from simulator.world import VoxelWorld
+
+simulated_worlds = {}
+
+
+def create_world(mission_data):
+    world = VoxelWorld(mission_data)
+    world.start()
+    simulated_worlds[mission_data.experiment_id] = world
+    return world
+
+
+def get_world(experiment_id):
+    return simulated_worlds[experiment_id]
+
+
+# Serves the worlds to the agent processes, every agent reads and commands the same world through a proxy
+class SimulatorManager(BaseManager):
+    pass
+
+
+SimulatorManager.register("create_world", create_world)
+SimulatorManager.register("get_world", get_world)
+
+
+def start_simulator(mission_data):
+    manager = SimulatorManager()
+    manager.start()
+    manager.create_world(mission_data)
+    mission_data.simulator_address = manager.address
+    return manager
+
+
+def connect_to_world(mission_data):
+    if mission_data.simulator_address is None:
+        world = VoxelWorld(mission_data, wait_for_agents=False)
+        world.start()
+        return world
+    manager = SimulatorManager(address=mission_data.simulator_address)
+    manager.connect()
+    return manager.get_world(mission_data.experiment_id)
+
+
+class SimulatedWorldState:
+    def __init__(self, text, number_of_observations, is_mission_running, has_mission_begun):
+        self.observations = [TimestampedText(text)] if text is not None else []
+        self.number_of_observations_since_last_state = number_of_observations
+        self.number_of_video_frames_since_last_state = 0
+        self.number_of_rewards_since_last_state = 0
+        self.is_mission_running = is_mission_running
+        self.has_mission_begun = has_mission_begun
+        self.video_frames = []
+        self.rewards = []
+        self.errors = []
+
+
+# Takes the place of Malmo's AgentHost, backed by a VoxelWorld instead of a Minecraft client
+class SimulatedAgentHost:
+
+    def __init__(self, mission_data):
+        self.mission_data = mission_data
+        self.world = None
+        self.role = None
+
+    def startMission(self, mission, client_pool, mission_record, role, experiment_id):
+        self.role = role
+        self.world = connect_to_world(self.mission_data)
+        self.world.start_agent(role)
+
+    def getWorldState(self):
+        if self.world is None:
+            return SimulatedWorldState(None, 0, False, False)
+        return SimulatedWorldState(*self.world.get_world_state(self.role))
+
+    def sendCommand(self, command):
+        if self.world is not None:
+            self.world.send_command(self.role, command)
+
+    def killClient(self, client_info):
+        pass
@@ -0,0 +1,184 @@
+import zlib
+
+import numpy as np
+
+from items import items
+from world.palette import block_palette, CODE_DTYPE
+from world.worldgenerator import FlatWorldGenerator
+
+CHUNK_SIZE = 16
+WORLD_HEIGHT = 128
+
+DEFAULT_BASE_HEIGHT = 72  # First air block above the ground, before the hills are added
+DEFAULT_DIRT_DEPTH = 3
+# (lattice spacing, amplitude) of every octave of the default world heightmap, gentle enough that the experiments'
+# blueprints at y 71 sit on the ground like they do in Minecraft's default world
+DEFAULT_HEIGHT_OCTAVES = [(128, 2), (48, 0.5)]
+
+OUTCROPS_PER_CHUNK = 0.5
+MAX_OUTCROP_RADIUS = 2
+
+FLAT_TREES_PER_CHUNK = 0.3
+DEFAULT_TREES_PER_CHUNK = 1.5
+TREE_MARGIN = 2
+MIN_TRUNK_HEIGHT = 4
+MAX_TRUNK_HEIGHT = 6
+
+# (ore, veins per chunk, max vein size, max height)
+ORE_VEINS = [
+    (items.COAL_ORE, 20, 12, 128),
+    (items.IRON_ORE, 20, 8, 64),
+    (items.GOLD_ORE, 2, 8, 32),
+    (items.REDSTONE_ORE, 8, 7, 16),
+    (items.LAPIS_ORE, 1, 6, 32),
+    (items.DIAMOND_ORE, 1, 7, 16),
+]
+
+MINECRAFT_PREFIX = "minecraft:"
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+HASH_SHIFT = np.uint64(31)
+
+
+def get_seed(seed):
+    return int(seed) if str(seed).lstrip("-").isdigit() else zlib.crc32(str(seed).encode())
+
+
+def get_chunk_rng(seed, chunk_x, chunk_z, salt=0):
+    return np.random.default_rng([seed & 0xFFFFFFFF, chunk_x & 0xFFFFFFFF, chunk_z & 0xFFFFFFFF, salt])
+
+
+def hash_lattice(x, z, seed):
+    # Pseudo random value in [0, 1) for every lattice point, the same for every chunk that asks for it
+    x = x.astype(np.int64).astype(np.uint64)
+    z = z.astype(np.int64).astype(np.uint64)
+    value = (x * HASH_MULTIPLIER) ^ (z + np.uint64(seed & 0xFFFFFFFF))
+    value = value * HASH_MULTIPLIER
+    value = value ^ (value >> HASH_SHIFT)
+    value = value * HASH_MULTIPLIER
+    return (value >> np.uint64(11)).astype(np.float64) / 2 ** 53
+
+
+def get_value_noise(x, z, spacing, seed):
+    # Smoothly interpolated lattice noise in [0, 1)
+    lattice_x, fraction_x = np.divmod(x, spacing)
+    lattice_z, fraction_z = np.divmod(z, spacing)
+    fraction_x = fraction_x / spacing
+    fraction_z = fraction_z / spacing
+    fraction_x = fraction_x * fraction_x * (3 - 2 * fraction_x)
+    fraction_z = fraction_z * fraction_z * (3 - 2 * fraction_z)
+    corners = [[hash_lattice(lattice_x + dx, lattice_z + dz, seed) for dz in (0, 1)] for dx in (0, 1)]
+    bottom = corners[0][0] * (1 - fraction_x) + corners[1][0] * fraction_x
+    top = corners[0][1] * (1 - fraction_x) + corners[1][1] * fraction_x
+    return bottom * (1 - fraction_z) + top * fraction_z
+
+
+def parse_flat_world_layers(generator_string):
+    # "3;1*minecraft:bedrock,7*minecraft:dirt,1*minecraft:grass;35" lists the layers from the bottom up
+    layers = []
+    for layer in generator_string.split(";")[1].split(","):
+        amount, block = layer.split("*") if "*" in layer else (1, layer)
+        layers += [block.replace(MINECRAFT_PREFIX, "")] * int(amount)
+    return layers
+
+
+def add_tree(chunk, x, z, surface, rng):
+    # A trunk of logs with two wide and two narrow layers of leaves around the top
+    log = block_palette.get_code(items.LOG)
+    leaves = block_palette.get_code(items.LEAVES)
+    air = block_palette.get_code(items.AIR)
+    trunk_height = int(rng.integers(MIN_TRUNK_HEIGHT, MAX_TRUNK_HEIGHT + 1))
+    top = surface + trunk_height
+    if top + 2 >= WORLD_HEIGHT:
+        return
+    for y, radius in [(top - 2, 2), (top - 1, 2), (top, 1), (top + 1, 1)]:
+        layer = chunk[x - radius:x + radius + 1, y, z - radius:z + radius + 1]
+        layer[layer == air] = leaves
+    chunk[x, surface:top, z] = log
+
+
+def add_trees(chunk, heights, trees_per_chunk, rng):
+    grass = block_palette.get_code(items.GRASS)
+    for _ in range(rng.poisson(trees_per_chunk)):
+        x, z = rng.integers(TREE_MARGIN, CHUNK_SIZE - TREE_MARGIN, size=2)
+        surface = heights[x, z]
+        if surface < WORLD_HEIGHT and chunk[x, surface - 1, z] == grass:
+            add_tree(chunk, x, z, surface, rng)
+
+
+def add_outcrops(chunk, heights, rng):
+    # Patches of bare stone in the surface, the only stone in reach without digging down
+    stone = block_palette.get_code(items.STONE)
+    x, z = np.meshgrid(np.arange(CHUNK_SIZE), np.arange(CHUNK_SIZE), indexing="ij")
+    for _ in range(rng.poisson(OUTCROPS_PER_CHUNK)):
+        center_x, center_z = rng.integers(CHUNK_SIZE, size=2)
+        radius = rng.integers(1, MAX_OUTCROP_RADIUS + 1)
+        for column_x, column_z in zip(*np.nonzero((x - center_x) ** 2 + (z - center_z) ** 2 <= radius ** 2)):
+            surface = heights[column_x, column_z]
+            chunk[column_x, surface - DEFAULT_DIRT_DEPTH:surface, column_z] = stone
+
+
+def add_ore_veins(chunk, rng):
+    stone = block_palette.get_code(items.STONE)
+    for ore, veins, max_size, max_height in ORE_VEINS:
+        code = block_palette.get_code(ore)
+        for _ in range(veins):
+            position = np.array([rng.integers(CHUNK_SIZE), rng.integers(1, max_height), rng.integers(CHUNK_SIZE)])
+            for _ in range(rng.integers(1, max_size + 1)):
+                x, y, z = position
+                if 0 <= x < CHUNK_SIZE and 0 < y < WORLD_HEIGHT and 0 <= z < CHUNK_SIZE and chunk[x, y, z] == stone:
+                    chunk[x, y, z] = code
+                position = position + rng.integers(-1, 2, size=3)
+
+
+class FlatTerrain:
+    def __init__(self, generator_string, seed):
+        self.seed = seed
+        layers = parse_flat_world_layers(generator_string)
+        self.column = np.full(WORLD_HEIGHT, block_palette.get_code(items.AIR), dtype=CODE_DTYPE)
+        self.column[:len(layers)] = block_palette.encode(layers)
+        self.surface = len(layers)
+        self.with_trees = "decoration" in generator_string.split(";")[3:]
+
+    def generate_chunk(self, chunk_x, chunk_z):
+        chunk = np.broadcast_to(self.column[None, :, None], (CHUNK_SIZE, WORLD_HEIGHT, CHUNK_SIZE)).copy()
+        if self.with_trees:
+            heights = np.full((CHUNK_SIZE, CHUNK_SIZE), self.surface)
+            add_trees(chunk, heights, FLAT_TREES_PER_CHUNK, get_chunk_rng(self.seed, chunk_x, chunk_z))
+        return chunk
+
+
+class DefaultTerrain:
+    # Rolling hills of grass and dirt on stone with ore veins and trees, a cheap stand-in for Minecraft's default world
+    def __init__(self, seed):
+        self.seed = seed
+
+    def get_heights(self, chunk_x, chunk_z):
+        x, z = np.meshgrid(np.arange(CHUNK_SIZE) + chunk_x * CHUNK_SIZE, np.arange(CHUNK_SIZE) + chunk_z * CHUNK_SIZE,
+                           indexing="ij")
+        height = np.full(x.shape, float(DEFAULT_BASE_HEIGHT))
+        for octave, (spacing, amplitude) in enumerate(DEFAULT_HEIGHT_OCTAVES):
+            height += amplitude * (2 * get_value_noise(x, z, spacing, self.seed + octave) - 1)
+        return np.clip(np.round(height).astype(int), 1, WORLD_HEIGHT - 1)
+
+    def generate_chunk(self, chunk_x, chunk_z):
+        heights = self.get_heights(chunk_x, chunk_z)
+        y = np.arange(WORLD_HEIGHT)[None, :, None]
+        surface = heights[:, None, :]
+        chunk = np.full((CHUNK_SIZE, WORLD_HEIGHT, CHUNK_SIZE), block_palette.get_code(items.AIR), dtype=CODE_DTYPE)
+        chunk[np.broadcast_to(y < surface - DEFAULT_DIRT_DEPTH, chunk.shape)] = block_palette.get_code(items.STONE)
+        dirt = (y >= surface - DEFAULT_DIRT_DEPTH) & (y < surface - 1)
+        chunk[np.broadcast_to(dirt, chunk.shape)] = block_palette.get_code(items.DIRT)
+        chunk[np.broadcast_to(y == surface - 1, chunk.shape)] = block_palette.get_code(items.GRASS)
+        add_outcrops(chunk, heights, get_chunk_rng(self.seed, chunk_x, chunk_z, 2))
+        add_ore_veins(chunk, get_chunk_rng(self.seed, chunk_x, chunk_z, 1))
+        chunk[:, 0, :] = block_palette.get_code(items.BEDROCK)
+        add_trees(chunk, heights, DEFAULT_TREES_PER_CHUNK, get_chunk_rng(self.seed, chunk_x, chunk_z))
+        return chunk
+
+
+def get_terrain(world_generator):
+    seed = get_seed(world_generator.seed)
+    if isinstance(world_generator, FlatWorldGenerator):
+        return FlatTerrain(world_generator.generator_string, seed)
+    else:
+        return DefaultTerrain(seed)
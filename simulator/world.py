@@ -0,0 +1,721 @@
+import json
+import re
+import threading
+import time
+
+import numpy as np
+
+from items import items, variants
+from items.gathering import GatheringTier, get_gathering_tier_by_pickaxe, get_break_seconds, can_harvest
+from items.inventory import Inventory
+from items.materials import materials
+from items.recipes import get_recipe
+from mobs import animals, enemies
+from simulator.terrain import CHUNK_SIZE, WORLD_HEIGHT, get_terrain
+from utils.constants import ATTACK_REACH, TICKS_PER_SECOND
+from world.observation import Observation
+from world.observer import EYE_HEIGHT
+from world.palette import block_palette, CODE_DTYPE, PALETTE_CAPACITY, traversable_lookup, narrow_lookup
+
+INVENTORY_SIZE = 41
+MAX_STACK = 64
+MAX_LIFE = 20
+
+# Movement per game tick, like Minecraft at 20 ticks per second
+WALK_SPEED = 0.216
+TURN_SPEED = 9
+PITCH_SPEED = 9
+GRAVITY = 0.08
+DRAG = 0.98
+JUMP_VELOCITY = 0.42
+MAX_PITCH = 90
+
+PLAYER_WIDTH = 0.6
+PLAYER_HEIGHT = 1.8
+NARROW_BLOCK_HEIGHT = 1.5
+BLOCK_REACH = 4.5
+LOS_DISTANCE = 20
+
+ATTACK_COOLDOWN = 10
+KNOCKBACK_SPEED = 0.4
+KNOCKBACK_JUMP = 0.36
+KNOCKBACK_DRAG = 0.6
+HAND_DAMAGE = 1
+PICKUP_DELAY = 10
+PICKUP_RANGE = 1.5
+PICKUP_SIZE = 0.25
+
+ZOMBIE_LIFE = 20
+ZOMBIE_SPEED = 0.12
+ZOMBIE_DAMAGE = 3
+ZOMBIE_ATTACK_RANGE = 1.5
+ZOMBIE_ATTACK_COOLDOWN = 20
+ZOMBIE_FOLLOW_RANGE = 40
+
+CONTINUOUS_COMMANDS = ["move", "turn", "strafe", "pitch", "jump", "attack"]
+HOTBAR_COMMAND = "hotbar."
+SUMMON_COMMAND = "/summon"
+HAND_ITEM_PATTERN = re.compile(r"id:(\w+)")
+UNPACED_WAIT_TIMEOUT = 1  # Seconds an unpaced world waits for an agent to observe a tick before stepping without it
+
+UNBREAKABLE = [items.BEDROCK, items.WATER, items.FLOWING_WATER, items.LAVA, items.FLOWING_LAVA]
+BLOCK_DROPS = {
+    items.STONE: items.COBBLESTONE,
+    items.GRASS: items.DIRT,
+    items.COAL_ORE: items.COAL,
+    items.DIAMOND_ORE: items.DIAMOND,
+    items.REDSTONE_ORE: None,
+    items.LAPIS_ORE: None,
+    items.LEAVES: None,
+    items.LEAVES_2: None,
+    items.TALL_GRASS: None,
+    items.PLANT: None,
+}
+BLOCK_VARIANTS = {items.LOG: variants.OAK, items.LOG_2: "acacia", items.PLANKS: variants.OAK}
+PLACEABLE = [items.DIRT, items.STONE, items.COBBLESTONE, items.PLANKS, items.LOG, items.LOG_2, items.FENCE,
+             items.ACACIA_FENCE, items.CRAFTING_TABLE, items.FURNACE, items.SAND, items.GRAVEL, items.OBSIDIAN]
+UNSTACKABLE = [items.WOODEN_PICKAXE, items.STONE_PICKAXE, items.IRON_PICKAXE, items.DIAMOND_PICKAXE,
+               items.WOODEN_SWORD, items.STONE_SWORD, items.IRON_SWORD, items.DIAMOND_SWORD, items.IRON_HELMET]
+WEAPON_DAMAGE = {items.WOODEN_SWORD: 4, items.STONE_SWORD: 5, items.IRON_SWORD: 6, items.DIAMOND_SWORD: 7}
+ENTITY_SIZE = {animals.COW: (0.9, 1.4), animals.SHEEP: (0.9, 1.3), animals.PIG: (0.9, 0.9),
+               animals.CHICKEN: (0.4, 0.7), animals.HORSE: (1.4, 1.6)}
+ANIMAL_LOOT = {animal: item for item, animal in animals.loot.items()}
+RAY_TRANSPARENT = [items.AIR, items.WATER, items.FLOWING_WATER]
+
+
+def get_block_heights():
+    # Height of the collision box of every block code, zero for blocks you can walk through
+    heights = np.ones(PALETTE_CAPACITY)
+    heights[traversable_lookup] = 0
+    heights[narrow_lookup] = NARROW_BLOCK_HEIGHT
+    return heights
+
+
+def get_look_vector(yaw, pitch):
+    yaw = np.radians(yaw)
+    pitch = np.radians(pitch)
+    return np.array([-np.sin(yaw) * np.cos(pitch), -np.sin(pitch), np.cos(yaw) * np.cos(pitch)])
+
+
+def get_ray_box_distance(origin, direction, box_min, box_max):
+    # Slab test, the distance along the ray to where it enters the box or None if it misses
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t1 = (box_min - origin) / direction
+        t2 = (box_max - origin) / direction
+    t_near = np.nanmax(np.minimum(t1, t2))
+    t_far = np.nanmin(np.maximum(t1, t2))
+    return t_near if t_near <= t_far and t_far >= 0 and t_near >= 0 else None
+
+
+def parse_craft_arguments(arguments):
+    # "planks acacia" or "acacia_fence", as sent by MalmoInterface.craft
+    item = arguments[0]
+    variant = arguments[1] if len(arguments) > 1 else variants.OAK
+    if get_recipe(item) is None and "_" in item:
+        variant, _, base_item = item.partition("_")
+        if get_recipe(base_item) is not None:
+            return item, variant, base_item
+    return item, variant, item
+
+
+class SimulatedInventory:
+    def __init__(self, start_inventory=None):
+        self.slots = [[items.AIR, 0, None] for _ in range(INVENTORY_SIZE)]
+        self.selected = 0
+        for item, slot in start_inventory if start_inventory else []:
+            self.slots[slot] = [item, 1, BLOCK_VARIANTS.get(item)]
+
+    def get_selected_item(self):
+        return self.slots[self.selected][0]
+
+    def add(self, item, amount=1, variant=None):
+        max_stack = 1 if item in UNSTACKABLE else MAX_STACK
+        for slot in self.slots:
+            if slot[0] == item and slot[2] == variant and slot[1] < max_stack:
+                added = min(amount, max_stack - slot[1])
+                slot[1] += added
+                amount -= added
+            if amount == 0:
+                return
+        for slot in self.slots[:INVENTORY_SIZE - 5]:
+            if slot[0] == items.AIR:
+                added = min(amount, max_stack)
+                slot[:] = [item, added, variant]
+                amount -= added
+            if amount == 0:
+                return
+
+    def remove_from_slot(self, index, amount=1):
+        slot = self.slots[index]
+        slot[1] -= amount
+        if slot[1] <= 0:
+            slot[:] = [items.AIR, 0, None]
+
+    def find_ingredient(self, ingredient, variant):
+        # Slots and amounts to take the ingredient from, preferring the requested variant
+        candidates = [i for i, slot in enumerate(self.slots) if slot[0] in materials.get(ingredient.item).variant_set]
+        candidates.sort(key=lambda i: self.slots[i][2] != variant)
+        if ingredient.same_variant:
+            groups = {}
+            for i in candidates:
+                groups.setdefault(self.slots[i][2], []).append(i)
+            candidates = next((group for group in groups.values()
+                               if sum(self.slots[i][1] for i in group) >= ingredient.amount), [])
+        taken = []
+        remaining = ingredient.amount
+        for i in candidates:
+            amount = min(remaining, self.slots[i][1])
+            taken.append((i, amount))
+            remaining -= amount
+            if remaining == 0:
+                return taken
+        return None
+
+    def get_info(self):
+        info = {"inventoriesAvailable": [{"name": "inventory", "size": INVENTORY_SIZE}],
+                Inventory.KEY_CURRENT_SELECTION: self.selected}
+        for i, (item, amount, variant) in enumerate(self.slots):
+            info[f"InventorySlot_{i}_item"] = item
+            info[f"InventorySlot_{i}_size"] = amount
+            if variant is not None:
+                info[f"InventorySlot_{i}_variant"] = variant
+        return info
+
+
+class SimulatedEntity:
+    def __init__(self, name, position, life=None, width=PLAYER_WIDTH, height=PLAYER_HEIGHT):
+        self.name = name
+        self.position = np.array(position, dtype=float)
+        self.life = life
+        self.width = width
+        self.height = height
+        self.yaw = 0.0
+        self.vertical_speed = 0.0
+        self.knockback = np.zeros(3)
+        self.on_ground = False
+        self.cooldown = 0
+        self.hand_item = None
+
+    def get_box(self, position=None):
+        position = self.position if position is None else position
+        half_width = self.width / 2
+        return position - [half_width, 0, half_width], position + [half_width, self.height, half_width]
+
+    def get_info(self):
+        info = {Observation.ENTITY_NAME: self.name, Observation.ENTITY_X: self.position[0],
+                Observation.ENTITY_Y: self.position[1], Observation.ENTITY_Z: self.position[2], "yaw": self.yaw}
+        if self.life is not None:
+            info[Observation.ENTITY_LIFE] = self.life
+        return info
+
+
+class SimulatedPickUp(SimulatedEntity):
+    def __init__(self, item, position, amount=1, variant=None):
+        super().__init__(item, position, None, PICKUP_SIZE, PICKUP_SIZE)
+        self.amount = amount
+        self.variant = variant
+        self.age = 0
+
+    def get_info(self):
+        info = super().get_info()
+        info["quantity"] = self.amount
+        return info
+
+
+class SimulatedAgent(SimulatedEntity):
+    def __init__(self, name, role, position, pitch, start_inventory):
+        super().__init__(name, position, MAX_LIFE)
+        self.role = role
+        self.pitch = float(pitch)
+        self.inventory = SimulatedInventory(start_inventory)
+        self.controls = {command: 0.0 for command in CONTINUOUS_COMMANDS}
+        self.running = True
+        self.last_read_tick = 0
+        self.mining_position = None
+        self.mining_ticks = 0
+
+    def is_alive(self):
+        return self.life > 0
+
+
+# A small Minecraft of chunk columns of palette codes, stepped one game tick at a time. Agents control it with the
+# same commands as Malmo and read the same JSON observations, see SimulatedAgentHost.
+class VoxelWorld:
+
+    def __init__(self, mission_data, wait_for_agents=True):
+        self.mission_data = mission_data
+        self.wait_for_agents = wait_for_agents
+        self.terrain = get_terrain(mission_data.world_generator)
+        self.cuboids = mission_data.world_generator.cuboids
+        self.chunks = {}
+        self.agents = {}
+        self.entities = []
+        self.pickups = []
+        self.tick = 0
+        self.lock = threading.RLock()
+        self.observed = threading.Condition(self.lock)
+        self.thread = None
+        self.stopped = False
+        self.block_heights = get_block_heights()
+        self.ray_transparent_lookup = block_palette.get_lookup(RAY_TRANSPARENT)
+        self.quoted_names = None
+
+    # Blocks
+
+    def get_chunk(self, chunk_x, chunk_z):
+        chunk = self.chunks.get((chunk_x, chunk_z))
+        if chunk is None:
+            chunk = self.terrain.generate_chunk(chunk_x, chunk_z)
+            self.add_cuboids(chunk, chunk_x, chunk_z)
+            self.chunks[(chunk_x, chunk_z)] = chunk
+        return chunk
+
+    def add_cuboids(self, chunk, chunk_x, chunk_z):
+        chunk_start = np.array([chunk_x * CHUNK_SIZE, 0, chunk_z * CHUNK_SIZE])
+        chunk_end = chunk_start + [CHUNK_SIZE - 1, WORLD_HEIGHT - 1, CHUNK_SIZE - 1]
+        for cuboid in self.cuboids:
+            start = np.maximum(np.min(cuboid.range, axis=0), chunk_start)
+            end = np.minimum(np.max(cuboid.range, axis=0), chunk_end)
+            if np.all(start <= end):
+                start, end = start - chunk_start, end - chunk_start + 1
+                chunk[start[0]:end[0], start[1]:end[1], start[2]:end[2]] = block_palette.get_code(cuboid.type)
+
+    def get_block(self, position):
+        x, y, z = (int(np.floor(coordinate)) for coordinate in position)
+        if y < 0 or y >= WORLD_HEIGHT:
+            return block_palette.get_code(items.AIR)
+        return self.get_chunk(x // CHUNK_SIZE, z // CHUNK_SIZE)[x % CHUNK_SIZE, y, z % CHUNK_SIZE]
+
+    def set_block(self, position, block):
+        x, y, z = (int(coordinate) for coordinate in position)
+        if 0 <= y < WORLD_HEIGHT:
+            self.get_chunk(x // CHUNK_SIZE, z // CHUNK_SIZE)[x % CHUNK_SIZE, y, z % CHUNK_SIZE] = \
+                block_palette.get_code(block)
+
+    def get_region(self, start, size):
+        # Block codes from {start} with shape {size}, indexed by x, y, z
+        region = np.full(size, block_palette.get_code(items.AIR), dtype=CODE_DTYPE)
+        start = np.array(start, dtype=int)
+        end = start + size
+        y_start, y_end = max(start[1], 0), min(end[1], WORLD_HEIGHT)
+        if y_start >= y_end:
+            return region
+        for chunk_x in range(start[0] // CHUNK_SIZE, (end[0] - 1) // CHUNK_SIZE + 1):
+            for chunk_z in range(start[2] // CHUNK_SIZE, (end[2] - 1) // CHUNK_SIZE + 1):
+                chunk = self.get_chunk(chunk_x, chunk_z)
+                x_start = max(start[0], chunk_x * CHUNK_SIZE)
+                x_end = min(end[0], (chunk_x + 1) * CHUNK_SIZE)
+                z_start = max(start[2], chunk_z * CHUNK_SIZE)
+                z_end = min(end[2], (chunk_z + 1) * CHUNK_SIZE)
+                region[x_start - start[0]:x_end - start[0], y_start - start[1]:y_end - start[1],
+                       z_start - start[2]:z_end - start[2]] = \
+                    chunk[x_start - chunk_x * CHUNK_SIZE:x_end - chunk_x * CHUNK_SIZE, y_start:y_end,
+                          z_start - chunk_z * CHUNK_SIZE:z_end - chunk_z * CHUNK_SIZE]
+        return region
+
+    def collides(self, entity, position):
+        box_min, box_max = entity.get_box(position)
+        x_range = range(int(np.floor(box_min[0])), int(np.floor(box_max[0] - 1e-9)) + 1)
+        z_range = range(int(np.floor(box_min[2])), int(np.floor(box_max[2] - 1e-9)) + 1)
+        # One block further down, fences stick out of their block
+        y_range = range(int(np.floor(box_min[1])) - 1, int(np.floor(box_max[1] - 1e-9)) + 1)
+        for x in x_range:
+            for y in y_range:
+                for z in z_range:
+                    height = self.block_heights[self.get_block((x, y, z))]
+                    if height > 0 and box_min[1] < y + height and box_max[1] > y:
+                        return True
+        return False
+
+    def get_ground_height(self, entity, position):
+        # Top of the highest block below the entity's box, for landing exactly on it
+        box_min, box_max = entity.get_box(position)
+        top = None
+        for x in range(int(np.floor(box_min[0])), int(np.floor(box_max[0] - 1e-9)) + 1):
+            for z in range(int(np.floor(box_min[2])), int(np.floor(box_max[2] - 1e-9)) + 1):
+                for y in range(int(np.floor(box_min[1])) - 1, int(np.floor(box_max[1])) + 1):
+                    height = self.block_heights[self.get_block((x, y, z))]
+                    if height > 0 and box_min[1] < y + height and (top is None or y + height > top):
+                        top = y + height
+        return top
+
+    # Entities
+
+    def start_agent(self, role):
+        with self.lock:
+            if role in self.agents:
+                return
+            name = self.mission_data.agent_names[role]
+            start_positions = self.mission_data.start_positions
+            block = start_positions[role] if start_positions is not None and start_positions[role] else [0, 64, 0]
+            agent = SimulatedAgent(name, role, [block[0] + 0.5, block[1], block[2] + 0.5],
+                                   self.mission_data.start_pitch, self.mission_data.start_inventory)
+            while self.collides(agent, agent.position) and agent.position[1] < WORLD_HEIGHT:
+                agent.position[1] += 1
+            agent.last_read_tick = self.tick
+            self.agents[role] = agent
+            self.observed.notify_all()
+
+    def summon(self, entity_type, position, hand_item=None):
+        width, height = ENTITY_SIZE.get(entity_type, (PLAYER_WIDTH, PLAYER_HEIGHT))
+        life = ZOMBIE_LIFE if entity_type in enemies.types else animals.starting_life.get(entity_type, MAX_LIFE / 2)
+        entity = SimulatedEntity(entity_type, position, life, width, height)
+        entity.hand_item = hand_item
+        self.entities.append(entity)
+
+    def get_living_entities(self):
+        return [agent for agent in self.agents.values() if agent.is_alive()] + self.entities
+
+    def move(self, entity, horizontal_motion):
+        # Minecraft style movement, one axis at a time and stopping at the first block in the way
+        blocked = False
+        horizontal_motion = horizontal_motion + entity.knockback
+        entity.knockback *= KNOCKBACK_DRAG
+        for axis in (0, 2):
+            if horizontal_motion[axis] != 0:
+                position = entity.position.copy()
+                position[axis] += horizontal_motion[axis]
+                if self.collides(entity, position):
+                    blocked = True
+                else:
+                    entity.position = position
+
+        # Moved before gravity is applied, as in Minecraft, which is what lets a jump clear a block
+        position = entity.position.copy()
+        position[1] += entity.vertical_speed
+        if self.collides(entity, position):
+            if entity.vertical_speed < 0:
+                ground = self.get_ground_height(entity, position)
+                if ground is not None:
+                    entity.position[1] = ground
+                entity.on_ground = True
+            entity.vertical_speed = 0
+        else:
+            entity.position = position
+            entity.on_ground = False
+        entity.vertical_speed = (entity.vertical_speed - GRAVITY) * DRAG
+        return blocked
+
+    def step_agent(self, agent):
+        controls = agent.controls
+        agent.yaw = (agent.yaw + TURN_SPEED * controls["turn"]) % 360
+        agent.pitch = float(np.clip(agent.pitch + PITCH_SPEED * controls["pitch"], -MAX_PITCH, MAX_PITCH))
+
+        yaw = np.radians(agent.yaw)
+        forward = np.array([-np.sin(yaw), 0, np.cos(yaw)])
+        right = np.array([-np.cos(yaw), 0, -np.sin(yaw)])
+        motion = WALK_SPEED * (np.clip(controls["move"], -1, 1) * forward + np.clip(controls["strafe"], -1, 1) * right)
+        if controls["jump"] and agent.on_ground:
+            agent.vertical_speed = JUMP_VELOCITY
+        self.move(agent, motion)
+
+        agent.cooldown = max(0, agent.cooldown - 1)
+        if controls["attack"]:
+            self.attack(agent)
+        else:
+            agent.mining_position = None
+
+    def step_mob(self, mob):
+        mob.cooldown = max(0, mob.cooldown - 1)
+        targets = [agent for agent in self.agents.values() if agent.is_alive()] if mob.name in enemies.types else []
+        distances = [np.linalg.norm(agent.position - mob.position) for agent in targets]
+        if not targets or min(distances) > ZOMBIE_FOLLOW_RANGE:
+            self.move(mob, np.zeros(3))
+            return
+
+        target = targets[int(np.argmin(distances))]
+        offset = target.position - mob.position
+        flat_offset = np.array([offset[0], 0, offset[2]])
+        flat_distance = np.linalg.norm(flat_offset)
+        if flat_distance > 0:
+            mob.yaw = float(np.degrees(np.arctan2(-offset[0], offset[2])) % 360)
+        if min(distances) <= ZOMBIE_ATTACK_RANGE:
+            if mob.cooldown == 0:
+                self.damage(target, WEAPON_DAMAGE.get(mob.hand_item, ZOMBIE_DAMAGE), mob)
+                mob.cooldown = ZOMBIE_ATTACK_COOLDOWN
+            self.move(mob, np.zeros(3))
+        else:
+            blocked = self.move(mob, ZOMBIE_SPEED * flat_offset / max(flat_distance, 1e-9))
+            if blocked and mob.on_ground:
+                mob.vertical_speed = JUMP_VELOCITY
+
+    def step_pickups(self):
+        for pickup in list(self.pickups):
+            pickup.age += 1
+            self.move(pickup, np.zeros(3))
+            if pickup.age < PICKUP_DELAY:
+                continue
+            for agent in self.agents.values():
+                offset = pickup.position - agent.position
+                if agent.is_alive() and np.linalg.norm([offset[0], offset[2]]) <= PICKUP_RANGE \
+                        and -1 <= offset[1] <= PLAYER_HEIGHT:
+                    agent.inventory.add(pickup.name, pickup.amount, pickup.variant)
+                    self.pickups.remove(pickup)
+                    break
+
+    def drop(self, item, position, amount=1, variant=None):
+        self.pickups.append(SimulatedPickUp(item, position, amount, variant))
+
+    # Actions
+
+    def get_line_of_sight(self, agent):
+        # Voxel traversal from the eyes, returns (hit type, name, hit position, distance, block position, face normal)
+        origin = agent.position + [0, EYE_HEIGHT, 0]
+        direction = get_look_vector(agent.yaw, agent.pitch)
+        block = np.floor(origin).astype(int)
+        step = np.sign(direction).astype(int)
+        with np.errstate(divide="ignore"):
+            t_delta = np.abs(1 / direction)
+            t_max = np.where(step > 0, block + 1 - origin, origin - block) * t_delta
+        t_max[step == 0] = np.inf
+
+        hit = None
+        distance = 0
+        normal = np.zeros(3, dtype=int)
+        while distance <= LOS_DISTANCE:
+            code = self.get_block(block)
+            if not self.ray_transparent_lookup[code]:
+                hit_position = origin + distance * direction
+                axis = np.flatnonzero(normal)
+                if axis.size > 0:
+                    hit_position[axis[0]] = block[axis[0]] + (1 if normal[axis[0]] > 0 else 0)
+                hit = ("block", block_palette.get_name(code), hit_position, distance, block.copy(), normal)
+                break
+            axis = int(np.argmin(t_max))
+            distance = t_max[axis]
+            block[axis] += step[axis]
+            t_max[axis] += t_delta[axis]
+            normal = np.zeros(3, dtype=int)
+            normal[axis] = -step[axis]
+
+        for entity in self.get_living_entities() + self.pickups:
+            if entity is agent:
+                continue
+            box_min, box_max = entity.get_box()
+            entity_distance = get_ray_box_distance(origin, direction, box_min, box_max)
+            if entity_distance is not None and entity_distance <= LOS_DISTANCE \
+                    and (hit is None or entity_distance < hit[3]):
+                hit = ("entity", entity.name, origin + entity_distance * direction, entity_distance, entity, None)
+        return hit
+
+    def attack(self, agent):
+        hit = self.get_line_of_sight(agent)
+        if hit is None:
+            agent.mining_position = None
+            return
+        hit_type, name, _, distance, target, _ = hit
+        if hit_type == "entity":
+            agent.mining_position = None
+            if distance <= ATTACK_REACH and agent.cooldown == 0 and target.life is not None:
+                self.damage(target, WEAPON_DAMAGE.get(agent.inventory.get_selected_item(), HAND_DAMAGE), agent)
+                agent.cooldown = ATTACK_COOLDOWN
+        elif distance <= BLOCK_REACH and name not in UNBREAKABLE:
+            position = tuple(target)
+            if agent.mining_position != position:
+                agent.mining_position = position
+                agent.mining_ticks = 0
+            agent.mining_ticks += 1
+            if agent.mining_ticks >= self.get_break_ticks(name, agent.inventory.get_selected_item()):
+                self.break_block(position, name, agent.inventory.get_selected_item())
+                agent.mining_position = None
+        else:
+            agent.mining_position = None
+
+    def get_break_ticks(self, block, tool):
+        tier = get_gathering_tier_by_pickaxe(tool) or GatheringTier.BASE
+        return max(1, round(TICKS_PER_SECOND * get_break_seconds(block, tier)))
+
+    def break_block(self, position, block, tool):
+        self.set_block(position, items.AIR)
+        if not can_harvest(block, get_gathering_tier_by_pickaxe(tool) or GatheringTier.BASE):
+            return
+        drop = BLOCK_DROPS.get(block, block)
+        if drop is not None:
+            self.drop(drop, np.array(position) + [0.5, 0, 0.5], 1, BLOCK_VARIANTS.get(drop))
+
+    def damage(self, entity, damage, attacker):
+        entity.life = max(0.0, entity.life - damage)
+        # Pushed away from the attacker, which keeps melee fights from being decided by who hits first
+        offset = entity.position - attacker.position
+        offset[1] = 0
+        entity.knockback = KNOCKBACK_SPEED * offset / max(np.linalg.norm(offset), 1e-9)
+        if entity.on_ground:
+            entity.vertical_speed = KNOCKBACK_JUMP
+        if entity.life <= 0 and entity in self.entities:
+            self.entities.remove(entity)
+            loot = ANIMAL_LOOT.get(entity.name)
+            if loot is not None:
+                self.drop(loot, entity.position)
+
+    def use(self, agent):
+        item = agent.inventory.get_selected_item()
+        hit = self.get_line_of_sight(agent)
+        if item not in PLACEABLE or hit is None or hit[0] != "block" or hit[3] > BLOCK_REACH:
+            return
+        position = hit[4] + hit[5]
+        if not traversable_lookup[self.get_block(position)]:
+            return
+        block_min, block_max = position, position + [1, self.block_heights[block_palette.get_code(item)], 1]
+        for entity in self.get_living_entities():
+            box_min, box_max = entity.get_box()
+            if np.all(box_min < block_max) and np.all(box_max > block_min):
+                return
+        self.set_block(position, item)
+        agent.inventory.remove_from_slot(agent.inventory.selected)
+
+    def craft(self, agent, arguments):
+        item, variant, recipe_item = parse_craft_arguments(arguments)
+        recipe = get_recipe(recipe_item)
+        if recipe is None:
+            return
+        inventory = agent.inventory
+        # The furnace recipes list their fuel as an ingredient
+        taken = [inventory.find_ingredient(ingredient, variant) for ingredient in recipe.ingredients]
+        if any(slots is None for slots in taken):
+            return
+
+        output_variant = None
+        if recipe_item in BLOCK_VARIANTS:
+            output_variant = inventory.slots[taken[0][0][0]][2]
+        for slots in taken:
+            for i, amount in slots:
+                inventory.remove_from_slot(i, amount)
+        inventory.add(item, recipe.output_amount, output_variant)
+
+    def swap_items(self, agent, first, second):
+        slots = agent.inventory.slots
+        slots[first], slots[second] = slots[second], slots[first]
+
+    def chat(self, agent, message):
+        arguments = message.split(" ", 5)
+        if arguments[0] == SUMMON_COMMAND and len(arguments) >= 5:
+            hand_item = HAND_ITEM_PATTERN.search(arguments[5]) if len(arguments) > 5 else None
+            position = [float(coordinate) for coordinate in arguments[2:5]]
+            self.summon(arguments[1], position, hand_item.group(1) if hand_item else None)
+
+    # AgentHost interface
+
+    def send_command(self, role, command):
+        with self.lock:
+            agent = self.agents.get(role)
+            if agent is None or not agent.running:
+                return
+            verb, _, argument = command.partition(" ")
+            if verb in CONTINUOUS_COMMANDS:
+                value = float(argument)
+                if np.isfinite(value):  # Malmo can't parse nan and ignores the command
+                    agent.controls[verb] = value
+            elif verb.startswith(HOTBAR_COMMAND):
+                if argument == "1":
+                    agent.inventory.selected = int(verb[len(HOTBAR_COMMAND):]) - 1
+            elif verb == "use":
+                self.use(agent)
+            elif verb == "craft":
+                self.craft(agent, argument.split())
+            elif verb == "swapInventoryItems":
+                self.swap_items(agent, *(int(slot) for slot in argument.split()))
+            elif verb == "chat":
+                self.chat(agent, argument)
+            elif verb == "quit":
+                agent.running = False
+
+    def has_mission_begun(self):
+        return not self.wait_for_agents or len(self.agents) == self.mission_data.n_agents
+
+    def get_world_state(self, role):
+        # (observation text, observations since the last call, is the mission running, has the mission begun)
+        with self.lock:
+            agent = self.agents.get(role)
+            if agent is None:
+                return None, 0, False, False
+            begun = self.has_mission_begun()
+            running = begun and agent.running and not self.stopped
+            new_observations = self.tick - agent.last_read_tick
+            if not running or new_observations == 0:
+                return None, 0, running, begun
+            agent.last_read_tick = self.tick
+            self.observed.notify_all()
+            return self.get_observation(agent), new_observations, running, begun
+
+    # Observations
+
+    def get_observation(self, agent):
+        info = {
+            Observation.NAME: agent.name,
+            Observation.LIFE: agent.life,
+            Observation.X: agent.position[0],
+            Observation.Y: agent.position[1],
+            Observation.Z: agent.position[2],
+            Observation.YAW: agent.yaw,
+            Observation.PITCH: agent.pitch,
+        }
+        hit = self.get_line_of_sight(agent)
+        if hit is not None:
+            hit_type, name, position, distance, _, _ = hit
+            info[Observation.LOS] = {
+                Observation.LOS_HIT_TYPE: hit_type, Observation.LOS_TYPE: name, "distance": distance,
+                "inRange": bool(distance <= BLOCK_REACH), Observation.LOS_X: position[0],
+                Observation.LOS_Y: position[1], Observation.LOS_Z: position[2]
+            }
+        info[Observation.ENTITIES] = self.get_entities_info(agent)
+        info.update(agent.inventory.get_info())
+
+        grids = [self.get_grid_json(self.mission_data.grid_local, np.floor(agent.position))]
+        grids += [self.get_grid_json(grid_spec, np.zeros(3)) for grid_spec in self.mission_data.grids_global]
+        return json.dumps(info, default=float)[:-1] + "," + ",".join(grids) + "}"
+
+    def get_entities_info(self, agent):
+        entities_range = np.array(self.mission_data.obs_entities_range)
+        return [entity.get_info() for entity in self.get_living_entities() + self.pickups
+                if np.all(np.abs(entity.position - agent.position) <= entities_range)]
+
+    def get_grid_json(self, grid_spec, origin):
+        if self.quoted_names is None or len(self.quoted_names) != len(block_palette):
+            self.quoted_names = np.array([f'"{name}"' for name in block_palette.names], dtype=object)
+        start = origin.astype(int) + grid_spec.grid_range[:, 0]
+        region = self.get_region(start, grid_spec.get_grid_size())
+        # Malmo lists the blocks x first, then z, then y
+        names = self.quoted_names[np.transpose(region, (1, 2, 0)).ravel()]
+        return f'"{grid_spec.name}":[{",".join(names)}]'
+
+    # Ticking
+
+    def step(self):
+        with self.lock:
+            if not self.has_mission_begun():
+                return
+            for agent in self.agents.values():
+                if agent.running and agent.is_alive():
+                    self.step_agent(agent)
+            for mob in list(self.entities):
+                self.step_mob(mob)
+            self.step_pickups()
+            self.tick += 1
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        # Paced at ms_per_tick like Minecraft, or with ms_per_tick 0 stepped as soon as the agents have observed the
+        # last tick, so that a mission takes as long as its agents' ticks and no longer
+        tick_time = self.mission_data.ms_per_tick / 1000
+        next_tick = time.perf_counter()
+        while not self.stopped:
+            if tick_time == 0:
+                with self.observed:
+                    self.observed.wait_for(self.have_agents_observed, UNPACED_WAIT_TIMEOUT)
+            self.step()
+            next_tick += tick_time
+            time.sleep(max(0.0, next_tick - time.perf_counter()))
+
+    def have_agents_observed(self):
+        if self.stopped:
+            return True
+        if not self.has_mission_begun():
+            return False
+        return all(agent.last_read_tick == self.tick for agent in self.agents.values()
+                   if agent.running and agent.is_alive())
+
+    def stop(self):
+        self.stopped = True
@@ -0,0 +1,89 @@
+import json
+
+import numpy as np
+import pytest
+
+from experiment.benchmark import get_mission_data, get_synthetic_grid, get_synthetic_info
+from items import items
+from malmoutils.world_state import TimestampedText
+from world.hitmasks import HitMaskCache
+from world.observation import Observation
+from world.observer import Observer
+
+MATERIALS = [items.LOG, items.STONE, items.COAL_ORE, items.DIRT, items.AIR]
+TICKS = 8
+WORLD_SIZE = (200, 9, 200)
+WORLD_ORIGIN = np.array([30, 8, -100])
+START_POSITION = np.array([130, 10, 9])
+
+
+def get_world():
+    size_x, size_y, size_z = WORLD_SIZE
+    world = get_synthetic_grid(WORLD_SIZE, np.random.default_rng(0), 0.05)
+    return np.transpose(np.array(world, dtype=object).reshape((size_y, size_z, size_x)), (2, 0, 1))
+
+
+def get_observation(mission_data, world, position):
+    # Cuts the local grid out of one world, so that the grids of neighbouring positions overlap like in Malmo
+    info = get_synthetic_info(mission_data, position)
+    (min_x, max_x), (min_y, max_y), (min_z, max_z) = mission_data.grid_local.grid_range
+    x, y, z = np.array(position) - WORLD_ORIGIN
+    grid = world[x + min_x:x + max_x + 1, y + min_y:y + max_y + 1, z + min_z:z + max_z + 1]
+    info[mission_data.grid_local.name] = np.transpose(grid, (1, 2, 0)).ravel().tolist()
+    return Observation([TimestampedText(json.dumps(info, separators=(",", ":")))], mission_data)
+
+
+def get_hits(observation, hit_masks=None):
+    observer = Observer(observation, hit_masks)
+    return [observer.get_hits(material) for material in MATERIALS]
+
+
+def mine(world, position):
+    world = world.copy()
+    world[tuple(np.array(position) - WORLD_ORIGIN)] = items.AIR
+    return world
+
+
+def standing(world, tick):
+    return world, START_POSITION
+
+
+def mining(world, tick):
+    # Mines the blocks next to the agent one per tick
+    return mine(world, START_POSITION + [1 + tick, -1, 0]), START_POSITION
+
+
+def walking(world, tick):
+    return world, START_POSITION + [tick, 0, -tick // 2]
+
+
+def walking_back(world, tick):
+    return world, START_POSITION - [tick, 0, 0]
+
+
+def climbing(world, tick):
+    return world, START_POSITION + [tick, tick % 2, 0]
+
+
+def walking_and_mining(world, tick):
+    position = START_POSITION + [tick, 0, 0]
+    return mine(world, position + [1, 0, 0]), position
+
+
+def teleporting(world, tick):
+    # Moves further than the grid is wide every other tick, so nothing of the previous grid can be kept
+    return world, START_POSITION + [-40 + 85 * (tick % 2), 0, 0]
+
+
+@pytest.mark.parametrize("scenario", [standing, mining, walking, walking_back, climbing, walking_and_mining,
+                                      teleporting])
+def test_cached_hits_match_a_full_recompute(scenario):
+    mission_data = get_mission_data()
+    world = get_world()
+    hit_masks = HitMaskCache()
+    for tick in range(TICKS):
+        tick_world, position = scenario(world, tick)
+        observation = get_observation(mission_data, tick_world, position)
+        cached_hits = get_hits(observation, hit_masks)
+        for material, cached, recomputed in zip(MATERIALS, cached_hits, get_hits(observation)):
+            assert np.array_equal(cached, recomputed), f"Other {material} hits on tick {tick}"
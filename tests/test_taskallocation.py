@@ -0,0 +1,82 @@
+import dataclasses
+
+import numpy as np
+
+from experiment import experiments
+from goals.blueprint.blueprint import Blueprint
+from items import items
+from multiagents.cooperativity import Cooperativity
+from multiagents.taskallocation import TaskAllocator, get_assignment_channel, get_balanced_assignment
+from world.missiondata import MissionData
+
+LINE = np.array([[x, 9, 0] for x in range(0, 101, 10)])
+
+
+def get_allocator(positions, n_agents=2):
+    blueprint = Blueprint(items.FENCE, positions)
+    experiment = dataclasses.replace(experiments.experiment_flat_world, goals=[blueprint])
+    return TaskAllocator(MissionData(experiment, Cooperativity.COOPERATIVE, True, n_agents))
+
+
+def get_assigned(allocator, blackboard):
+    return [blackboard.get(get_assignment_channel(channel)) for channel in allocator.channels]
+
+
+def test_agents_at_both_ends_split_the_line():
+    assignment = get_balanced_assignment([[0, 9, 0], [100, 9, 0]], LINE)
+    assert assignment.tolist() == [0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 1]
+
+
+def test_split_follows_the_distance_rather_than_the_count():
+    # The agent at the line takes all of it before the agent far away would reach the first position
+    assignment = get_balanced_assignment([[0, 9, 0], [0, 9, 500]], LINE)
+    assert assignment.tolist() == [0] * len(LINE)
+
+
+def test_every_position_is_assigned_to_an_agent():
+    rng = np.random.default_rng(0)
+    positions = rng.integers(-50, 50, (30, 3))
+    agent_positions = rng.integers(-50, 50, (3, 3))
+    assignment = get_balanced_assignment(agent_positions, positions)
+    assert len(assignment) == len(positions)
+    assert set(assignment.tolist()) <= {0, 1, 2}
+
+
+def test_update_publishes_the_assignment():
+    allocator = get_allocator(LINE)
+    names = allocator.agent_names
+    blackboard = {}
+    allocator.update(blackboard, {}, [[0, 9, 0], [100, 9, 0]], [0, 1], [[False] * len(LINE)])
+    assert get_assigned(allocator, blackboard) == [names[0]] * 6 + [names[1]] * 5
+
+
+def test_update_waits_for_every_agent_position():
+    allocator = get_allocator(LINE)
+    blackboard = {}
+    allocator.update(blackboard, {}, [[0, 9, 0], None], [0, 1], [[False] * len(LINE)])
+    assert blackboard == {}
+
+
+def test_completed_and_claimed_positions_are_not_reassigned():
+    allocator = get_allocator(LINE)
+    names = allocator.agent_names
+    blackboard = {}
+    allocator.update(blackboard, {}, [[0, 9, 0], [100, 9, 0]], [0, 1], [[False] * len(LINE)])
+    # The first agent completes the first position and claims the last one, the other agent stops
+    results = [[True] + [False] * (len(LINE) - 1)]
+    claims = {allocator.channels[-1]: names[0]}
+    allocator.update(blackboard, claims, [[0, 9, 0], [100, 9, 0]], [0], results)
+    assigned = get_assigned(allocator, blackboard)
+    assert assigned[0] is False
+    assert assigned[1:] == [names[0]] * (len(LINE) - 1)
+
+
+def test_an_agent_that_stops_leaves_its_positions_to_the_others():
+    allocator = get_allocator(LINE, n_agents=3)
+    names = allocator.agent_names
+    blackboard = {}
+    agent_positions = [[0, 9, 0], [50, 9, 0], [100, 9, 0]]
+    allocator.update(blackboard, {}, agent_positions, [0, 1, 2], [[False] * len(LINE)])
+    assert names[1] in get_assigned(allocator, blackboard)
+    allocator.update(blackboard, {}, agent_positions, [0, 2], [[False] * len(LINE)])
+    assert set(get_assigned(allocator, blackboard)) == {names[0], names[2]}
@@ -0,0 +1,104 @@
+import pytest
+from py_trees.behaviour import Behaviour
+from py_trees.common import Status
+from py_trees.composites import Selector
+
+from bt.back_chain_tree import BackChainTree
+from bt.sequence import Sequence
+from bt.tickengine import TickEngine
+from experiment import experiments
+from experiment.benchmark import get_simulated_mission_data, get_simulated_agent, observe
+from malmoutils.agent import MinerAgent
+from malmoutils.interface import MalmoInterface
+from malmoutils.recording import ReplayAgentHost
+from malmoutils.world_state import TimestampedText
+from multiagents.cooperativity import Cooperativity
+from world.observation import Observation
+
+EXPERIMENTS = [experiments.experiment_pickaxe, experiments.experiment_flat_world]
+COOPERATIVITIES = [Cooperativity.INDEPENDENT, Cooperativity.COOPERATIVE_WITH_CATCHUP]
+SIMULATED_TICKS = 300
+SCRIPTED_TICKS = 12
+
+
+class Scripted(Behaviour):
+    # Returns the statuses in turn, one per tick, and logs the calls the tick makes
+    def __init__(self, name, statuses, log):
+        super().__init__(name)
+        self.statuses = statuses
+        self.log = log
+        self.ticks = 0
+
+    def initialise(self):
+        self.log.append((self.name, "initialise"))
+
+    def update(self):
+        status = self.statuses[self.ticks % len(self.statuses)]
+        self.ticks += 1
+        return status
+
+    def terminate(self, new_status):
+        self.log.append((self.name, "terminate", new_status))
+
+
+def get_scripted_tree(log):
+    running, success, failure = Status.RUNNING, Status.SUCCESS, Status.FAILURE
+    return Sequence("Root", children=[
+        Selector("Conditions", children=[
+            Scripted("Condition", [failure, failure, success, failure], log),
+            Scripted("Action", [running, success], log),
+        ]),
+        Sequence("Steps", children=[
+            Scripted("Step 1", [success, running, success], log),
+            Scripted("Step 2", [running, running, failure], log),
+        ]),
+        Scripted("Last", [running], log),
+    ])
+
+
+def get_statuses(root):
+    return [(node.name, node.status) for node in root.iterate()]
+
+
+def test_scripted_tree():
+    py_trees_log, engine_log = [], []
+    root = get_scripted_tree(py_trees_log)
+    engine_root = get_scripted_tree(engine_log)
+    engine = TickEngine(engine_root)
+    for tick in range(SCRIPTED_TICKS):
+        root.tick_once()
+        engine.tick()
+        assert get_statuses(engine_root) == get_statuses(root), f"Other statuses on tick {tick}"
+        assert engine_log == py_trees_log, f"Other calls on tick {tick}"
+
+
+def simulate(mission_data):
+    # Observations, commands and the statuses of every node after every tick of a simulated run
+    world, host, agent = get_simulated_agent(mission_data)
+    agent.interface.record_commands()
+    tree = BackChainTree(agent, mission_data.goals, mission_data.cooperativity)
+    ticks = []
+    for _ in range(SIMULATED_TICKS):
+        text = observe(world, host, agent)
+        tree.tick()
+        ticks.append((text, agent.interface.pop_sent_commands(), get_statuses(tree.root)))
+    return ticks
+
+
+@pytest.mark.parametrize("cooperativity", COOPERATIVITIES, ids=lambda cooperativity: cooperativity.name)
+@pytest.mark.parametrize("experiment", EXPERIMENTS, ids=lambda experiment: experiment.id)
+def test_simulated_mission(experiment, cooperativity):
+    # The tree ticked by the engine sends the same commands and ends up in the same statuses as the tree ticked by
+    # py_trees, given the observations of a run ticked by py_trees
+    ticks = simulate(get_simulated_mission_data(experiment, cooperativity, compiled_ticks=False))
+    mission_data = get_simulated_mission_data(experiment, cooperativity, compiled_ticks=True)
+    interface = MalmoInterface(ReplayAgentHost(), realtime=False)
+    interface.record_commands()
+    agent = MinerAgent(mission_data, {}, 0, interface)
+    tree = BackChainTree(agent, mission_data.goals, mission_data.cooperativity)
+    assert tree.engine is not None
+    for tick, (text, commands, statuses) in enumerate(ticks):
+        agent.set_observation(Observation([TimestampedText(text)], mission_data))
+        tree.tick()
+        assert interface.pop_sent_commands() == commands, f"Other commands on tick {tick}"
+        assert get_statuses(tree.root) == statuses, f"Other statuses on tick {tick}"
@@ -1,2 +1,3 @@
 ATTACK_REACH = 3
 PLACING_REACH = 3
+TICKS_PER_SECOND = 20
@@ -1,20 +1,33 @@
 from py_trees.composites import Selector
 
+from bt.ppa import LazyExpansion
+from bt.routesequence import RouteSequence
 from bt.sequence import Sequence
 
 BEHAVIOUR_BASE_ATTRIBUTES = ["id", "name", "blackboards", "qualified_name", "parent", "children", "logger",
-                             "feedback_message", "blackbox_level", "status", "iterator"]
+                             "feedback_message", "blackbox_level", "status", "iterator", "verification_key"]
 
 CLASS = "class"
 NAME = "name"
 CHILDREN = "children"
 ATTRIBUTES = "attributes"
+CONDITION = "condition"
+ROUTE_ATTRIBUTES = ["agent", "blueprint", "channels"]
+LAZY_ATTRIBUTES = ["agent", "collaboration"]
 
 
 def tree_to_state(node):
     if type(node) is Selector or type(node) is Sequence:
         children = [tree_to_state(child) for child in node.children]
         return {CLASS: node.__class__, NAME: node.name, CHILDREN: children}
+    elif type(node) is RouteSequence:
+        children = [tree_to_state(child) for child in node.position_children]
+        attributes = {attribute: getattr(node, attribute) for attribute in ROUTE_ATTRIBUTES}
+        return {CLASS: node.__class__, CHILDREN: children, ATTRIBUTES: attributes}
+    elif type(node) is LazyExpansion:
+        # Stored unexpanded, it expands again once its condition fails
+        attributes = {attribute: getattr(node, attribute) for attribute in LAZY_ATTRIBUTES}
+        return {CLASS: node.__class__, CONDITION: tree_to_state(node.condition), ATTRIBUTES: attributes}
     else:
         attributes = {k: v for k, v in node.__dict__.items() if k not in BEHAVIOUR_BASE_ATTRIBUTES}
         return {CLASS: node.__class__, ATTRIBUTES: attributes}
@@ -22,8 +35,12 @@ def tree_to_state(node):
 
 def state_to_tree(state):
     behaviour_class = state[CLASS]
-    if CHILDREN in state:
+    if CONDITION in state:
+        return behaviour_class(condition=state_to_tree(state[CONDITION]), **state[ATTRIBUTES])
+    elif CHILDREN in state:
         children = [state_to_tree(child) for child in state[CHILDREN]]
+        if ATTRIBUTES in state:
+            return behaviour_class(position_children=children, **state[ATTRIBUTES])
         return behaviour_class(state[NAME], children=children)
     else:
         return behaviour_class(**state[ATTRIBUTES])
@@ -0,0 +1,14 @@
+class lazy_property:
+    # Computes the property on first access and stores it on the instance, shadowing the descriptor afterwards.
+
+    def __init__(self, function):
+        self.function = function
+        self.name = function.__name__
+        self.__doc__ = function.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = self.function(instance)
+        instance.__dict__[self.name] = value
+        return value
@@ -0,0 +1,56 @@
+import functools
+
+import numpy as np
+
+
+def get_key(argument):
+    return tuple(argument.tolist()) if isinstance(argument, np.ndarray) else argument
+
+
+def get_result(value):
+    # Every caller gets its own copy of a cached array, changing it in place must not change the next result
+    return value.copy() if isinstance(value, np.ndarray) else value
+
+
+class QueryCache:
+    # Results of the queries on the current observation. Cleared when a new observation is set, the counters are kept
+    # for the whole mission.
+
+    def __init__(self):
+        self.results = {}
+        self.hits = {}
+        self.misses = {}
+
+    def clear(self):
+        self.results.clear()
+
+    def get(self, name, key, compute):
+        if key in self.results:
+            self.hits[name] = self.hits.get(name, 0) + 1
+        else:
+            self.misses[name] = self.misses.get(name, 0) + 1
+            self.results[key] = compute()
+        return get_result(self.results[key])
+
+    def print_stats(self):
+        hits, misses = sum(self.hits.values()), sum(self.misses.values())
+        hit_rate = hits / (hits + misses) if hits + misses else 0
+        print(f"Query cache hits: {hits}, misses: {misses} ({hit_rate:.0%} hit rate)")
+        for name in sorted(self.misses, key=lambda query: -self.hits.get(query, 0)):
+            print(f"    {name}: {self.hits.get(name, 0)} hits, {self.misses[name]} misses")
+
+
+def cached_query(method):
+    # Memoises a method in the query_cache of its instance. Only for queries that depend on nothing but the observation
+    # and their arguments.
+    name = method.__qualname__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self.query_cache is None:
+            return method(self, *args, **kwargs)
+        key = (name, tuple(get_key(argument) for argument in args),
+               tuple((keyword, get_key(argument)) for keyword, argument in sorted(kwargs.items())))
+        return self.query_cache.get(name, key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,59 @@
+import numpy as np
+
+MAX_IMPROVEMENTS = 1000
+IMPROVEMENT_EPSILON = 1e-9
+
+
+def get_distance_matrix(start, positions):
+    # Horizontal distances between the start, node 0, and the positions, nodes 1 to n. The last node is a free end, it
+    # is at no distance from anything, so that a route may end anywhere.
+    points = np.concatenate([np.reshape(start, (1, 3)), np.reshape(positions, (-1, 3))])[:, [0, 2]].astype(float)
+    distances = np.zeros((len(points) + 1, len(points) + 1))
+    distances[:-1, :-1] = np.linalg.norm(points[:, np.newaxis, :] - points[np.newaxis, :, :], axis=2)
+    return distances
+
+
+def get_route_length(start, positions, order):
+    distances = get_distance_matrix(start, positions)
+    nodes = np.concatenate([[0], np.asarray(order, dtype=int) + 1])
+    return float(np.sum(distances[nodes[:-1], nodes[1:]]))
+
+
+def get_nearest_neighbour_route(distances):
+    # Nodes of the positions, always going to the closest one that hasn't been visited
+    n = len(distances) - 2
+    visited = np.zeros(n + 1, dtype=bool)
+    visited[0] = True
+    route = [0]
+    for _ in range(n):
+        next_distances = np.where(visited, np.inf, distances[route[-1], :-1])
+        route.append(int(np.argmin(next_distances)))
+        visited[route[-1]] = True
+    return route
+
+
+def improve_route(distances, route):
+    # 2-opt, reverses the part of the route that shortens it the most until no reversal shortens it
+    nodes = np.array(route + [len(distances) - 1])
+    n = len(route) - 1
+    if n < 2:
+        return route
+    firsts, lasts = np.triu_indices(n, 1)
+    firsts, lasts = firsts + 1, lasts + 1
+    for _ in range(MAX_IMPROVEMENTS):
+        before, first, last, after = nodes[firsts - 1], nodes[firsts], nodes[lasts], nodes[lasts + 1]
+        gains = distances[before, first] + distances[last, after] - distances[before, last] - distances[first, after]
+        best = int(np.argmax(gains))
+        if gains[best] <= IMPROVEMENT_EPSILON:
+            break
+        nodes[firsts[best]:lasts[best] + 1] = nodes[firsts[best]:lasts[best] + 1][::-1]
+    return nodes[:-1].tolist()
+
+
+def get_route_order(start, positions):
+    # Order to visit the positions in, for a short walk from the start through all of them
+    if len(positions) == 0:
+        return []
+    distances = get_distance_matrix(start, positions)
+    route = improve_route(distances, get_nearest_neighbour_route(distances))
+    return [node - 1 for node in route[1:]]
@@ -0,0 +1,121 @@
+from enum import Enum
+
+import numpy as np
+
+from items import items
+from items.pickup import PickUp
+from mobs import animals, enemies
+from mobs.agententities import AgentEntity
+from mobs.animals import Animal
+from mobs.enemies import Enemy
+from utils.names import NAMES
+from world.palette import BlockPalette
+
+
+class EntityKind(Enum):
+    PICKUP = 0
+    ANIMAL = 1
+    ENEMY = 2
+    AGENT = 3
+
+
+def get_entity_kinds():
+    # Pickups win over animals, animals over enemies and enemies over agents, if a name were in several lists
+    entity_kinds = {}
+    for kind, names in [(EntityKind.AGENT, NAMES), (EntityKind.ENEMY, enemies.types),
+                        (EntityKind.ANIMAL, animals.types), (EntityKind.PICKUP, items.pickups)]:
+        entity_kinds.update(dict.fromkeys(names, kind))
+    return entity_kinds
+
+
+entity_kinds = get_entity_kinds()
+entity_palette = BlockPalette(list(entity_kinds))
+
+entity_factories = {
+    EntityKind.PICKUP: lambda name, x, y, z, life: PickUp(name, x, y, z),
+    EntityKind.ANIMAL: lambda name, x, y, z, life: Animal(name, x, y, z, life),
+    EntityKind.ENEMY: lambda name, x, y, z, life: Enemy(name, x, y, z),
+    EntityKind.AGENT: lambda name, x, y, z, life: AgentEntity(name, x, y, z),
+}
+
+
+class TypeLookups:
+    # Boolean lookup tables over the entity palette, one per set of names
+    def __init__(self):
+        self.lookups = {}
+
+    def get(self, names):
+        key = tuple(names)
+        lookup = self.lookups.get(key)
+        if lookup is None:
+            lookup = entity_palette.get_lookup(names)
+            self.lookups[key] = lookup
+        return lookup
+
+
+type_lookups = TypeLookups()
+
+
+def get_norms(vectors):
+    return np.sqrt(np.einsum("...i,...i", vectors, vectors))
+
+
+# The observed entities as columns with one row per entity. Queries work on whole columns, entity objects are only
+# created for the rows that are asked for.
+class EntityTable:
+
+    def __init__(self, rows):
+        # Every row is (name, kind, position, life), with a NaN life for entities that have none
+        self.names = [row[0] for row in rows]
+        self.types = entity_palette.encode(self.names)
+        self.kinds = np.fromiter((row[1].value for row in rows), dtype=np.int8, count=len(rows))
+        self.positions = np.array([row[2] for row in rows], dtype=float).reshape((len(rows), 3))
+        self.life = np.fromiter((row[3] for row in rows), dtype=float, count=len(rows))
+        self.indices = {}
+        self.objects = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def get_indices(self, kind, names=None):
+        key = (kind, None if names is None else tuple(names))
+        indices = self.indices.get(key)
+        if indices is None:
+            mask = self.kinds == kind.value
+            if names is not None:
+                mask &= type_lookups.get(names)[self.types]
+            indices = np.flatnonzero(mask)
+            self.indices[key] = indices
+        return indices
+
+    def get_entity(self, index):
+        entity = self.objects.get(index)
+        if entity is None:
+            life = self.life[index]
+            factory = entity_factories[EntityKind(self.kinds[index])]
+            entity = factory(self.names[index], *self.positions[index], None if np.isnan(life) else life)
+            self.objects[index] = entity
+        return entity
+
+    def get_entities(self, kind):
+        return [self.get_entity(index) for index in self.get_indices(kind)]
+
+    def get_distances(self, indices, position):
+        return get_norms(self.positions[indices] - position)
+
+    def get_closest(self, kind, position, names=None):
+        # Index of the entity of the kind closest to the position, or None if there is none
+        indices = self.get_indices(kind, names)
+        if position is None or indices.size == 0:
+            return None
+        return indices[np.argmin(self.get_distances(indices, position))]
+
+    def get_closest_pair(self, kind, other_kind):
+        # (index, other index, distance) of the closest pair between two kinds, or None if either is missing
+        indices = self.get_indices(kind)
+        other_indices = self.get_indices(other_kind)
+        if indices.size == 0 or other_indices.size == 0:
+            return None
+        distances = get_norms(self.positions[indices, None] - self.positions[None, other_indices])
+        row, column = np.unravel_index(np.argmin(distances), distances.shape)
+        return indices[row], other_indices[column], distances[row, column]
@@ -0,0 +1,95 @@
+import numpy as np
+
+EXPLORATION_CELL_SIZE = 8
+SHARED_UNEXPLORED = 0.5  # What a cell another agent has seen is still worth, it may hold what this agent needs
+TRAVEL_OFFSET = 16  # Blocks added to every travel distance so that the closest cells don't win by distance alone
+
+
+def get_window_sums(values, radius):
+    # Sum of the (2 * radius + 1) square of values around every cell, counting the outside as unexplored
+    padded = np.pad(values, radius, constant_values=1)
+    sums = np.zeros((padded.shape[0] + 1, padded.shape[1] + 1))
+    sums[1:, 1:] = padded.cumsum(axis=0).cumsum(axis=1)
+    size = 2 * radius + 1
+    return sums[size:, size:] - sums[:-size, size:] - sums[size:, :-size] + sums[:-size, :-size]
+
+
+# Remembers which columns of the world the agent has had in its local grid, in square cells of
+# EXPLORATION_CELL_SIZE blocks, and picks where to explore next: the frontier cell next to the explored area with the
+# most unexplored cells in view from it per block of travel. Travel counts from the agent and from where it started
+# exploring, so that the explored area grows around the start instead of in a line. Cells explored by other agents
+# count as partly explored.
+class ExplorationMap:
+
+    def __init__(self, cell_size=EXPLORATION_CELL_SIZE):
+        self.cell_size = cell_size
+        self.explored = set()
+        self.unpublished = set()
+        self.shared = set()
+        self.view_cells = 0
+        self.start = None
+
+    def update(self, origin, shape):
+        # Marks the cells that lie completely within the grid at {origin} of {shape}, True when there are new ones
+        if origin is None or shape is None:
+            return False
+        origin = np.asarray(origin, dtype=int)[[0, 2]]
+        end = origin + np.asarray(shape, dtype=int)[[0, 2]]
+        first = -np.floor_divide(-origin, self.cell_size)
+        last = np.floor_divide(end, self.cell_size)
+        self.view_cells = max(self.view_cells, int(np.min(last - first)) // 2)
+        if self.start is None:
+            self.start = (origin + end) / 2
+        cells = {(x, z) for x in range(first[0], last[0]) for z in range(first[1], last[1])}
+        new_cells = cells - self.explored
+        self.explored |= new_cells
+        self.unpublished |= new_cells
+        return len(new_cells) > 0
+
+    def pop_unpublished(self):
+        cells = list(self.unpublished)
+        self.unpublished = set()
+        return cells
+
+    def share(self, cells):
+        self.shared.update(tuple(cell) for cell in cells)
+
+    def get_cell(self, position):
+        return tuple(int(coordinate) for coordinate in np.floor_divide(np.asarray(position)[[0, 2]], self.cell_size))
+
+    def is_explored(self, cell):
+        return cell in self.explored
+
+    def get_cell_center(self, cell, height):
+        x, z = (np.array(cell) + 0.5) * self.cell_size
+        return np.array([x, height, z])
+
+    def get_frontier_cell(self, position):
+        if not self.explored:
+            return None
+        explored_cells = np.array(sorted(self.explored))
+        shared_cells = np.array(sorted(self.shared - self.explored), dtype=int).reshape((-1, 2))
+        known_cells = np.concatenate([explored_cells, shared_cells])
+        low = known_cells.min(axis=0) - self.view_cells - 1
+        shape = known_cells.max(axis=0) - low + self.view_cells + 2
+
+        explored = np.zeros(shape, dtype=bool)
+        explored[tuple((explored_cells - low).T)] = True
+        unexplored = np.where(explored, 0.0, 1.0)
+        unexplored[tuple((shared_cells - low).T)] = SHARED_UNEXPLORED
+        gains = get_window_sums(unexplored, self.view_cells)
+
+        next_to_explored = np.zeros(shape, dtype=bool)
+        next_to_explored[1:, :] |= explored[:-1, :]
+        next_to_explored[:-1, :] |= explored[1:, :]
+        next_to_explored[:, 1:] |= explored[:, :-1]
+        next_to_explored[:, :-1] |= explored[:, 1:]
+        frontier = np.argwhere(next_to_explored & ~explored)
+        if len(frontier) == 0:
+            return None
+
+        centers = (frontier + low + 0.5) * self.cell_size
+        distances = np.linalg.norm(centers - np.asarray(position)[[0, 2]], axis=1)
+        distances += np.linalg.norm(centers - self.start, axis=1)
+        scores = gains[tuple(frontier.T)] / (distances + TRAVEL_OFFSET)
+        return tuple(int(coordinate) for coordinate in frontier[np.argmax(scores)] + low)
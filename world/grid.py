@@ -29,3 +29,49 @@ class GridSpecification:
 
     def get_grid_position(self, position):
         return tuple(position - self.grid_range[:, 0])
+
+
+MAX_INDEX_VOLUME = 2 ** 24
+
+
+# Maps absolute positions to the first grid specification that contains them, through a dense array over the bounding
+# box of all specifications. Falls back to checking every specification when the box would be too large.
+class GridIndex:
+
+    def __init__(self, grid_specs):
+        self.grid_specs = grid_specs
+        self.origin = None
+        self.spec_indices = None
+        if not grid_specs:
+            return
+        grid_min = np.min([spec.grid_range[:, 0] for spec in grid_specs], axis=0)
+        grid_max = np.max([spec.grid_range[:, 1] for spec in grid_specs], axis=0)
+        if np.prod(grid_max - grid_min + 1) > MAX_INDEX_VOLUME:
+            return
+        self.origin = grid_min
+        self.spec_indices = np.full(grid_max - grid_min + 1, -1, dtype=np.int32)
+        # Filled backwards so that the first specification wins where they overlap
+        for index, spec in reversed(list(enumerate(grid_specs))):
+            (min_x, max_x), (min_y, max_y), (min_z, max_z) = spec.grid_range - grid_min[:, None]
+            self.spec_indices[min_x:max_x + 1, min_y:max_y + 1, min_z:max_z + 1] = index
+
+    def get_spec_indices(self, positions):
+        # Index of the specification for every position in an (n, 3) array, -1 where none contains it
+        positions = np.asarray(positions)
+        if self.spec_indices is None:
+            return np.array([next((index for index, spec in enumerate(self.grid_specs)
+                                   if spec.contains_position(position)), -1) for position in positions], dtype=int)
+        offsets = positions - self.origin
+        inside = np.all((offsets >= 0) & (offsets < self.spec_indices.shape), axis=1)
+        spec_indices = np.full(len(positions), -1, dtype=int)
+        spec_indices[inside] = self.spec_indices[tuple(offsets[inside].astype(int).T)]
+        return spec_indices
+
+    def get_spec(self, position):
+        if self.spec_indices is None:
+            return next((spec for spec in self.grid_specs if spec.contains_position(position)), None)
+        offset = np.asarray(position) - self.origin
+        if np.any(offset < 0) or np.any(offset >= self.spec_indices.shape):
+            return None
+        index = self.spec_indices[tuple(offset.astype(int))]
+        return self.grid_specs[index] if index >= 0 else None
@@ -0,0 +1,78 @@
+import numpy as np
+
+
+def get_overlap(shift, shape):
+    # Slices of the new and the old grid that cover the same absolute blocks, when the grid moved by {shift}
+    new_slices = []
+    old_slices = []
+    for axis_shift, size in zip(shift, shape):
+        if abs(axis_shift) >= size:
+            return None
+        elif axis_shift >= 0:
+            new_slices.append(slice(0, size - axis_shift))
+            old_slices.append(slice(axis_shift, size))
+        else:
+            new_slices.append(slice(-axis_shift, size))
+            old_slices.append(slice(0, size + axis_shift))
+    return tuple(new_slices), tuple(old_slices)
+
+
+class HitMaskCache:
+    # Keeps the hit masks of every requested material across ticks and only updates the blocks that changed.
+
+    def __init__(self):
+        self.grid = None
+        self.position = None
+        self.masks = {}
+        self.lookups = {}
+
+    def get_hits(self, material, lookup, grid, position):
+        if grid is not self.grid:
+            self.update(grid, position)
+        hits = self.masks.get(material)
+        if hits is None:
+            hits = lookup[grid]
+            self.masks[material] = hits
+            self.lookups[material] = lookup
+        return hits
+
+    def update(self, grid, position):
+        dirty = self.get_dirty_blocks(grid, position)
+        if dirty is None:
+            self.masks = {material: self.lookups[material][grid] for material in self.masks}
+        else:
+            # Masks share the memory layout of the grid, so flat indices into the unravelled views line up
+            overlap, changed = dirty
+            changed_codes = grid.ravel(order="K")[changed]
+            for material, mask in self.masks.items():
+                if overlap is not None:
+                    new_slices, old_slices = overlap
+                    shifted_mask = np.empty_like(grid, dtype=bool)
+                    shifted_mask[new_slices] = mask[old_slices]
+                    mask = shifted_mask
+                    self.masks[material] = mask
+                if changed.size:
+                    mask.ravel(order="K")[changed] = self.lookups[material][changed_codes]
+        self.grid = grid
+        self.position = position
+
+    def get_dirty_blocks(self, grid, position):
+        # Returns the overlap with the previous grid if it moved, and the flat indices of the blocks to look up again
+        # Returns None if everything has to be looked up again
+        if self.grid is None or self.position is None or position is None or grid.shape != self.grid.shape \
+                or grid.strides != self.grid.strides:
+            return None
+
+        shift = (position - self.position).astype(int)
+        if not shift.any():
+            changed = grid != self.grid
+            return None, np.flatnonzero(changed.ravel(order="K")) if changed.any() else np.empty(0, dtype=int)
+
+        overlap = get_overlap(shift, grid.shape)
+        if overlap is None:
+            return None
+
+        new_slices, old_slices = overlap
+        changed = np.ones_like(grid, dtype=bool)
+        changed[new_slices] = grid[new_slices] != self.grid[old_slices]
+        return overlap, np.flatnonzero(changed.ravel(order="K"))
@@ -4,10 +4,11 @@ import xml.etree.ElementTree as Et
 import numpy as np
 
 from goals.blueprint.blueprint import Blueprint
+from goals.blueprint.blueprintevaluator import BlueprintEvaluator
 from utils.names import get_agent_names
 from utils.string import prettify_xml
 from world import xmlconstants
-from world.grid import GridSpecification
+from world.grid import GridSpecification, GridIndex
 from world.worldgenerator import FlatWorldGenerator
 
 
@@ -33,7 +34,20 @@ class MissionData:
 
         self.world_generator = config.world_generator
 
-        self.ms_per_tick = 50  # Default: 50
+        self.ms_per_tick = 50  # Default: 50, 0 runs the simulator as fast as the agents observe it
+        self.record_observations = False
+        self.simulated = False  # Run the mission in the voxel simulator instead of Minecraft
+        self.simulator_address = None
+        self.path_planning = True  # Plan routes over the world map when the way straight to a target is blocked
+        self.task_allocation = True  # Assign blueprint positions to the agents when they cooperate
+        self.frontier_exploration = True  # Explore towards unseen areas instead of heading north
+        self.ore_search = True  # Search for ores at the heights they are found at instead of digging straight down
+        self.compiled_ticks = True  # Tick the behaviour trees with the flattened tick engine instead of py_trees
+        self.shared_subtrees = False  # Back chain each condition once and share its subtree, needs compiled_ticks.
+        # Off by default, a shared node keeps one status for all its parents so the statuses differ from py_trees
+        self.lazy_expansion = True  # Back chain the PPA of a condition only once the condition fails
+        self.tree_templates = True  # Instantiate the agents' trees from templates the runner builds once per mission
+        self.tick_profiling = False  # Profile the ticks of every node and save the profiles under log/profiles
         self.mode = "Survival"
 
         self.commands = [
@@ -66,6 +80,9 @@ class MissionData:
         self.grid_local = GridSpecification("me", np.array([[-40, 40], [-2, 4], [-40, 40]]), False)
 
         self.grids_global = [goal.get_required_grid("global") for goal in self.goals if isinstance(goal, Blueprint)]
+        self.grid_global_index = GridIndex(self.grids_global)
+        self.blueprint_evaluator = BlueprintEvaluator([goal for goal in self.goals if isinstance(goal, Blueprint)],
+                                                      self.grid_global_index)
         self.start_inventory = config.start_inventory
         self.start_entities = config.start_entities
 
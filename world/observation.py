@@ -1,18 +1,23 @@
 import json
+import re
 from enum import Enum
 
 import numpy as np
 
-from items import items
 from items.inventory import Inventory
-from items.pickup import PickUp
 from mobs import animals
-from mobs import enemies
-from mobs.agententities import AgentEntity
-from mobs.animals import Animal
-from mobs.enemies import Enemy
-from utils.names import NAMES
+from utils.properties import lazy_property
 from utils.vectors import CIRCLE_DEGREES
+from world.entities import EntityKind, EntityTable, entity_kinds
+from world.palette import block_palette
+
+try:
+    import orjson as json_backend
+except ImportError:
+    json_backend = json
+
+WHITESPACE = re.compile(r"\s*")
+json_decoder = json.JSONDecoder()
 
 
 class LineOfSightHitType(Enum):
@@ -21,11 +26,39 @@ class LineOfSightHitType(Enum):
 
 
 def grid_observation_from_list(grid_observation_list, grid_size):
-    grid = np.array(grid_observation_list).reshape((grid_size[1], grid_size[2], grid_size[0]))
+    return grid_observation_from_codes(block_palette.encode(grid_observation_list), grid_size)
+
+
+def grid_observation_from_codes(grid_codes, grid_size):
+    grid = grid_codes.reshape((grid_size[1], grid_size[2], grid_size[0]))
     grid = np.transpose(grid, (2, 0, 1))
     return grid
 
 
+def decode_top_level_value(info_json, key):
+    # Decodes the value of a single top level key and skips the rest of the text. Raises ValueError when the key is
+    # first found nested in another value, the caller then decodes the whole text. Block, item and entity names hold
+    # no brackets, so the brackets before the key give its depth.
+    needle = f'"{key}"'
+    start = info_json.find(needle)
+    if start < 0:
+        return None
+    prefix = info_json[:start]
+    depth = prefix.count("{") + prefix.count("[") - prefix.count("}") - prefix.count("]")
+    colon = WHITESPACE.match(info_json, start + len(needle)).end()
+    if depth != 1 or info_json[colon:colon + 1] != ":":
+        raise ValueError(f"{key} is not a top level key of the observation")
+    value_start = WHITESPACE.match(info_json, colon + 1).end()
+    if info_json[value_start:value_start + 1] == "[":
+        # Grids are flat lists, the backend decodes them faster than the standard library scanner
+        try:
+            return json_backend.loads(info_json[value_start:info_json.index("]", value_start) + 1])
+        except ValueError:
+            pass
+    value, _ = json_decoder.raw_decode(info_json, value_start)
+    return value
+
+
 def get_absolute_position(info):
     if Observation.X in info and Observation.Y in info and Observation.Z in info:
         return np.array([info[Observation.X], info[Observation.Y], info[Observation.Z]])
@@ -71,15 +104,24 @@ def get_line_of_sight_hit_type(info):
         return LineOfSightHitType.BLOCK if hit_type == Observation.LOS_HIT_TYPE_BLOCK else LineOfSightHitType.ITEM
 
 
-def get_grid_by_spec(info, spec):
-    grid_list = info.get(spec.name)
-    return grid_observation_from_list(grid_list, spec.get_grid_size()) if grid_list is not None else None
-
-
 def get_life(info):
     return info.get(Observation.LIFE, None)
 
 
+def get_entity_row(entity, agent_name):
+    name = entity.get(Observation.ENTITY_NAME)
+    kind = entity_kinds.get(name)
+    position = (entity.get(Observation.ENTITY_X), entity.get(Observation.ENTITY_Y), entity.get(Observation.ENTITY_Z))
+    if kind is None or any(coordinate is None for coordinate in position):
+        return None
+    if kind == EntityKind.AGENT and name == agent_name:
+        return None
+    life = entity.get(Observation.ENTITY_LIFE)
+    if life is None and kind == EntityKind.ANIMAL:
+        life = animals.starting_life.get(name, 0)
+    return name, kind, position, np.nan if life is None else life
+
+
 class Observation:
     GRID_LOCAL = "me"
 
@@ -110,88 +152,125 @@ class Observation:
     ENTITY_Z = "z"
     ENTITY_LIFE = "life"
 
+    # Every field is decoded on first access, so a tick only pays for the parts of the observation it uses. Until a
+    # field needs the whole info, the fields decode only the values of their own keys.
     def __init__(self, observations, mission_data):
-        self.pos_local_grid = None
-        self.info = None
         self.mission_data = mission_data
-
-        self.abs_pos = None
-        self.pitch = None
-        self.yaw = None
-
-        self.grid_local = None
+        self.info_json = None
         self.grids_global = {}
-        self.inventory = None
-        self.los_pos = None
-        self.los_type = None
-        self.los_hit_type = None
-
-        self.life = None
-
-        self.animals = None
-        self.enemies = None
-        self.pickups = None
-        self.other_agents = None
 
         if observations is None or not observations:
             print("Observations is null or empty")
             return
 
-        info_json = observations[-1].text
-        if info_json is None:
+        self.info_json = observations[-1].text
+        if self.info_json is None:
             print("Info is null")
-            return
 
-        self.info = json.loads(info_json)
-        self.inventory = Inventory(self.info)
+    @lazy_property
+    def info(self):
+        return json_backend.loads(self.info_json) if self.info_json is not None else None
+
+    @lazy_property
+    def inventory(self):
+        return Inventory(self.info) if self.info is not None else None
+
+    @lazy_property
+    def life(self):
+        return get_life(self.get_values(Observation.LIFE)) if self.info_json is not None else None
+
+    @lazy_property
+    def pos_local_grid(self):
+        if self.info_json is None:
+            return None
+        return [-grid_range[0] for grid_range in self.mission_data.grid_local.grid_range]
+
+    @lazy_property
+    def abs_pos(self):
+        if self.info_json is None:
+            return None
+        return get_absolute_position(self.get_values(Observation.X, Observation.Y, Observation.Z))
+
+    @lazy_property
+    def yaw(self):
+        return get_yaw(self.get_values(Observation.YAW)) if self.info_json is not None else None
+
+    @lazy_property
+    def pitch(self):
+        return get_pitch(self.get_values(Observation.PITCH)) if self.info_json is not None else None
+
+    @lazy_property
+    def los_pos(self):
+        return get_line_of_sight_position(self.get_values(Observation.LOS)) if self.info_json is not None else None
+
+    @lazy_property
+    def los_type(self):
+        return get_line_of_sight_type(self.get_values(Observation.LOS)) if self.info_json is not None else None
+
+    @lazy_property
+    def los_hit_type(self):
+        return get_line_of_sight_hit_type(self.get_values(Observation.LOS)) if self.info_json is not None else None
+
+    @lazy_property
+    def grid_local(self):
+        return self.get_grid_by_spec(self.mission_data.grid_local)
 
-        self.life = get_life(self.info)
+    @lazy_property
+    def blueprint_completion(self):
+        return self.mission_data.blueprint_evaluator.evaluate(self)
 
-        self.pos_local_grid = [-grid_range[0] for grid_range in mission_data.grid_local.grid_range]
+    @lazy_property
+    def entities(self):
+        return self.setup_entities(self.info) if self.info is not None else None
 
-        self.abs_pos = get_absolute_position(self.info)
-        self.yaw = get_yaw(self.info)
-        self.pitch = get_pitch(self.info)
+    @property
+    def animals(self):
+        return self.entities.get_entities(EntityKind.ANIMAL) if self.entities is not None else None
 
-        self.los_pos = get_line_of_sight_position(self.info)
-        self.los_type = get_line_of_sight_type(self.info)
-        self.los_hit_type = get_line_of_sight_hit_type(self.info)
+    @property
+    def enemies(self):
+        return self.entities.get_entities(EntityKind.ENEMY) if self.entities is not None else None
 
-        self.grid_local = get_grid_by_spec(self.info, mission_data.grid_local)
+    @property
+    def pickups(self):
+        return self.entities.get_entities(EntityKind.PICKUP) if self.entities is not None else None
 
-        self.setup_entities(self.info)
+    @property
+    def other_agents(self):
+        return self.entities.get_entities(EntityKind.AGENT) if self.entities is not None else None
 
     def setup_entities(self, info):
-        agent_name = self.info.get(Observation.NAME, "")
-        if Observation.ENTITIES in info:
-            self.animals = []
-            self.enemies = []
-            self.pickups = []
-            self.other_agents = []
-            for entity in info[Observation.ENTITIES]:
-                entity_name = entity.get(Observation.ENTITY_NAME)
-                entity_x = entity.get(Observation.ENTITY_X)
-                entity_y = entity.get(Observation.ENTITY_Y)
-                entity_z = entity.get(Observation.ENTITY_Z)
-                if entity_name and entity_x is not None and entity_y is not None and entity_z is not None:
-                    if entity_name in items.pickups:
-                        self.pickups.append(PickUp(entity_name, entity_x, entity_y, entity_z))
-                    elif entity_name in animals.types:
-                        animal_life = entity.get(Observation.ENTITY_LIFE, None)
-                        self.animals.append(Animal(entity_name, entity_x, entity_y, entity_z, animal_life))
-                    elif entity_name in enemies.types:
-                        self.enemies.append(Enemy(entity_name, entity_x, entity_y, entity_z))
-                    elif entity_name in NAMES and entity_name != agent_name:
-                        self.other_agents.append(AgentEntity(entity_name, entity_x, entity_y, entity_z))
+        if Observation.ENTITIES not in info:
+            return None
+        agent_name = info.get(Observation.NAME, "")
+        rows = (get_entity_row(entity, agent_name) for entity in info[Observation.ENTITIES])
+        return EntityTable([row for row in rows if row is not None])
+
+    def get_value(self, key):
+        if self.info_json is None:
+            return None
+        if "info" not in self.__dict__:
+            try:
+                return decode_top_level_value(self.info_json, key)
+            except ValueError:
+                pass
+        return self.info.get(key)
+
+    def get_values(self, *keys):
+        values = ((key, self.get_value(key)) for key in keys)
+        return {key: value for key, value in values if value is not None}
+
+    def get_grid_by_spec(self, spec):
+        grid = self.get_value(spec.name)
+        if grid is None:
+            return None
+        return grid_observation_from_list(grid, spec.get_grid_size())
 
     def get_grid_global(self, grid_spec):
-        cached_grid = self.grids_global.get(grid_spec)
-        if cached_grid is not None:
-            return cached_grid
-        else:
-            grid = get_grid_by_spec(self.info, grid_spec)
-            self.grids_global[grid_spec.name] = grid
-            return grid
+        # Keyed by the specification itself, every blueprint asks for a global grid under the same name
+        if grid_spec not in self.grids_global:
+            self.grids_global[grid_spec] = self.get_grid_by_spec(grid_spec)
+        return self.grids_global[grid_spec]
 
     def print(self):
         for key in self.info:
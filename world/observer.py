@@ -1,10 +1,14 @@
 import numpy as np
 
-from items.gathering import get_ore
-from items.items import traversable, narrow, get_variants
+from items.materials import materials
 from utils import vectors
+from utils.properties import lazy_property
+from utils.querycache import cached_query
 from utils.vectors import get_los_face, up, normalize, flatten
+from world.entities import EntityKind
 from world.observation import LineOfSightHitType
+from world.palette import is_in, BlockProperty, property_table
+from world.shells import shell_orders
 
 DELTA_ANGLES = 45
 GATHERING_REACH = 3
@@ -15,6 +19,10 @@ PICKUP_NEARBY_DISTANCE_TOLERANCE = 10
 EYE_HEIGHT = 1.62
 ENEMY_CLOSE_DISTANCE = 15
 
+# (x, z) of the column next to the agent's in every direction, inside the surrounding masks
+surrounding_columns = {direction: (int(vector[0]) + 1, int(vector[2]) + 1)
+                       for direction, vector in vectors.directionVector.items()}
+
 
 def get_position_center(block_position):
     return np.around(block_position) + vectors.center if block_position is not None else None
@@ -64,20 +72,33 @@ def get_wanted_pitch(dist_direction, delta_y):
     return vectors.radians_to_degrees(pitch)
 
 
+def get_material_lookup(material):
+    return materials.get(material).block_lookup
+
+
 class Observer:
-    def __init__(self, observation=None):
+    def __init__(self, observation=None, hit_masks=None, world_map=None, query_cache=None):
         self.observation = observation
+        self.hit_masks = hit_masks
+        self.world_map = world_map
+        self.query_cache = query_cache
         self.hits = {}
 
-        self.lower_surroundings = self.get_surroundings(self.observation.pos_local_grid)
-        self.upper_surroundings = self.get_surroundings(self.observation.pos_local_grid + vectors.up)
-        self.upper_upper_surroundings = self.get_surroundings(self.observation.pos_local_grid + 2 * vectors.up)
+    @lazy_property
+    def surrounding_masks(self):
+        # Masks of every block property for the column of the agent and the columns around it, (property, x, y, z)
+        # with the agent's column at x = z = 1. Navigation never looks further than that.
+        if self.observation.grid_local is None:
+            return None
+        x, _, z = self.observation.pos_local_grid
+        return property_table[:, self.observation.grid_local[x - 1:x + 2, :, z - 1:z + 2]]
 
-    def get_surroundings(self, central_position):
-        return {
-            direction: self.get_grid_local_block(central_position + vectors.directionVector[direction])
-            for direction in vectors.Direction
-        }
+    def is_surrounding(self, block_property, direction, height=0):
+        # Whether the block next to the agent in the direction, {height} blocks above its feet, has the property
+        if self.surrounding_masks is None:
+            return False
+        x, z = surrounding_columns[direction]
+        return bool(self.surrounding_masks[block_property.value, x, self.observation.pos_local_grid[1] + height, z])
 
     def get_grid_local_block(self, position):
         return self.observation.grid_local[tuple(position)] if self.observation.grid_local is not None else None
@@ -85,6 +106,7 @@ class Observer:
     def get_abs_pos_discrete(self):
         return np.floor(self.observation.abs_pos) if self.observation.abs_pos is not None else None
 
+    @cached_query
     def get_closest_block(self, block_type):
         abs_pos_discrete = self.get_abs_pos_discrete()
         if abs_pos_discrete is None:
@@ -94,22 +116,27 @@ class Observer:
         if hits is None:
             return None
 
-        positions = np.argwhere(hits)
-        if positions.size > 0:
-            distances_vector = positions - self.observation.pos_local_grid
-            distances = np.linalg.norm(distances_vector, axis=1)
-
-            closest_vectors = distances_vector[(distances == min(distances))]
-            closest_vectors_same_height = closest_vectors[(closest_vectors[:, 1] == 0)]
-            # Prioritize same horizontal level
-            closest = closest_vectors_same_height[0] if closest_vectors_same_height.size > 0 else closest_vectors[0]
+        # Closest first, prioritizing the same horizontal level
+        closest = shell_orders.get(hits, self.observation.pos_local_grid).get_closest_offset(hits)
+        if closest is not None:
             return abs_pos_discrete + closest
+        elif self.world_map is not None:
+            return self.world_map.get_closest_block(block_type, get_material_lookup(block_type), abs_pos_discrete)
         else:
             return None
 
+    @cached_query
     def is_block_observable(self, block_type):
         hits = self.get_hits(block_type)
-        return hits is not None and np.any(hits)
+        if hits is not None and np.any(hits):
+            return True
+        return self.world_map is not None and self.world_map.has_block(block_type, get_material_lookup(block_type))
+
+    def get_grid_local_origin(self):
+        abs_pos_discrete = self.get_abs_pos_discrete()
+        if abs_pos_discrete is None or self.observation.pos_local_grid is None:
+            return None
+        return abs_pos_discrete - self.observation.pos_local_grid
 
     def get_hits(self, material):
         if material in self.hits:
@@ -117,20 +144,24 @@ class Observer:
         elif self.observation.grid_local is None:
             return None
         else:
-            variants = get_variants(material)
-            ores = [ore for ore in (get_ore(variant) for variant in variants) if ore is not None]
-            targets = variants + ores
-            hits = np.isin(self.observation.grid_local, targets)
+            lookup = get_material_lookup(material)
+            if self.hit_masks is not None:
+                position = self.get_abs_pos_discrete()
+                hits = self.hit_masks.get_hits(material, lookup, self.observation.grid_local, position)
+            else:
+                hits = lookup[self.observation.grid_local]
 
             self.hits[material] = hits
             return hits
 
+    @cached_query
     def get_first_block_downwards(self):
         abs_pos_discrete = self.get_abs_pos_discrete()
-        if abs_pos_discrete is not None:
-            check_position = np.copy(self.observation.pos_local_grid)
-            while check_position[1] >= 0 and self.observation.grid_local[tuple(check_position)] in traversable:
-                check_position -= vectors.up
+        if abs_pos_discrete is not None and self.surrounding_masks is not None:
+            # The highest block at or below the feet that can't be walked through, -1 if the column is all traversable
+            x, y, z = self.observation.pos_local_grid
+            blocking = np.flatnonzero(~self.surrounding_masks[BlockProperty.TRAVERSABLE.value, 1, :y + 1, 1])
+            check_position = np.array([x, blocking[-1] if blocking.size > 0 else -1, z])
             return abs_pos_discrete - self.observation.pos_local_grid + check_position
         else:
             return None
@@ -142,8 +173,10 @@ class Observer:
         return False
 
     def is_block_at_position(self, position, block):
-        variants = get_variants(block)
-        return self.get_block_at_position_from_global(position) in variants
+        row = self.observation.mission_data.blueprint_evaluator.get_row(position, block)
+        if row is not None:
+            return bool(self.observation.blueprint_completion[row])
+        return is_in(self.get_block_at_position_from_global(position), materials.get(block).variant_lookup)
 
     def get_block_at_position_from_local(self, position):
         distance = self.get_rounded_distance_to_position(position)
@@ -153,12 +186,13 @@ class Observer:
             return None
 
     def get_block_at_position_from_global(self, position):
-        grids_global = self.observation.mission_data.grids_global
-        position_spec = next((spec for spec in grids_global if spec.contains_position(position)), None)
+        position_spec = self.observation.mission_data.grid_global_index.get_spec(position)
         if position_spec is not None:
             grid_global = self.observation.get_grid_global(position_spec)
             grid_position = position_spec.get_grid_position(position)
             return grid_global[grid_position] if grid_global is not None else None
+        elif self.world_map is not None:
+            return self.world_map.get_block(position)
         else:
             return None
 
@@ -195,44 +229,46 @@ class Observer:
             los_pos_discrete[2] -= 1
         return los_pos_discrete
 
+    @cached_query
     def get_weakest_animal(self, specie=None):
-        # Get the weakest entity. If there are several, take the closest of them.
-        if self.observation.abs_pos is None:
+        # Get the weakest animal. If there are several, take the closest of them.
+        entities = self.observation.entities
+        if self.observation.abs_pos is None or entities is None:
             return None
 
-        def get_weakest_animal_min_key(animal):
-            return not animal.is_specie(specie), animal.health, np.linalg.norm(animal.pos - self.observation.abs_pos)
-
-        weakest_animal = min(self.observation.animals, key=get_weakest_animal_min_key)
-        return weakest_animal if weakest_animal.is_specie(specie) else None
+        indices = entities.get_indices(EntityKind.ANIMAL, [specie] if specie is not None else None)
+        if indices.size == 0:
+            return None
+        distances = entities.get_distances(indices, self.observation.abs_pos)
+        return entities.get_entity(indices[np.lexsort((distances, entities.life[indices]))[0]])
 
+    @cached_query
     def get_closest_enemy(self):
         return self.get_closest_enemy_to_position(self.observation.abs_pos)
 
     def get_closest_enemy_to_position(self, position):
-        if position is not None and len(self.observation.enemies) != 0:
-            return min(self.observation.enemies, key=lambda enemy: np.linalg.norm(enemy.position - position))
-        else:
-            return None
+        entities = self.observation.entities
+        index = entities.get_closest(EntityKind.ENEMY, position) if entities is not None else None
+        return entities.get_entity(index) if index is not None else None
 
+    @cached_query
     def get_closest_enemy_to_agents(self):
         # Get the closest enemy to any agent. Prioritize enemies that are within range to this agent.
         closest_enemy = self.get_closest_enemy()
         if closest_enemy is not None:
             if np.linalg.norm(closest_enemy.position - self.observation.abs_pos) <= ENEMY_CLOSE_DISTANCE:
                 return closest_enemy
-        closest_enemies = self.get_closest_enemy_agent_positions_to_other_agents()
-        if len(closest_enemies) > 0:
-            enemy_agent_position = min(closest_enemies, key=lambda ea: np.linalg.norm(ea[0].position - ea[1]))
-            if np.linalg.norm(enemy_agent_position[0].position - enemy_agent_position[1]) <= ENEMY_CLOSE_DISTANCE:
-                return enemy_agent_position[0]
+        closest_pair = self.get_closest_agent_enemy_pair()
+        if closest_pair is not None and closest_pair[2] <= ENEMY_CLOSE_DISTANCE:
+            return self.observation.entities.get_entity(closest_pair[1])
         return None
 
-    def get_closest_enemy_agent_positions_to_other_agents(self):
-        closest = [(self.get_closest_enemy_to_position(a.position), a.position) for a in self.observation.other_agents]
-        closest_enemies = [enemy for enemy in closest if enemy is not None]
-        return closest_enemies
+    @cached_query
+    def get_closest_agent_enemy_pair(self):
+        entities = self.observation.entities
+        return entities.get_closest_pair(EntityKind.AGENT, EntityKind.ENEMY) if entities is not None else None
 
+    @cached_query
     def is_enemy_nearby(self):
         closest_enemy = self.get_closest_enemy()
         if closest_enemy is not None:
@@ -241,41 +277,37 @@ class Observer:
                 return True
         return False
 
+    @cached_query
     def is_enemy_near_any_agent(self):
         if self.is_enemy_nearby():
             return True
-        else:
-            return any(self.is_enemy_near_agent(agent) for agent in self.observation.other_agents)
-
-    def is_enemy_near_agent(self, agent):
-        enemy = self.get_closest_enemy_to_position(agent.position)
-        return enemy is not None and np.linalg.norm(enemy.position - agent.position) <= ENEMY_CLOSE_DISTANCE
+        closest_pair = self.get_closest_agent_enemy_pair()
+        return closest_pair is not None and closest_pair[2] <= ENEMY_CLOSE_DISTANCE
 
+    @cached_query
     def has_pickup_nearby(self, wanted):
-        if self.observation.abs_pos is not None:
-            variants = get_variants(wanted)
-            return any(self.is_pickup_nearby(pickup, variants) for pickup in self.observation.pickups)
-        else:
-            return False
-
-    def is_pickup_nearby(self, pickup, variants):
-        if pickup.type in variants:
-            return np.linalg.norm(pickup.position - self.observation.abs_pos) < PICKUP_NEARBY_DISTANCE_TOLERANCE
+        entities = self.observation.entities
+        if self.observation.abs_pos is not None and entities is not None:
+            index = entities.get_closest(EntityKind.PICKUP, self.observation.abs_pos, materials.get(wanted).variants)
+            return index is not None and \
+                np.linalg.norm(entities.positions[index] - self.observation.abs_pos) < PICKUP_NEARBY_DISTANCE_TOLERANCE
         else:
             return False
 
+    @cached_query
     def get_pickup_position(self, wanted):
-        variants = get_variants(wanted)
-        return next((p.get_centralized_position() for p in self.observation.pickups if p.type in variants), None)
+        entities = self.observation.entities
+        variants = materials.get(wanted).variants
+        indices = entities.get_indices(EntityKind.PICKUP, variants) if entities is not None else []
+        return entities.get_entity(indices[0]).get_centralized_position() if len(indices) > 0 else None
 
     def is_stuck(self):
-        if self.lower_surroundings is not None:
-            return not self.lower_surroundings[vectors.Direction.Zero] in traversable + narrow
-        else:
-            return False
+        return not self.is_surrounding(BlockProperty.PASSABLE, vectors.Direction.Zero)
 
+    @cached_query
     def is_animal_observable(self, specie):
-        return self.observation.animals and any(animal.type == specie for animal in self.observation.animals)
+        entities = self.observation.entities
+        return entities is not None and entities.get_indices(EntityKind.ANIMAL, [specie]).size > 0
 
     def get_current_direction(self):
         for key, check_angle in vectors.directionAngle.items():
@@ -0,0 +1,64 @@
+import numpy as np
+
+from items.gathering import LAVA_LEVEL
+from utils.vectors import directionVector, Direction
+
+BRANCH_LENGTH_IN_SPACINGS = 2
+TUNNEL_STEP = 8  # Blocks between the targets along the branches, short enough for the path planner to tunnel to
+TARGET_REACH = 1
+
+next_direction = {
+    Direction.North: Direction.East,
+    Direction.East: Direction.South,
+    Direction.South: Direction.West,
+    Direction.West: Direction.North,
+}
+
+
+def get_search_height(heights, grid_range):
+    # The lowest height above the lava where the observation grid sees only heights the ore is found at
+    low, high = heights
+    below, above = -grid_range[1, 0], grid_range[1, 1]
+    return max(low + below, min(high - above, LAVA_LEVEL + 1))
+
+
+def get_branch_spacing(grid_range):
+    # Branches this far apart see every block between them once
+    return int(np.min(grid_range[[0, 2], 1] - grid_range[[0, 2], 0])) + 1
+
+
+# Plans the search for an ore that is hidden underground: once the agent has dug down to the search height, branches
+# in the direction it faced, one observation grid width apart and connected at alternating ends so that every block at
+# the search height is seen once and no tunnel is walked twice.
+class OreSearch:
+
+    def __init__(self, heights, grid_range, direction):
+        self.height = get_search_height(heights, grid_range)
+        self.spacing = get_branch_spacing(grid_range)
+        self.direction = direction
+        self.origin = None
+        self.corner = 0
+        self.target = None
+
+    def is_descending(self, position):
+        return self.origin is None and position[1] > self.height
+
+    def get_corner(self, index):
+        forward = directionVector[self.direction]
+        side = directionVector[next_direction[self.direction]]
+        along = self.spacing * BRANCH_LENGTH_IN_SPACINGS if (index // 2) % 2 == 0 else 0
+        across = self.spacing * ((index + 1) // 2)
+        return self.origin + along * forward + across * side
+
+    def get_target(self, position):
+        # The next position on the branches, at most TUNNEL_STEP blocks ahead of the previous one
+        if self.origin is None:
+            self.origin = np.array([position[0], self.height, position[2]])
+            self.target = self.origin
+        if np.max(np.abs(self.target[[0, 2]] - position[[0, 2]])) <= TARGET_REACH:
+            corner = self.get_corner(self.corner)
+            if np.array_equal(self.target, corner):
+                self.corner += 1
+                corner = self.get_corner(self.corner)
+            self.target = self.target + np.clip(corner - self.target, -TUNNEL_STEP, TUNNEL_STEP)
+        return self.target
@@ -0,0 +1,93 @@
+from enum import Enum
+
+import numpy as np
+
+from items import items
+
+CODE_DTYPE = np.uint16
+PALETTE_CAPACITY = 1024
+
+UNKNOWN_BLOCK = "unknown"
+
+
+class PaletteFullException(Exception):
+    pass
+
+
+def get_item_names():
+    return [value for key, value in vars(items).items() if key.isupper() and isinstance(value, str)]
+
+
+def is_in(code, lookup):
+    return code is not None and bool(lookup[code])
+
+
+# Interns block names to small integer codes. Membership tests are done with boolean lookup tables indexed by code.
+class BlockPalette:
+
+    def __init__(self, names=None):
+        self.names = []
+        self.codes = {}
+        for name in names if names is not None else []:
+            self.get_code(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def get_code(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            code = len(self.names)
+            if code >= PALETTE_CAPACITY:
+                raise PaletteFullException(f"Can't add {name} to the palette, it already has {code} block types")
+            self.codes[name] = code
+            self.names.append(name)
+        return code
+
+    def get_name(self, code):
+        return self.names[code] if code is not None else None
+
+    def encode(self, names):
+        try:
+            return np.fromiter(map(self.codes.__getitem__, names), dtype=CODE_DTYPE, count=len(names))
+        except KeyError:
+            for name in set(names):
+                self.get_code(name)
+            return np.fromiter(map(self.codes.__getitem__, names), dtype=CODE_DTYPE, count=len(names))
+
+    def decode(self, codes):
+        return np.array(self.names, dtype=object)[codes]
+
+    def get_lookup(self, names):
+        lookup = np.zeros(PALETTE_CAPACITY, dtype=bool)
+        lookup[[self.get_code(name) for name in names]] = True
+        return lookup
+
+
+block_palette = BlockPalette(get_item_names())
+unknown_code = block_palette.get_code(UNKNOWN_BLOCK)
+
+traversable_lookup = block_palette.get_lookup(items.traversable)
+narrow_lookup = block_palette.get_lookup(items.narrow)
+unclimbable_lookup = block_palette.get_lookup(items.unclimbable)
+passable_lookup = traversable_lookup | narrow_lookup
+solid_lookup = ~passable_lookup
+
+
+class BlockProperty(Enum):
+    TRAVERSABLE = 0
+    NARROW = 1
+    UNCLIMBABLE = 2
+    PASSABLE = 3
+    SOLID = 4
+
+
+property_lookups = {
+    BlockProperty.TRAVERSABLE: traversable_lookup,
+    BlockProperty.NARROW: narrow_lookup,
+    BlockProperty.UNCLIMBABLE: unclimbable_lookup,
+    BlockProperty.PASSABLE: passable_lookup,
+    BlockProperty.SOLID: solid_lookup,
+}
+# Every property lookup stacked by property value, so that one indexing gives the masks of all properties
+property_table = np.array([property_lookups[block_property] for block_property in BlockProperty])
@@ -0,0 +1,285 @@
+import heapq
+
+import numpy as np
+
+from items import items
+from items.gathering import get_break_seconds
+from utils import vectors
+from utils.constants import TICKS_PER_SECOND
+from world.palette import block_palette, traversable_lookup, narrow_lookup, unclimbable_lookup, unknown_code, \
+    PALETTE_CAPACITY, UNKNOWN_BLOCK
+
+# Edge costs in ticks
+WALK_COST = 5
+JUMP_COST = 10
+FALL_COST = 2
+MINE_OVERHEAD = 10  # Aiming at the block and waiting for it to break
+UNKNOWN_COST = 2  # Blocks that were never observed are assumed to be air, with a penalty for the risk
+MAX_DROP = 3
+
+HORIZONTAL_MARGIN = 12
+BELOW_MARGIN = 6
+ABOVE_MARGIN = 4
+MAX_HORIZONTAL_SIZE = 128
+MAX_EXPANSIONS = 6000
+
+GOAL_DISTANCE = 1  # Planning stops next to the target, the last steps are steered directly
+REPLAN_GOAL_DISTANCE = 2
+ROUTE_LOOKAHEAD = 16
+AGENT_HALF_WIDTH = 0.3
+LINE_SAMPLES_PER_BLOCK = 4
+FAILED_ROUTE_TICKS = 20
+
+hazards = [items.LAVA, items.FLOWING_LAVA, items.FIRE, items.CACTUS]
+unbreakable = [items.BEDROCK, items.WATER, items.FLOWING_WATER, items.LAVA, items.FLOWING_LAVA]
+
+
+def get_clear_cost(name, tier):
+    # Ticks it takes to get the block out of the way, infinite for blocks that are never mined or walked through
+    if name == UNKNOWN_BLOCK:
+        return UNKNOWN_COST
+    elif name in hazards or name in unbreakable or name in items.narrow or name in items.unclimbable:
+        return np.inf
+    return TICKS_PER_SECOND * get_break_seconds(name, tier) + MINE_OVERHEAD
+
+
+class CostTables:
+    # Clear costs and standability of every palette code, per pickaxe tier. Rebuilt when the palette grows.
+
+    def __init__(self):
+        self.tables = {}
+
+    def get(self, tier):
+        key = (tier, len(block_palette))
+        tables = self.tables.get(key)
+        if tables is None:
+            names = block_palette.names + [UNKNOWN_BLOCK] * (PALETTE_CAPACITY - len(block_palette))
+            clear = np.array([get_clear_cost(name, tier) for name in names])
+            clear[traversable_lookup] = 0
+            standable = ~(traversable_lookup | narrow_lookup | unclimbable_lookup | block_palette.get_lookup(hazards))
+            standable[unknown_code] = True
+            tables = clear, standable
+            self.tables[key] = tables
+        return tables
+
+
+cost_tables = CostTables()
+
+
+def get_region(start, goal):
+    # Box around the start and the goal to search in, cut around the start if the goal is far away
+    low = np.minimum(start, goal) - [HORIZONTAL_MARGIN, BELOW_MARGIN, HORIZONTAL_MARGIN]
+    high = np.maximum(start, goal) + [HORIZONTAL_MARGIN, ABOVE_MARGIN, HORIZONTAL_MARGIN]
+    half_size = MAX_HORIZONTAL_SIZE // 2
+    for axis in [0, 2]:
+        low[axis] = max(low[axis], start[axis] - half_size)
+        high[axis] = min(high[axis], start[axis] + half_size)
+    return low, high - low + 1
+
+
+def get_heuristic(shape, origin, goal):
+    # Walking cost to the goal area, a lower bound since every horizontal step costs at least WALK_COST
+    x, _, z = np.indices(shape, sparse=True)
+    distance = np.abs(x + origin[0] - goal[0]) + np.abs(z + origin[2] - goal[2])
+    return np.broadcast_to(WALK_COST * np.maximum(distance - 2 * GOAL_DISTANCE, 0), shape).ravel().tolist()
+
+
+def get_goal_cells(shape, origin, goal):
+    cells = set()
+    offsets = range(-GOAL_DISTANCE, GOAL_DISTANCE + 1)
+    for dx in offsets:
+        for dy in offsets:
+            for dz in offsets:
+                position = goal + [dx, dy, dz] - origin
+                if np.all(position >= 0) and np.all(position < shape):
+                    cells.add(int(np.ravel_multi_index(tuple(position), shape)))
+    return cells
+
+
+def search(clear, standable, heuristic, start, goals, strides):
+    # A* over the flat indices of the region. Returns the cells to the goal, or to the cell closest to it if the goal
+    # can't be reached within MAX_EXPANSIONS, and whether the goal was reached.
+    x_stride, y_stride, z_stride = strides
+    costs = {start: 0}
+    parents = {start: None}
+    queue = [(heuristic[start], 0, start)]
+    closest = start
+    expansions = 0
+    reached = False
+    while queue and expansions < MAX_EXPANSIONS:
+        _, cost, cell = heapq.heappop(queue)
+        if cost > costs[cell]:
+            continue
+        expansions += 1
+        if cell in goals:
+            closest, reached = cell, True
+            break
+        if heuristic[cell] < heuristic[closest]:
+            closest = cell
+        for step, neighbour in get_moves(clear, standable, cell, x_stride, y_stride, z_stride):
+            new_cost = cost + step
+            if new_cost < costs.get(neighbour, np.inf):
+                costs[neighbour] = new_cost
+                parents[neighbour] = cell
+                heapq.heappush(queue, (new_cost + heuristic[neighbour], new_cost, neighbour))
+
+    cells = [closest]
+    while parents[cells[-1]] is not None:
+        cells.append(parents[cells[-1]])
+    return cells[::-1], reached
+
+
+def get_moves(clear, standable, cell, x_stride, y_stride, z_stride):
+    # Walking, mining through, dropping down and jumping up to the four neighbours, and digging down
+    moves = []
+    for offset in (x_stride, -x_stride, z_stride, -z_stride):
+        target = cell + offset
+        cost = clear[target] + clear[target + y_stride]
+        if cost < np.inf:
+            landing = target
+            for drop in range(MAX_DROP + 1):
+                if standable[landing - y_stride]:
+                    moves.append((WALK_COST + cost + FALL_COST * drop, landing))
+                    break
+                elif clear[landing - y_stride] != 0:
+                    break
+                landing -= y_stride
+        if standable[target] and clear[target] > 0:
+            cost = clear[cell + 2 * y_stride] + clear[target + y_stride] + clear[target + 2 * y_stride]
+            if cost < np.inf:
+                moves.append((JUMP_COST + cost, target + y_stride))
+    below = cell - y_stride
+    if 0 < clear[below] < np.inf and standable[below - y_stride]:
+        moves.append((clear[below], below))
+    return moves
+
+
+# Plans routes over the blocks the agent has seen, assuming that blocks it hasn't seen are air
+class PathPlanner:
+
+    def __init__(self, world_map):
+        self.world_map = world_map
+
+    def plan(self, start, goal, tier):
+        start = np.asarray(start, dtype=int)
+        goal = np.asarray(goal, dtype=int)
+        origin, shape = get_region(start, goal)
+        clear_table, standable_table = cost_tables.get(tier)
+        codes = self.world_map.get_box(origin, shape)
+        clear = clear_table[codes]
+        standable = standable_table[codes]
+        # A blocked border keeps the search inside the region
+        for axis in range(3):
+            for side in [0, -1]:
+                border = tuple(side if i == axis else slice(None) for i in range(3))
+                clear[border] = np.inf
+                standable[border] = False
+
+        strides = (shape[1] * shape[2], shape[2], 1)
+        start_cell = int(np.ravel_multi_index(tuple(start - origin), shape))
+        cells, reached = search(clear.ravel().tolist(), standable.ravel().tolist(), get_heuristic(shape, origin, goal),
+                                start_cell, get_goal_cells(shape, origin, goal), strides)
+        positions = np.array(np.unravel_index(cells, shape)).T + origin
+        return Route(positions, goal, reached, tier, self.world_map)
+
+
+def get_route_cells(positions):
+    # Feet, head and floor of every position on the route
+    return np.concatenate([positions, positions + [0, 1, 0], positions - [0, 1, 0]])
+
+
+def get_route_codes(world_map, positions):
+    return world_map.get_blocks(get_route_cells(positions)).reshape((3, len(positions)))
+
+
+# A planned route that the agent follows position by position, replanned when it leaves it or when blocks on the rest
+# of it changed for the worse
+class Route:
+
+    def __init__(self, positions, goal, reached, tier, world_map):
+        self.positions = positions
+        self.goal = goal
+        self.reached = reached
+        self.tier = tier
+        self.world_map = world_map
+        self.index = 1
+        self.cell = None
+        self.waypoint = None
+        self.age = 0
+        self.tick = world_map.tick
+        self.codes = get_route_codes(world_map, positions)
+        # Positions reached from the one before by walking on the same level, without mining
+        clear, _ = cost_tables.get(tier)
+        same_level = np.concatenate([[False], positions[1:, 1] == positions[:-1, 1]])
+        self.walkable = same_level & (clear[self.codes[0]] == 0) & (clear[self.codes[1]] == 0)
+
+    def is_failed(self):
+        return len(self.positions) <= 1
+
+    def get_waypoint(self, position):
+        # Position on the route to steer to, None once the end has been reached
+        self.age += 1
+        cell = np.floor(position).astype(int)
+        index = self.index
+        for ahead in range(self.index, min(self.index + ROUTE_LOOKAHEAD, len(self.positions))):
+            if np.array_equal(self.positions[ahead], cell):
+                self.index = ahead + 1
+        if self.index >= len(self.positions):
+            return None
+        if self.index != index or not np.array_equal(cell, self.cell):
+            self.cell = cell
+            self.waypoint = self.get_furthest_visible(position)
+        return self.positions[self.waypoint]
+
+    def get_furthest_visible(self, position):
+        # Walks on one level are cut short by heading straight to the furthest position that can be walked to in a
+        # line, so that the agent doesn't turn and slow down at every block
+        end = min(self.index + ROUTE_LOOKAHEAD, len(self.positions))
+        walkable = np.cumprod(self.walkable[self.index:end], dtype=bool)
+        candidates = self.index + np.flatnonzero(walkable[1:]) + 1
+        if len(candidates) == 0 or np.floor(position[1]) != self.positions[self.index, 1]:
+            return self.index
+        visible = self.get_visible(position, self.positions[candidates])
+        return candidates[visible][-1] if np.any(visible) else self.index
+
+    def get_visible(self, start, ends):
+        # Whether the agent can walk straight from the start to the center of each end block without mining, jumping
+        # or falling, sampling the line at the corners of the agent
+        ends = ends + vectors.flat_center
+        n_samples = int(LINE_SAMPLES_PER_BLOCK * np.max(np.abs(ends - start))) + 1
+        steps = np.linspace(0, 1, n_samples)[np.newaxis, :, np.newaxis, np.newaxis]
+        corners = np.array([[dx, 0, dz] for dx in (-AGENT_HALF_WIDTH, AGENT_HALF_WIDTH)
+                            for dz in (-AGENT_HALF_WIDTH, AGENT_HALF_WIDTH)])
+        points = start + steps * (ends - start)[:, np.newaxis, np.newaxis, :] + corners
+        cells = np.floor(points.reshape((-1, 3))).astype(int)
+        origin = np.min(cells, axis=0) - vectors.up
+        box = self.world_map.get_box(origin, np.max(cells, axis=0) - origin + 2 * vectors.up + 1)
+        x, y, z = (cells - origin).T
+        clear, standable = cost_tables.get(self.tier)
+        walkable = (clear[box[x, y, z]] == 0) & (clear[box[x, y + 1, z]] == 0) & standable[box[x, y - 1, z]]
+        return np.all(walkable.reshape((len(ends), -1)), axis=1)
+
+    def is_on_route(self, cell):
+        # The agent is at, or on its way between, the last position it reached and the one it steers to
+        nearby = self.positions[max(self.index - 1, 0):max(self.index, self.waypoint or 0) + 1]
+        return np.any(np.max(np.abs(nearby - cell), axis=1) <= 1)
+
+    def is_worse(self):
+        # Whether the blocks on the rest of the route changed so that it costs more than when it was planned
+        last_tick, self.tick = self.tick, self.world_map.tick
+        remaining = self.positions[self.index:]
+        if last_tick == self.tick or not self.world_map.get_changed_since(last_tick, get_route_cells(remaining)):
+            return False
+        codes = get_route_codes(self.world_map, remaining)
+        planned_codes = self.codes[:, self.index:]
+        clear, standable = cost_tables.get(self.tier)
+        return bool(np.any(clear[codes[:2]] > clear[planned_codes[:2]])
+                    or np.any(standable[planned_codes[2]] & ~standable[codes[2]]))
+
+    def needs_replanning(self, cell, goal, tier):
+        if self.is_failed():
+            return self.age >= FAILED_ROUTE_TICKS
+        elif self.index >= len(self.positions):
+            return not self.reached or np.max(np.abs(goal - self.goal)) > REPLAN_GOAL_DISTANCE
+        return tier != self.tier or np.max(np.abs(goal - self.goal)) > REPLAN_GOAL_DISTANCE \
+            or not self.is_on_route(cell) or self.is_worse()
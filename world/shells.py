@@ -0,0 +1,57 @@
+import numpy as np
+
+FIRST_SHELL_SIZE = 256
+SHELL_GROWTH = 4
+
+
+def get_flat_indices(mask):
+    # Index of every block into mask.ravel(order="K"), which is a view as long as the mask has no gaps
+    flat_indices = np.empty_like(mask, dtype=np.intp)
+    flat_indices.ravel(order="K")[:] = np.arange(mask.size)
+    return flat_indices
+
+
+# The blocks of a grid sorted in the order get_closest_block prefers them: closest to the center first, then the ones
+# at the height of the center, then in grid order like np.argwhere. Scanning a mask in this order stops at the closest
+# hit without looking at the rest of the grid.
+class ShellOrder:
+
+    def __init__(self, mask, center):
+        positions = np.indices(mask.shape).reshape((len(mask.shape), -1)).T
+        offsets = positions - center
+        distances = np.einsum("ij,ij->i", offsets, offsets)
+        order = np.lexsort((np.arange(len(offsets)), offsets[:, 1] != 0, distances))
+        self.offsets = offsets[order]
+        self.flat_indices = get_flat_indices(mask).ravel()[order]
+
+    def get_closest_offset(self, mask):
+        # Offset from the center to the first hit in the order, or None if the mask has no hits
+        flat_mask = mask.ravel(order="K")
+        if not flat_mask.any():
+            return None
+        start, size = 0, FIRST_SHELL_SIZE
+        while start < len(self.flat_indices):
+            shell = flat_mask[self.flat_indices[start:start + size]]
+            first = shell.argmax()
+            if shell[first]:
+                return self.offsets[start + first]
+            start, size = start + size, size * SHELL_GROWTH
+        return None
+
+
+class ShellOrders:
+    # One ShellOrder per grid shape, memory layout and center
+
+    def __init__(self):
+        self.orders = {}
+
+    def get(self, mask, center):
+        key = (mask.shape, tuple(np.argsort(mask.strides)), tuple(center))
+        order = self.orders.get(key)
+        if order is None:
+            order = ShellOrder(mask, center)
+            self.orders[key] = order
+        return order
+
+
+shell_orders = ShellOrders()
@@ -0,0 +1,163 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from world.palette import CODE_DTYPE, unknown_code
+
+CHUNK_SIZE = 16
+MAX_CHUNKS = 2048
+
+
+def get_chunk_range(start, end):
+    # Chunk keys of every chunk that overlaps the blocks from {start} to {end}, both included
+    first = np.floor_divide(start, CHUNK_SIZE)
+    last = np.floor_divide(end, CHUNK_SIZE)
+    return [(x, y, z) for x in range(first[0], last[0] + 1)
+            for y in range(first[1], last[1] + 1)
+            for z in range(first[2], last[2] + 1)]
+
+
+def get_chunk_distances(keys, position):
+    # Squared distance from {position} to the closest block of every chunk
+    chunk_starts = np.array(keys) * CHUNK_SIZE
+    below = chunk_starts - position
+    above = position - (chunk_starts + CHUNK_SIZE - 1)
+    return np.sum(np.maximum(np.maximum(below, above), 0) ** 2, axis=1)
+
+
+# Remembers every block the agent has observed, in chunks of palette codes, evicting the least recently seen chunks.
+class WorldMap:
+
+    def __init__(self, max_chunks=MAX_CHUNKS):
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()
+        self.chunk_ticks = {}
+        self.tick = 0
+        self.grid = None
+        self.origin = None
+        self.hit_chunks = {}
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def update(self, grid, origin):
+        # {origin} is the absolute position of grid[0, 0, 0]
+        if grid is None or origin is None:
+            return
+        origin = np.asarray(origin, dtype=int)
+        if grid is self.grid or (self.grid is not None and np.array_equal(origin, self.origin)
+                                 and grid.shape == self.grid.shape and np.array_equal(grid, self.grid)):
+            return
+
+        self.tick += 1
+        end = origin + grid.shape - 1
+        for key in get_chunk_range(origin, end):
+            chunk = self.get_chunk(key)
+            chunk_start = np.array(key) * CHUNK_SIZE
+            start = np.maximum(origin, chunk_start)
+            stop = np.minimum(end, chunk_start + CHUNK_SIZE - 1) + 1
+            chunk_slices = tuple(slice(a, b) for a, b in zip(start - chunk_start, stop - chunk_start))
+            grid_slices = tuple(slice(a, b) for a, b in zip(start - origin, stop - origin))
+            if not np.array_equal(chunk[chunk_slices], grid[grid_slices]):
+                chunk[chunk_slices] = grid[grid_slices]
+                self.chunk_ticks[key] = self.tick
+        self.grid = grid
+        self.origin = origin
+
+    def get_chunk(self, key):
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = np.full((CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE), unknown_code, dtype=CODE_DTYPE)
+            self.chunks[key] = chunk
+            while len(self.chunks) > self.max_chunks:
+                self.evict()
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def evict(self):
+        key, _ = self.chunks.popitem(last=False)
+        self.chunk_ticks.pop(key, None)
+        for hit_chunks in self.hit_chunks.values():
+            hit_chunks[1].discard(key)
+
+    def get_block(self, position):
+        key = tuple(int(coordinate) for coordinate in np.floor_divide(position, CHUNK_SIZE))
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            return None
+        code = chunk[tuple(int(coordinate) for coordinate in np.mod(position, CHUNK_SIZE))]
+        return code if code != unknown_code else None
+
+    def get_box(self, origin, shape):
+        # Codes of the blocks from {origin} over {shape}, unknown_code where nothing has been observed
+        origin = np.asarray(origin, dtype=int)
+        end = origin + shape - 1
+        box = np.full(shape, unknown_code, dtype=CODE_DTYPE)
+        for key in get_chunk_range(origin, end):
+            chunk = self.chunks.get(key)
+            if chunk is None:
+                continue
+            chunk_start = np.array(key) * CHUNK_SIZE
+            start = np.maximum(origin, chunk_start)
+            stop = np.minimum(end, chunk_start + CHUNK_SIZE - 1) + 1
+            chunk_slices = tuple(slice(a, b) for a, b in zip(start - chunk_start, stop - chunk_start))
+            box_slices = tuple(slice(a, b) for a, b in zip(start - origin, stop - origin))
+            box[box_slices] = chunk[chunk_slices]
+        return box
+
+    def get_blocks(self, positions):
+        # Codes of the blocks at an (n, 3) array of positions, unknown_code where nothing has been observed
+        positions = np.asarray(positions, dtype=int).reshape((-1, 3))
+        codes = np.full(len(positions), unknown_code, dtype=CODE_DTYPE)
+        keys = np.floor_divide(positions, CHUNK_SIZE)
+        for key in {tuple(key) for key in keys.tolist()}:
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                in_chunk = np.all(keys == key, axis=1)
+                codes[in_chunk] = chunk[tuple((positions[in_chunk] - np.array(key) * CHUNK_SIZE).T)]
+        return codes
+
+    def get_changed_since(self, tick, positions):
+        # Whether any chunk holding one of the positions changed after {tick}
+        keys = {tuple(key) for key in np.floor_divide(positions, CHUNK_SIZE).astype(int).tolist()}
+        return any(self.chunk_ticks.get(key, 0) > tick for key in keys)
+
+    def get_hit_chunks(self, material, lookup):
+        # Chunks containing the material, only rescanning the chunks that changed since the last time it was asked for
+        scanned_tick, hit_chunks = self.hit_chunks.get(material, (None, None))
+        if hit_chunks is None:
+            changed_keys = list(self.chunks)
+            hit_chunks = set()
+        else:
+            changed_keys = [key for key, tick in self.chunk_ticks.items() if tick > scanned_tick]
+        for key in changed_keys:
+            if lookup[self.chunks[key]].any():
+                hit_chunks.add(key)
+            else:
+                hit_chunks.discard(key)
+        self.hit_chunks[material] = (self.tick, hit_chunks)
+        return hit_chunks
+
+    def has_block(self, material, lookup):
+        return len(self.get_hit_chunks(material, lookup)) > 0
+
+    def get_closest_block(self, material, lookup, position):
+        hit_chunks = self.get_hit_chunks(material, lookup)
+        if not hit_chunks:
+            return None
+
+        keys = list(hit_chunks)
+        chunk_distances = get_chunk_distances(keys, position)
+        closest = None
+        closest_distance = None
+        for index in np.argsort(chunk_distances, kind="stable"):
+            if closest_distance is not None and chunk_distances[index] > closest_distance:
+                break
+            positions = np.argwhere(lookup[self.chunks[keys[index]]]) + np.array(keys[index]) * CHUNK_SIZE
+            distances = np.sum((positions - position) ** 2, axis=1)
+            best = np.argmin(distances)
+            if closest_distance is None or distances[best] < closest_distance:
+                closest = positions[best]
+                closest_distance = distances[best]
+        return closest.astype(float) if closest is not None else None